@@ -0,0 +1,4 @@
+"""페이지별 데이터 경로 벤치마크 (네트워크 없이 실행).
+
+    python -m benchmarks.run
+"""
@@ -0,0 +1,152 @@
+"""벤치마크용 오프라인 데이터.
+
+- CSV/xlsx: 저장소에 포함된 파일을 그대로 사용합니다.
+- yfinance: benchmarks/fixtures/yfinance/ 에 기록해 둔 응답(CSV)을 사용합니다.
+  기록된 파일이 없는 티커는 티커 이름으로 시드를 정한 합성 시세를 만들어 씁니다.
+  (네트워크가 되는 곳에서 `python -m benchmarks.run --record-yfinance` 로 기록)
+- 환율: 통화별로 고정된 값의 합성 환율(fx_rates)을 씁니다. (환율 파일도 쓰지 않음)
+- 구글 시트: 메모리에 데이터를 들고 있는 가짜 연결(FakeGSheetsConnection)로 바꿉니다.
+"""
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.connections import BaseConnection
+
+from databack import datasets
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+YFINANCE_DIR = FIXTURE_DIR / "yfinance"
+
+# 주식 페이지(01/02/03)에서 쓸 수 있는 티커 전체 (시가총액 순위 유니버스)
+TICKERS = list(pd.read_csv(datasets.UNIVERSE_CSV, dtype={"ticker": str})["ticker"])
+
+# 합성 데이터 기준일 (실행할 때마다 같은 데이터가 나오도록 고정)
+_SYNTHETIC_END = "2025-05-30"
+_PERIOD_DAYS = {"1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "max": 5040}
+
+# 합성 환율 (1 단위 통화 = 몇 USD). 여기에 없는 통화는 환율을 받지 못한 것처럼 NaN 입니다.
+_SYNTHETIC_FX = {"KRW": 1 / 1350, "SAR": 1 / 3.75, "JPY": 1 / 150, "EUR": 1.08, "CNY": 1 / 7.2, "HKD": 1 / 7.8, "TWD": 1 / 32}
+
+
+def _fixture_path(kind, ticker, period):
+    return YFINANCE_DIR / kind / f"{ticker}_{period}.csv"
+
+
+def _synthetic_ohlcv(ticker, period):
+    """티커별로 항상 같은 값이 나오는 기하 브라운 운동 시세."""
+    n = _PERIOD_DAYS.get(period, 252)
+    rng = np.random.default_rng(zlib.crc32(f"{ticker}:{period}".encode()))
+    index = pd.bdate_range(end=_SYNTHETIC_END, periods=n, name="Date")
+    start = rng.uniform(20, 800)
+    returns = rng.normal(0.0004, 0.018, n)
+    close = start * np.exp(np.cumsum(returns))
+    open_ = close * (1 + rng.normal(0, 0.004, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.006, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.006, n)))
+    volume = rng.integers(5_000_000, 80_000_000, n)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+        index=index,
+    )
+
+
+def _read_recorded(path):
+    df = pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index, utc=True)
+    df.index.name = "Date"
+    return df
+
+
+def has_recorded(ticker, period="1y"):
+    return _fixture_path("history", ticker, period).exists()
+
+
+def fixture_history(ticker, period="1y"):
+    """yf.Ticker(ticker).history(period) 대역."""
+    path = _fixture_path("history", ticker, period)
+    if path.exists():
+        df = _read_recorded(path)
+        df.index = df.index.tz_convert("America/New_York")
+        return df
+    df = _synthetic_ohlcv(ticker, period)
+    df.index = df.index.tz_localize("America/New_York")
+    df["Dividends"] = 0.0
+    df["Stock Splits"] = 0.0
+    return df
+
+
+def fixture_download(ticker, period="1y"):
+    """yf.download(ticker, period, auto_adjust=False) 대역 ('Adj Close' 포함)."""
+    path = _fixture_path("download", ticker, period)
+    if path.exists():
+        df = _read_recorded(path)
+        df.index = df.index.tz_localize(None)
+        return df
+    df = _synthetic_ohlcv(ticker, period)
+    df.insert(4, "Adj Close", df["Close"] * 0.99)
+    return df
+
+
+def fixture_closes(tickers, period="5d"):
+    """yf.download(tickers, period)["Close"] 의 마지막 종가 대역 (stock_closes)."""
+    return pd.Series({ticker: fixture_history(ticker, "1mo")["Close"].iloc[-1] for ticker in tickers})
+
+
+def fixture_fx_rates(currencies, period="1y"):
+    """fx.update_rates 대역 (fx_rates). 날짜 × 통화의 일정한 환율."""
+    index = pd.bdate_range(end=_SYNTHETIC_END, periods=_PERIOD_DAYS.get(period, 252))
+    return pd.DataFrame({currency: _SYNTHETIC_FX.get(currency, np.nan) for currency in currencies}, index=index)
+
+
+def record_yfinance(tickers=TICKERS, period="1y"):
+    """실제 yfinance 응답을 fixtures 폴더에 CSV 로 저장합니다 (네트워크 필요)."""
+    import yfinance as yf
+
+    for kind in ("history", "download"):
+        (YFINANCE_DIR / kind).mkdir(parents=True, exist_ok=True)
+    for ticker in tickers:
+        yf.Ticker(ticker).history(period=period).to_csv(_fixture_path("history", ticker, period))
+        yf.download(
+            ticker, period=period, progress=False, auto_adjust=False, multi_level_index=False,
+        ).to_csv(_fixture_path("download", ticker, period))
+
+
+def make_task_sheet(n_children=30, n_days=200, seed=0):
+    """'다했어요' 시트와 같은 모양(이름, 완료시간, 등록일)의 기록."""
+    rng = np.random.default_rng(seed)
+    names = [f"학생{i:02d}" for i in range(1, n_children + 1)]
+    days = pd.date_range(end=_SYNTHETIC_END, periods=n_days, freq="D")
+    rows = []
+    for day in days:
+        for name in names:
+            if rng.random() < 0.7:
+                ts = day + pd.Timedelta(minutes=int(rng.integers(8 * 60, 17 * 60)))
+                rows.append((name, ts.strftime("%Y-%m-%d %H:%M:%S"), ts.strftime("%Y-%m-%d")))
+    return pd.DataFrame(rows, columns=["이름", "완료시간", "등록일"])
+
+
+class FakeGSheetsConnection(BaseConnection):
+    """GSheetsConnection 의 read/update 만 흉내 내는 메모리 연결."""
+
+    def _connect(self, **kwargs):
+        return {"시트1": make_task_sheet()}
+
+    def read(self, worksheet="시트1", ttl=None, **kwargs):
+        return self._instance.get(worksheet, pd.DataFrame()).copy()
+
+    def update(self, worksheet="시트1", data=None, **kwargs):
+        self._instance[worksheet] = data.copy()
+        return data
+
+
+def install():
+    """데이터셋 로더와 구글 시트 연결을 오프라인 대역으로 바꿉니다."""
+    import streamlit_gsheets
+
+    datasets.register("stock_history", ttl=3600, schema=datasets.STOCK_SCHEMA)(fixture_history)
+    datasets.register("stock_download", ttl=3600, schema=datasets.STOCK_SCHEMA)(fixture_download)
+    datasets.register("stock_closes", ttl=3600)(fixture_closes)
+    datasets.register("fx_rates", ttl=3600)(fixture_fx_rates)
+    streamlit_gsheets.GSheetsConnection = FakeGSheetsConnection
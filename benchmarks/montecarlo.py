@@ -0,0 +1,90 @@
+"""몬테카를로 위험 분석(databack.risk) 벤치마크.
+
+주식 페이지 상위 종목의 오프라인 시세(fixtures)로 수익률 행렬을 만들고,
+경로 생성 방법 × 프로세스 수마다 초당 경로 수를 잽니다. 시드를 고정하므로 매번 같은 경로를 만듭니다.
+
+    python -m benchmarks.montecarlo
+    python -m benchmarks.montecarlo --paths 200000 --workers 1 4 --output mc.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.run import RESULTS_DIR, _git_commit
+
+
+def returns_fixture(n_assets=10, period="5y"):
+    import pandas as pd
+
+    from benchmarks import fixtures
+    from databack import portfolio
+
+    prices = pd.DataFrame({t: fixtures.fixture_history(t, period)["Close"] for t in fixtures.TICKERS[:n_assets]})
+    return portfolio.returns_matrix(prices)
+
+
+def bench(returns, method, n_paths, horizon, workers, repeat):
+    from databack import risk
+
+    weights = [1 / returns.shape[1]] * returns.shape[1]
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        paths = risk.simulate(returns, weights, horizon=horizon, n_paths=n_paths, method=method, seed=0, workers=workers)
+        seconds.append(time.perf_counter() - started)
+    table = risk.var_cvar(paths)
+    return {
+        "method": method,
+        "workers": workers,
+        "n_paths": n_paths,
+        "horizon": horizon,
+        "n_assets": returns.shape[1],
+        "median_s": statistics.median(seconds),
+        "paths_per_s": n_paths / statistics.median(seconds),
+        "var_95": float(table["var"].iloc[0]),
+        "cvar_95": float(table["cvar"].iloc[0]),
+    }
+
+
+def main(argv=None):
+    from databack import risk
+
+    parser = argparse.ArgumentParser(description="몬테카를로 VaR 초당 경로 수 벤치마크")
+    parser.add_argument("--paths", type=int, default=100_000, help="경로 수")
+    parser.add_argument("--horizon", type=int, default=10, help="보유 기간 (거래일)")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, min(4, os.cpu_count() or 1)}))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/montecarlo_<시각>_<커밋>.json)")
+    args = parser.parse_args(argv)
+
+    returns = returns_fixture()
+    results = []
+    for method in risk.METHODS:
+        for workers in args.workers:
+            result = bench(returns, method, args.paths, args.horizon, workers, args.repeat)
+            results.append(result)
+            print(
+                f"{method:10} workers={workers}: {result['paths_per_s']:,.0f} paths/s "
+                f"({result['median_s'] * 1000:.0f} ms), VaR95 {result['var_95']:.4f}, CVaR95 {result['cvar_95']:.4f}",
+                flush=True,
+            )
+
+    report = {
+        "meta": {"commit": _git_commit(), "timestamp": datetime.now().isoformat(timespec="seconds"), "cpus": os.cpu_count()},
+        "montecarlo": results,
+    }
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"montecarlo_{datetime.now():%Y%m%d-%H%M%S}_{report['meta']['commit'] or 'local'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""페이지별 벤치마크 실행기.
+
+각 페이지를 Streamlit AppTest 로 화면 없이 실행하면서
+- cold: 데이터 캐시를 모두 비운 뒤 첫 실행 시간
+- warm: 같은 세션에서 다시 실행(rerun)하는 시간 (중앙값/최솟값)
+- peak memory: cold 실행 동안 tracemalloc 으로 잰 최대 할당량
+을 재고, 결과를 JSON 으로 저장해 커밋 간에 비교할 수 있게 합니다.
+import 시간은 databack.startup_profile 이 따로 잽니다.
+
+    python -m benchmarks.run                         # 전체 페이지
+    python -m benchmarks.run pages/piramid.py --warm 10
+    python -m benchmarks.run --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# 북마크 페이지(main.py)가 저장소의 bookmarks.db 를 건드리지 않도록 임시 파일을 씁니다.
+# (databack.bookmark_store 를 import 하기 전에 설정해야 함)
+os.environ.setdefault("DATABACK_BOOKMARKS_DB", str(Path(tempfile.mkdtemp()) / "bookmarks.db"))
+
+
+def default_pages():
+    return [ROOT / "main.py", *sorted((ROOT / "pages").glob("*.py"))]
+
+
+def clear_caches():
+    import streamlit as st
+    from databack import datasets, figures, jobs
+
+    datasets.invalidate()
+    figures.invalidate()
+    jobs.runner.invalidate()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def _run(at):
+    started = time.perf_counter()
+    at.run()
+    return (time.perf_counter() - started) * 1000
+
+
+def bench_page(page, warm_runs=5, timeout=120):
+    """페이지 하나의 cold/warm 실행 시간과 최대 메모리를 잽니다."""
+    from streamlit.testing.v1 import AppTest
+
+    clear_caches()
+    at = AppTest.from_file(str(page), default_timeout=timeout)
+    cold_ms = _run(at)
+    exceptions = [e.message for e in at.exception]
+    warm = [_run(at) for _ in range(warm_runs)]
+
+    # 메모리는 tracemalloc 때문에 느려지므로 시간 측정과 따로 한 번 더 실행합니다.
+    clear_caches()
+    at = AppTest.from_file(str(page), default_timeout=timeout)
+    tracemalloc.start()
+    try:
+        at.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "page": str(Path(page).resolve().relative_to(ROOT)),
+        "cold_ms": cold_ms,
+        "warm_median_ms": statistics.median(warm) if warm else None,
+        "warm_min_ms": min(warm) if warm else None,
+        "warm_runs": warm_runs,
+        "peak_mem_mb": peak / (1024 * 1024),
+        "exceptions": exceptions,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(pages, warm_runs=5):
+    from benchmarks import fixtures
+
+    fixtures.install()
+    recorded = [t for t in fixtures.TICKERS if fixtures.has_recorded(t)]
+    results = []
+    for page in pages:
+        result = bench_page(page, warm_runs=warm_runs)
+        results.append(result)
+        status = "오류" if result["exceptions"] else "ok"
+        print(
+            f"{result['page']}: cold {result['cold_ms']:.0f} ms, "
+            f"warm {result['warm_median_ms']:.0f} ms, peak {result['peak_mem_mb']:.1f} MB [{status}]",
+            flush=True,
+        )
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "yfinance_fixtures": "recorded" if len(recorded) == len(fixtures.TICKERS)
+            else f"synthetic ({len(recorded)}/{len(fixtures.TICKERS)} recorded)",
+        },
+        "pages": results,
+    }
+
+
+def compare(base_path, new_path):
+    """두 결과 파일의 페이지별 변화율을 출력합니다."""
+    with open(base_path, encoding="utf-8") as f:
+        base = {r["page"]: r for r in json.load(f)["pages"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {r["page"]: r for r in json.load(f)["pages"]}
+
+    print(f"{'page':40} {'cold':>16} {'warm':>16} {'peak MB':>16}")
+    for page, result in new.items():
+        old = base.get(page)
+        if old is None:
+            continue
+        cells = []
+        for metric in ("cold_ms", "warm_median_ms", "peak_mem_mb"):
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                cells.append(f"{'-':>16}")
+            else:
+                cells.append(f"{after:8.1f} ({(after - before) / before * 100:+5.1f}%)")
+        print(f"{page:40} " + " ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 오프라인 벤치마크")
+    parser.add_argument("pages", nargs="*", help="측정할 페이지 (기본: main.py + pages/*.py)")
+    parser.add_argument("--warm", type=int, default=5, help="warm rerun 횟수")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--record-yfinance", action="store_true", help="실제 yfinance 응답을 fixture 로 기록")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.record_yfinance:
+        from benchmarks import fixtures
+
+        fixtures.record_yfinance()
+        return
+
+    pages = [Path(p).resolve() for p in args.pages] or default_pages()
+    report = run(pages, warm_runs=args.warm)
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}_{report['meta']['commit'] or 'local'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
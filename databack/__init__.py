@@ -0,0 +1,5 @@
+"""databack 페이지들이 함께 쓰는 공용 모듈 모음.
+
+Streamlit은 pages/ 폴더의 모든 .py 파일을 페이지로 등록하므로,
+여러 페이지에서 재사용하는 코드는 이 패키지에 둡니다.
+"""
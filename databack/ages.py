@@ -0,0 +1,152 @@
+"""행정구역별 연령 누적합(prefix sum)으로 연령대 인구와 인구 지표 계산.
+
+연령별 인구 현황(0세 ~ 100세 이상, 101개 컬럼)을 행정구역 × 나이 정수 배열로 한 번 바꾸고
+나이 방향 누적합을 만들어 두면, 어떤 연령대(lo~hi세)의 인구도 누적합 두 값의 차이로 바로 구할 수 있습니다.
+(연령대 폭과 관계없이 한 번의 뺄셈, 모든 행정구역을 한꺼번에)
+
+    table = AgeTable.from_population(datasets.load("population"))
+    table.bands([(0, 5), (6, 21), (22, 64), (65, None)])   # 행정구역 × 연령대 인구
+    table.indicators()                                       # 행정구역별 중위연령, 부양비, 고령화지수 ...
+
+연령대는 (처음 나이, 끝 나이) 이고 끝 나이를 포함합니다. 끝이 None 이면 "이상"(100세 이상까지)입니다.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+MAX_AGE = 100  # 마지막 컬럼은 "100세 이상"
+
+_AGE_COLUMN = re.compile(r"^(?P<prefix>.*_계_)(?P<age>\d+)세(?P<plus> 이상)?$")
+_REGION_CODE = re.compile(r"\s*\((\d+)\)\s*$")
+
+
+def uniform_bands(width):
+    """width 살 간격의 연령대 목록. 마지막은 '100세 이상' 입니다. (예: 10 → 0~9, 10~19, ..., 90~99, 100세 이상)"""
+    return [(lo, min(lo + width, MAX_AGE) - 1) for lo in range(0, MAX_AGE, width)] + [(MAX_AGE, None)]
+
+
+def parse_bands(text):
+    """'0-5, 6-21, 22-64, 65-' 형식의 글을 연령대 목록으로 바꿉니다. 형식이 틀리면 ValueError."""
+    bands = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        match = re.fullmatch(r"(\d+)-(\d*)", part)
+        if match is None:
+            raise ValueError(f"'{part}' 는 '처음-끝' (예: 6-21, 65-) 형식이 아닙니다.")
+        lo = int(match.group(1))
+        hi = int(match.group(2)) if match.group(2) else None
+        if lo > MAX_AGE or (hi is not None and (hi < lo or hi > MAX_AGE)):
+            raise ValueError(f"'{part}' 의 나이 범위가 올바르지 않습니다. (0~{MAX_AGE}세, 처음 ≤ 끝)")
+        bands.append((lo, hi))
+    if not bands:
+        raise ValueError("연령대를 하나 이상 입력하세요.")
+    return bands
+
+
+def band_label(band):
+    lo, hi = band
+    if hi is None or (hi >= MAX_AGE and lo < MAX_AGE):
+        return f"{lo}세 이상"
+    return f"{lo}세" if lo == hi else f"{lo}~{hi}세"
+
+
+class AgeTable:
+    """행정구역 × 나이(0~100세 이상) 인구와 그 누적합."""
+
+    def __init__(self, regions, codes, counts, month=""):
+        self.regions = list(regions)
+        self.codes = list(codes)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        # prefix[:, a] = a세 미만 인구 (prefix[:, 0] = 0, prefix[:, -1] = 총인구)
+        self.prefix = np.zeros((len(self.counts), MAX_AGE + 2), dtype=np.int64)
+        np.cumsum(self.counts, axis=1, out=self.prefix[:, 1:])
+        self.month = month
+        self._indicators = None
+
+    @classmethod
+    def from_population(cls, df):
+        """연령별 인구 현황 표(행정구역 + '..._계_0세' ~ '..._계_100세 이상' 컬럼)로 만듭니다."""
+        ages = {}
+        prefix = ""
+        for column in df.columns:
+            match = _AGE_COLUMN.match(str(column))
+            if match:
+                ages[int(match.group("age"))] = column
+                prefix = match.group("prefix")
+        missing = [age for age in range(MAX_AGE + 1) if age not in ages]
+        if missing:
+            raise ValueError(f"연령 컬럼이 없습니다: {missing[:5]}...")
+        columns = [ages[age] for age in range(MAX_AGE + 1)]
+        counts = df[columns].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+        names = df["행정구역"].astype(str)
+        codes = names.str.extract(_REGION_CODE, expand=False)
+        regions = names.str.replace(_REGION_CODE, "", regex=True).str.strip()
+        return cls(regions, codes, counts, month=prefix.split("_")[0])
+
+    def __len__(self):
+        return len(self.counts)
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        return self.counts.nbytes + self.prefix.nbytes + sum(len(name) * 3 for name in self.regions)
+
+    @property
+    def total(self):
+        return self.prefix[:, -1]
+
+    def band(self, lo, hi=None):
+        """lo~hi세(끝 포함, hi=None 이면 lo세 이상) 인구. 길이 = 행정구역 수."""
+        hi = MAX_AGE if hi is None else min(hi, MAX_AGE)
+        return self.prefix[:, hi + 1] - self.prefix[:, lo]
+
+    def bands(self, bands):
+        """연령대 목록의 인구. 행정구역 × 연령대 배열 (모든 연령대를 한 번의 배열 뺄셈으로)."""
+        lo = np.array([band[0] for band in bands])
+        hi = np.array([MAX_AGE if band[1] is None else min(band[1], MAX_AGE) for band in bands])
+        return self.prefix[:, hi + 1] - self.prefix[:, lo]
+
+    def band_frame(self, bands):
+        """bands() 결과를 행정구역 × 연령대 이름 DataFrame 으로."""
+        return pd.DataFrame(self.bands(bands), index=self.regions, columns=[band_label(band) for band in bands])
+
+    def median_age(self):
+        """행정구역별 중위연령. 나이 안에서는 인구가 고르게 퍼져 있다고 보고 보간합니다."""
+        half = self.total / 2
+        rows = np.arange(len(self))
+        age = (self.prefix[:, 1:] >= half[:, None]).argmax(axis=1)
+        below = self.prefix[rows, age]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            median = age + (half - below) / self.counts[rows, age]
+        return np.where(self.total > 0, median, np.nan)
+
+    def indicators(self):
+        """모든 행정구역의 인구 지표 (배열 연산 한 번).
+
+        유소년 0~14세, 생산가능 15~64세, 고령 65세 이상 기준.
+        부양비 = (유소년 + 고령) / 생산가능 × 100, 고령화지수 = 고령 / 유소년 × 100
+        한 번 계산한 표를 다시 돌려주므로 바꿔야 한다면 먼저 .copy() 하세요.
+        """
+        if self._indicators is None:
+            self._indicators = self._compute_indicators()
+        return self._indicators
+
+    def _compute_indicators(self):
+        young, working, old = self.bands([(0, 14), (15, 64), (65, None)]).T.astype(float)
+        total = self.total.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame({
+                "행정구역": self.regions,
+                "총인구": self.total,
+                "중위연령": self.median_age(),
+                "유소년인구": young.astype(np.int64),
+                "생산가능인구": working.astype(np.int64),
+                "고령인구": old.astype(np.int64),
+                "고령인구비율": old / total * 100,
+                "총부양비": (young + old) / working * 100,
+                "유소년부양비": young / working * 100,
+                "노년부양비": old / working * 100,
+                "고령화지수": old / young * 100,
+            })
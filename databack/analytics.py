@@ -0,0 +1,74 @@
+"""페이지에서 쓰는 무거운 계산 함수.
+
+작업 큐(databack.jobs)가 별도 프로세스에서 실행할 수 있도록
+모두 모듈 최상위 함수이고, 인자와 반환값은 pickle 가능한 값(DataFrame 등)만 씁니다.
+Streamlit 은 import 하지 않습니다.
+"""
+import pandas as pd
+
+
+def age_pyramid_table(df, region="서울특별시", month_prefix="2025년04월_계_"):
+    """연령별 인구 현황에서 region 의 연령별 인구 피라미드용 표를 만듭니다.
+
+    반환 컬럼: 행정구역, 연령_원문, 총인구수, 연령, 연령_정렬_값, 남성인구수, 여성인구수, 남성인구수_음수
+    """
+    # '행정구역' 컬럼에서 region 데이터만 필터링
+    region_df = df[df['행정구역'].str.contains(region)].copy()
+
+    # '총인구수'와 '연령구간인구수' 컬럼은 melt 대상이 아니므로 제거
+    columns_to_drop = [col for col in region_df.columns if '총인구수' in col or '연령구간인구수' in col]
+    region_age_df = region_df.drop(columns=columns_to_drop, errors='ignore')
+
+    # 연령별 인구수 컬럼들을 녹여서 '연령'과 '인구수' 컬럼 생성
+    value_vars_cols = [col for col in region_age_df.columns if col.startswith(month_prefix)]
+
+    melted = region_age_df.melt(
+        id_vars=['행정구역'],
+        value_vars=value_vars_cols,
+        var_name='연령_원문',
+        value_name='총인구수'
+    )
+
+    # 숫자로 변환할 수 없는 값은 NaN 으로 처리한 뒤 0으로 채우기
+    melted['총인구수'] = pd.to_numeric(melted['총인구수'], errors='coerce').fillna(0)
+
+    # '연령_원문' 컬럼에서 불필요한 prefix 제거 및 정수형으로 변환 가능한 형태로 정리
+    melted['연령'] = melted['연령_원문'].str.replace(month_prefix, '').str.replace('세', '').str.replace(' 이상', '+')
+
+    # 연령대 정렬을 위한 임시 컬럼 생성 후 정렬
+    melted['연령_정렬_값'] = melted['연령'].apply(lambda x: int(x.replace('+', '1000')) if '+' in x else int(x))
+    melted = melted.sort_values(by='연령_정렬_값', ascending=True)
+
+    # 인구 피라미드 시각화를 위해 남녀 인구수 컬럼 생성 (가상의 비율 적용)
+    melted['남성인구수'] = melted['총인구수'] * 0.49
+    melted['여성인구수'] = melted['총인구수'] * 0.51
+
+    # 남성 인구수를 음수로 만들어 피라미드 형태로 표시
+    melted['남성인구수_음수'] = -melted['남성인구수']
+    return melted
+
+
+def age_pyramid_from_counts(region, counts):
+    """행정구역 하나의 나이별 인구(0세 ~ 100세 이상, 101개)로 age_pyramid_table 과 같은 컬럼의 표를 만듭니다.
+
+    databack.ages.AgeTable 의 counts 한 줄을 그대로 쓰므로 원본 표를 다시 거르거나 녹이지 않습니다.
+    """
+    ages = list(range(len(counts)))
+    labels = [str(age) for age in ages[:-1]] + [f"{ages[-1]}+"]
+    melted = pd.DataFrame({
+        '행정구역': region,
+        '총인구수': pd.Series(counts, dtype='int64'),
+        '연령': labels,
+        '연령_정렬_값': ages[:-1] + [int(labels[-1].replace('+', '1000'))],
+    })
+    melted['남성인구수'] = melted['총인구수'] * 0.49
+    melted['여성인구수'] = melted['총인구수'] * 0.51
+    melted['남성인구수_음수'] = -melted['남성인구수']
+    return melted
+
+
+def correlation_matrix(prices, dropna=False):
+    """종목별 가격(열)의 상관관계 행렬. dropna=True 면 결측값이 있는 날짜를 먼저 뺍니다."""
+    if dropna:
+        prices = prices.dropna()
+    return prices.corr()
@@ -0,0 +1,231 @@
+"""SQLite 기반 북마크 저장소.
+
+세션이 끝나도 장소가 남도록 파일(SQLite)에 저장하고,
+SQLite 내장 R*Tree 공간 색인으로 경계 상자 / 최근접 장소 질의를 처리합니다.
+대량의 장소는 CSV 를 한 줄씩 읽으며 배치 단위로 넣고,
+좌표가 비어 있는 행은 배치마다 한 번에 지오코딩합니다.
+"""
+import csv
+import io
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# 저장 위치는 환경 변수로 바꿀 수 있습니다 (벤치마크/테스트에서 임시 파일 사용).
+DEFAULT_DB_PATH = Path(os.environ.get(
+    "DATABACK_BOOKMARKS_DB", Path(__file__).resolve().parent.parent / "bookmarks.db"
+))
+
+# CSV 헤더로 허용하는 이름들
+NAME_COLUMNS = ("장소 이름", "장소", "이름", "name", "place")
+LAT_COLUMNS = ("위도", "lat", "latitude")
+LON_COLUMNS = ("경도", "lon", "lng", "longitude")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_rtree USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon
+);
+"""
+
+_KM_PER_DEG = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 지점 사이의 대원 거리(km)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _pick_column(fieldnames, candidates):
+    lowered = {name.strip().lower(): name for name in fieldnames or []}
+    for candidate in candidates:
+        if candidate.lower() in lowered:
+            return lowered[candidate.lower()]
+    return None
+
+
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class BookmarkStore:
+    """장소 북마크를 SQLite 파일에 저장하고 공간 질의를 제공합니다."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = str(path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Streamlit 은 세션마다 다른 스레드에서 실행되므로 작업마다 연결을 새로 엽니다.
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert_many(conn, rows):
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for name, lat, lon in rows:
+            cur = conn.execute(
+                "INSERT INTO places (name, lat, lon, created_at) VALUES (?, ?, ?, ?)",
+                (name, lat, lon, created_at),
+            )
+            conn.execute(
+                "INSERT INTO places_rtree VALUES (?, ?, ?, ?, ?)",
+                (cur.lastrowid, lat, lat, lon, lon),
+            )
+
+    def add(self, name, lat, lon):
+        """장소 하나를 추가합니다."""
+        with self._connect() as conn:
+            self._insert_many(conn, [(name, float(lat), float(lon))])
+
+    def add_many(self, rows):
+        """(이름, 위도, 경도) 여러 개를 한 트랜잭션으로 추가합니다."""
+        rows = [(name, float(lat), float(lon)) for name, lat, lon in rows]
+        with self._connect() as conn:
+            self._insert_many(conn, rows)
+        return len(rows)
+
+    def clear(self):
+        """모든 장소를 삭제합니다."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM places")
+            conn.execute("DELETE FROM places_rtree")
+
+    def revision(self):
+        """저장 내용이 바뀌었는지 확인하기 위한 (개수, 마지막 id)."""
+        with self._connect() as conn:
+            return tuple(conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM places").fetchone())
+
+    def all(self):
+        """저장된 모든 장소를 (이름, 위도, 경도) 목록으로 반환합니다."""
+        with self._connect() as conn:
+            return conn.execute("SELECT name, lat, lon FROM places ORDER BY id").fetchall()
+
+    def query_bbox(self, south, west, north, east):
+        """경계 상자 안의 장소를 R*Tree 색인으로 찾습니다."""
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT p.name, p.lat, p.lon
+                FROM places_rtree r JOIN places p ON p.id = r.id
+                WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ?
+                ORDER BY p.id
+                """,
+                (south, north, west, east),
+            ).fetchall()
+
+    def nearest(self, lat, lon, k=5):
+        """(lat, lon) 에서 가까운 장소 k 개를 (이름, 위도, 경도, 거리 km) 로 반환합니다.
+
+        작은 상자부터 시작해 R*Tree 로 후보를 찾고, k 번째 거리가
+        상자 안에서 보장되는 반경보다 크면 상자를 두 배씩 넓힙니다.
+        상자가 경도 ±180 을 넘거나 극에 닿으면(날짜변경선에서 상자가 이어지지 않음) 모든 장소를 비교합니다.
+        """
+        radius = 0.05  # 도(degree)
+        while True:
+            covers_all = lon - radius < -180 or lon + radius > 180 or abs(lat) + radius >= 90
+            if covers_all:
+                candidates = self.all()
+            else:
+                candidates = self.query_bbox(lat - radius, lon - radius, lat + radius, lon + radius)
+            if len(candidates) >= k or covers_all:
+                ranked = sorted(
+                    ((name, p_lat, p_lon, haversine_km(lat, lon, p_lat, p_lon))
+                     for name, p_lat, p_lon in candidates),
+                    key=lambda row: row[3],
+                )[:k]
+                # 상자 안에서 확실히 포함되는 반경(km): 경도 방향은 위도가 높을수록 좁아짐
+                max_abs_lat = min(abs(lat) + radius, 90.0)
+                safe_km = radius * _KM_PER_DEG * math.cos(math.radians(max_abs_lat))
+                if covers_all or (ranked and ranked[-1][3] <= safe_km):
+                    return ranked
+            radius *= 2
+
+    def import_csv(self, file, geocode=None, batch_size=500, encoding="utf-8-sig"):
+        """CSV 를 스트리밍으로 읽어 배치 단위로 저장합니다.
+
+        file 은 경로 또는 바이너리/텍스트 파일 객체입니다.
+        위도/경도가 비어 있는 행은 배치마다 geocode(이름 목록) -> [(위도, 경도) 또는 None]
+        를 한 번 호출해 채웁니다. 처리 결과를 요약한 dict 를 반환합니다.
+        """
+        summary = {"inserted": 0, "geocoded": 0, "skipped": 0}
+
+        def flush(batch, missing):
+            if missing and geocode is not None:
+                results = geocode(list(missing))
+                for name, coords in zip(missing, results):
+                    if coords and None not in coords:
+                        batch.append((name, coords[0], coords[1]))
+                        summary["geocoded"] += 1
+                    else:
+                        summary["skipped"] += 1
+            else:
+                summary["skipped"] += len(missing)
+            if batch:
+                with self._connect() as conn:
+                    self._insert_many(conn, batch)
+                summary["inserted"] += len(batch)
+
+        with _open_text(file, encoding) as f:
+            reader = csv.DictReader(f)
+            name_col = _pick_column(reader.fieldnames, NAME_COLUMNS)
+            lat_col = _pick_column(reader.fieldnames, LAT_COLUMNS)
+            lon_col = _pick_column(reader.fieldnames, LON_COLUMNS)
+            if name_col is None:
+                raise ValueError(f"CSV 에 장소 이름 컬럼({', '.join(NAME_COLUMNS)})이 없습니다.")
+
+            batch, missing = [], []
+            for row in reader:
+                name = (row.get(name_col) or "").strip()
+                if not name:
+                    summary["skipped"] += 1
+                    continue
+                lat = _to_float(row.get(lat_col)) if lat_col else None
+                lon = _to_float(row.get(lon_col)) if lon_col else None
+                if lat is None or lon is None:
+                    missing.append(name)
+                else:
+                    batch.append((name, lat, lon))
+                if len(batch) + len(missing) >= batch_size:
+                    flush(batch, missing)
+                    batch, missing = [], []
+            flush(batch, missing)
+        return summary
+
+
+@contextmanager
+def _open_text(file, encoding):
+    if isinstance(file, (str, Path)):
+        with open(file, encoding=encoding, newline="") as f:
+            yield f
+    elif isinstance(file, io.TextIOBase):
+        yield file
+    else:
+        # 업로드된 파일 같은 바이너리 객체는 디코딩하며 한 줄씩 읽습니다.
+        wrapper = io.TextIOWrapper(file, encoding=encoding, newline="")
+        try:
+            yield wrapper
+        finally:
+            wrapper.detach()
@@ -0,0 +1,138 @@
+"""북마크 지도 레이어.
+
+장소가 수천 개가 되어도 지도가 느려지지 않도록
+- 위도/경도 격자(grid) 공간 색인으로 현재 화면(viewport) 안의 장소만 고르고
+- 브라우저에서 클러스터링하는 FastMarkerCluster 한 개로 마커를 그리며
+- 장소 목록과 화면 범위가 바뀌지 않았으면 이전에 만든 레이어를 그대로 재사용합니다.
+"""
+import math
+
+# 마커에 장소 이름 툴팁을 붙이는 브라우저 쪽 콜백 (row = [위도, 경도, 이름])
+_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindTooltip(row[2]);
+    return marker;
+}
+"""
+
+
+class GridIndex:
+    """위도/경도를 cell_deg 도 단위 격자로 나눈 간단한 공간 색인."""
+
+    def __init__(self, points, cell_deg=0.5):
+        # points: (이름, 위도, 경도) 목록
+        self.points = list(points)
+        self.cell_deg = cell_deg
+        self._cells = {}
+        for i, (_, lat, lon) in enumerate(self.points):
+            self._cells.setdefault(self._cell(lat, lon), []).append(i)
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def query_bbox(self, south, west, north, east):
+        """경계 상자 안에 있는 점들의 인덱스를 반환합니다."""
+        row0, col0 = self._cell(south, west)
+        row1, col1 = self._cell(north, east)
+        n_cells = (row1 - row0 + 1) * (col1 - col0 + 1)
+
+        # 화면이 넓어 훑어야 할 격자 칸이 실제로 채워진 칸보다 많으면,
+        # 채워진 칸만 돌면서 범위에 드는지 확인하는 편이 더 빠릅니다.
+        if n_cells > len(self._cells):
+            cells = [
+                idx for (row, col), idx in self._cells.items()
+                if row0 <= row <= row1 and col0 <= col <= col1
+            ]
+        else:
+            cells = [
+                self._cells[(row, col)]
+                for row in range(row0, row1 + 1)
+                for col in range(col0, col1 + 1)
+                if (row, col) in self._cells
+            ]
+
+        found = []
+        for idx in cells:
+            for i in idx:
+                _, lat, lon = self.points[i]
+                if south <= lat <= north and west <= lon <= east:
+                    found.append(i)
+        return sorted(found)
+
+
+def places_fingerprint(places):
+    """장소 목록이 바뀌었는지 빠르게 비교하기 위한 지문."""
+    return len(places), hash(tuple(tuple(p) for p in places))
+
+
+def bounds_from_st_folium(bounds):
+    """st_folium 이 돌려준 bounds 를 (남, 서, 북, 동) 튜플로 바꿉니다."""
+    try:
+        south_west, north_east = bounds["_southWest"], bounds["_northEast"]
+        south, west = south_west["lat"], south_west["lng"]
+        north, east = north_east["lat"], north_east["lng"]
+    except (KeyError, TypeError):
+        return None
+    if None in (south, west, north, east):
+        return None
+    return (max(south, -90.0), max(west, -180.0), min(north, 90.0), min(east, 180.0))
+
+
+class BookmarkLayer:
+    """세션마다 하나씩 두고 재사용하는 북마크 마커 레이어."""
+
+    def __init__(self, cell_deg=0.5, name="북마크"):
+        self.cell_deg = cell_deg
+        self.name = name
+        self._fingerprint = None
+        self._index = GridIndex([], cell_deg)
+        self._layer_key = None
+        self._layer = None
+
+    def update(self, places):
+        """장소 목록이 바뀐 경우에만 색인을 다시 만듭니다. 다시 만들었으면 True."""
+        fingerprint = places_fingerprint(places)
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        self._index = GridIndex(places, self.cell_deg)
+        self._layer_key = None
+        return True
+
+    def _viewport_key(self, bounds):
+        # 화면 범위를 격자 칸 단위로 바깥쪽으로 맞추고 한 칸씩 여유를 둡니다.
+        # 조금 움직인 정도로는 키가 바뀌지 않아 레이어를 다시 만들지 않습니다.
+        if bounds is None:
+            return None
+        south, west, north, east = bounds
+        step = self.cell_deg
+        return (
+            (math.floor(south / step) - 1) * step,
+            (math.floor(west / step) - 1) * step,
+            (math.ceil(north / step) + 1) * step,
+            (math.ceil(east / step) + 1) * step,
+        )
+
+    def visible(self, bounds=None):
+        """화면 범위 안에 있는 장소 목록. bounds 가 없으면 전체를 반환합니다."""
+        key = self._viewport_key(bounds)
+        if key is None:
+            return self._index.points
+        return [self._index.points[i] for i in self._index.query_bbox(*key)]
+
+    def feature_group(self, bounds=None):
+        """화면 안의 장소만 담은 FeatureGroup. 변화가 없으면 이전 객체를 재사용합니다."""
+        key = (self._fingerprint, self._viewport_key(bounds))
+        if key != self._layer_key or self._layer is None:
+            import folium
+            from folium.plugins import FastMarkerCluster
+
+            data = [[lat, lon, name] for name, lat, lon in self.visible(bounds)]
+            layer = folium.FeatureGroup(name=self.name)
+            FastMarkerCluster(data, callback=_MARKER_CALLBACK).add_to(layer)
+            self._layer_key, self._layer = key, layer
+        return self._layer
@@ -0,0 +1,266 @@
+"""크기 제한 LRU + TTL 캐시.
+
+모든 페이지가 하나의 캐시를 함께 쓰기 때문에, 오래 켜 두는 서버에서도
+캐시가 차지하는 메모리가 max_bytes 를 넘지 않습니다.
+
+- LRU: 용량을 넘으면 가장 오래 쓰지 않은 항목부터 버립니다.
+- TTL: 항목마다 만료 시간을 둘 수 있습니다.
+- 지문(fingerprint): 원본 파일의 수정 시각/크기 등이 바뀌면 캐시를 무효화합니다.
+  값 자체의 지문(value_fingerprint)은 차트 캐시와 작업 큐의 키로 씁니다.
+- 통계: 데이터셋별 적중/실패/제거 횟수와 로딩 시간을 기록합니다.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def file_fingerprint(*paths):
+    """파일들의 (수정 시각, 크기) 튜플. 파일이 바뀌면 값이 달라집니다."""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            parts.append((str(path), None, None))
+    return tuple(parts)
+
+
+def _update_hash(h, value):
+    """값 하나를 해시에 더합니다. DataFrame/Series 는 내용 전체를 벡터 연산으로 해시합니다."""
+    if isinstance(value, dict):
+        h.update(b"dict")
+        for key in sorted(value, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(type(value).__name__.encode())
+        for item in value:
+            _update_hash(h, item)
+    elif type(value).__module__.startswith("pandas"):  # DataFrame / Series / Index
+        import pandas as pd
+
+        h.update(type(value).__name__.encode())
+        h.update(repr(getattr(value, "shape", None)).encode())
+        if isinstance(value, pd.DataFrame):
+            h.update(repr(list(value.columns)).encode())
+            h.update(repr(list(value.dtypes)).encode())
+        else:
+            h.update(repr((value.name, value.dtype)).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:  # 셀에 list 같은 해시할 수 없는 값이 있는 경우
+            h.update(pickle.dumps(value))
+    elif hasattr(value, "tobytes") and hasattr(value, "dtype"):  # numpy 배열
+        h.update(repr((value.dtype, value.shape)).encode())
+        h.update(value.tobytes())
+    else:
+        h.update(repr(value).encode())
+
+
+def value_fingerprint(*values):
+    """값(데이터, 옵션)들의 지문(16바이트 해시의 16진 문자열). 내용이 같으면 같은 값이 나옵니다."""
+    h = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update_hash(h, value)
+    return h.hexdigest()
+
+
+def estimate_size(value):
+    """캐시에 담긴 값이 차지하는 메모리(바이트)를 대략 계산합니다."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except TypeError:
+            pass
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "fingerprint", "group")
+
+    def __init__(self, value, size, expires_at, fingerprint, group):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.fingerprint = fingerprint
+        self.group = group
+
+
+class _GroupStats:
+    __slots__ = ("hits", "misses", "evictions", "load_count", "load_seconds", "max_load_seconds")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_count = 0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "loads": self.load_count,
+            "avg_load_ms": self.load_seconds / self.load_count * 1000 if self.load_count else 0.0,
+            "max_load_ms": self.max_load_seconds * 1000,
+        }
+
+
+class LRUCache:
+    """스레드 안전한 크기 제한 LRU 캐시."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {}
+        self._lock = threading.RLock()
+        # 같은 키를 여러 세션이 동시에 요청하면 한 번만 로드하도록 키별 잠금을 둡니다.
+        self._key_locks = {}
+
+    def _group_stats(self, group):
+        stats = self._stats.get(group)
+        if stats is None:
+            stats = self._stats[group] = _GroupStats()
+        return stats
+
+    def _lookup(self, key, fingerprint, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expired = entry.expires_at is not None and now >= entry.expires_at
+        if expired or entry.fingerprint != fingerprint:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _evict(self):
+        while self._entries and (
+            self._bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._group_stats(entry.group).evictions += 1
+
+    def get_or_load(self, key, loader, ttl=None, fingerprint=None, group=None):
+        """캐시에 있으면 반환하고, 없거나 만료/무효화되었으면 loader() 로 채웁니다."""
+        group = group if group is not None else key
+        with self._lock:
+            entry = self._lookup(key, fingerprint, time.monotonic())
+            if entry is not None:
+                self._group_stats(group).hits += 1
+                return entry.value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 잠금을 기다리는 동안 다른 스레드가 이미 로드했을 수 있습니다.
+            with self._lock:
+                entry = self._lookup(key, fingerprint, time.monotonic())
+                if entry is not None:
+                    self._group_stats(group).hits += 1
+                    return entry.value
+
+            started = time.perf_counter()
+            value = loader()
+            elapsed = time.perf_counter() - started
+            size = estimate_size(value)
+
+            with self._lock:
+                stats = self._group_stats(group)
+                stats.misses += 1
+                stats.load_count += 1
+                stats.load_seconds += elapsed
+                stats.max_load_seconds = max(stats.max_load_seconds, elapsed)
+
+                self._remove(key)
+                # 용량보다 큰 값은 캐시하지 않고 그대로 돌려줍니다.
+                if size <= self.max_bytes:
+                    expires_at = time.monotonic() + ttl if ttl is not None else None
+                    self._entries[key] = _Entry(value, size, expires_at, fingerprint, group)
+                    self._bytes += size
+                    self._evict()
+                self._key_locks.pop(key, None)
+            return value
+
+    def get(self, key, fingerprint=None, group=None):
+        """캐시에 있으면 값을, 없으면 None 을 반환합니다. (로드하지 않음)"""
+        group = group if group is not None else key
+        with self._lock:
+            entry = self._lookup(key, fingerprint, time.monotonic())
+            if entry is None:
+                return None
+            self._group_stats(group).hits += 1
+            return entry.value
+
+    def put(self, key, value, ttl=None, fingerprint=None, group=None, load_seconds=None):
+        """값을 직접 캐시에 넣습니다. load_seconds 를 주면 로딩 시간 통계에 더합니다."""
+        group = group if group is not None else key
+        size = estimate_size(value)
+        with self._lock:
+            stats = self._group_stats(group)
+            stats.misses += 1
+            if load_seconds is not None:
+                stats.load_count += 1
+                stats.load_seconds += load_seconds
+                stats.max_load_seconds = max(stats.max_load_seconds, load_seconds)
+            self._remove(key)
+            if size <= self.max_bytes:
+                expires_at = time.monotonic() + ttl if ttl is not None else None
+                self._entries[key] = _Entry(value, size, expires_at, fingerprint, group)
+                self._bytes += size
+                self._evict()
+
+    def keys(self):
+        """지금 캐시에 들어 있는 키 집합."""
+        with self._lock:
+            return set(self._entries)
+
+    def invalidate_key(self, key):
+        """키 하나를 캐시에서 지웁니다."""
+        with self._lock:
+            return self._remove(key) is not None
+
+    def invalidate(self, group=None):
+        """group 에 속한 항목(없으면 전체)을 캐시에서 지웁니다."""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if group is None or e.group == group]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def stats(self):
+        """그룹별 통계와 전체 사용량을 dict 로 반환합니다."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "groups": {group: stats.as_dict() for group, stats in self._stats.items()},
+            }
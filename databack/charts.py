@@ -0,0 +1,177 @@
+"""여러 곳에서 같은 모양으로 그리는 Plotly 차트.
+
+페이지(st.plotly_chart)와 파일 내보내기(databack.export)가 같은 차트를 그리도록
+차트 함수와 그 입력 표를 만드는 집계 함수를 모아 둡니다.
+차트 함수는 쓰는 값을 모두 인자로 받으므로 figures.cached 에 그대로 넘길 수 있습니다.
+
+    fig = figures.cached("pyramid", charts.pyramid_chart, melted)
+
+Streamlit 은 import 하지 않습니다. (별도 프로세스에서 그릴 수 있도록)
+"""
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+# --- 인구 피라미드 (pages/piramid.py) ---
+
+def pyramid_chart(age_melted, title='서울특별시 연령별 인구 피라미드 (2025년 4월)'):
+    """analytics.age_pyramid_table 표로 남(왼쪽)/여(오른쪽) 인구 피라미드를 그립니다."""
+    fig = make_subplots(rows=1, cols=2, specs=[[{}, {}]], shared_yaxes=True,
+                        horizontal_spacing=0.01)
+
+    # 남성 인구 그래프
+    fig.add_trace(
+        go.Bar(
+            y=age_melted['연령'],
+            x=age_melted['남성인구수_음수'],
+            name='남성',
+            orientation='h',
+            marker=dict(color='skyblue')
+        ),
+        row=1, col=1
+    )
+
+    # 여성 인구 그래프
+    fig.add_trace(
+        go.Bar(
+            y=age_melted['연령'],
+            x=age_melted['여성인구수'],
+            name='여성',
+            orientation='h',
+            marker=dict(color='lightcoral')
+        ),
+        row=1, col=2
+    )
+
+    # 눈금은 막대 값마다 하나씩 (남성 쪽은 음수를 양수로 표시)
+    male_ticks = age_melted['남성인구수_음수'].dropna().unique().tolist()
+    ticks = sorted(set(male_ticks + age_melted['여성인구수'].dropna().unique().tolist()))
+
+    # 레이아웃 설정
+    fig.update_layout(
+        title_text=title,
+        title_x=0.5,
+        barmode='overlay',
+        bargap=0.1,
+        height=800,
+        xaxis_title='인구수',
+        yaxis_title='연령',
+        xaxis=dict(
+            tickvals=ticks,
+            ticktext=[f"{abs(x):,}" for x in ticks],
+            range=[min(age_melted['남성인구수_음수']) * 1.1 if not age_melted['남성인구수_음수'].empty else -100,
+                   max(age_melted['여성인구수']) * 1.1 if not age_melted['여성인구수'].empty else 100], # X축 범위 조정
+            showgrid=True,
+            zeroline=False
+        ),
+        yaxis=dict(
+            categoryorder='array',
+            categoryarray=age_melted['연령'].tolist()
+        ),
+        annotations=[
+            dict(
+                x=0.25, y=1.05, xref='paper', yref='paper',
+                text='남성', showarrow=False, font=dict(size=14, color='skyblue')
+            ),
+            dict(
+                x=0.75, y=1.05, xref='paper', yref='paper',
+                text='여성', showarrow=False, font=dict(size=14, color='lightcoral')
+            )
+        ]
+    )
+
+    fig.update_xaxes(
+        tickprefix='',
+        col=1,
+        tickvals=male_ticks,
+        ticktext=[f"{abs(val):,}" for val in male_ticks],
+        title_text='인구수',
+    )
+
+    fig.update_xaxes(
+        col=2,
+        title_text='인구수',
+    )
+
+    return fig
+
+
+# --- 도서 대출 현황 대시보드 (pages/도서대출현황.py) ---
+
+def top_books(df, top_n=20):
+    return df.sort_values(by="대출건수", ascending=False).head(top_n)
+
+
+def yearly_loans(df):
+    return df.groupby("출판년도")["대출건수"].sum().reset_index().sort_values("출판년도")
+
+
+def top_loans_by(df, column, top_n=10):
+    """column(출판사, 저자 등)별 대출 건수 합계 상위 top_n."""
+    totals = df.groupby(column)["대출건수"].sum().reset_index()
+    return totals.sort_values(by="대출건수", ascending=False).head(top_n)
+
+
+def top_books_chart(top_books, top_n):
+    import plotly.express as px
+
+    fig = px.bar(top_books, x="서명", y="대출건수",
+                 hover_data=["저자", "출판사", "출판년도"],
+                 title=f"Top {top_n} 대출 도서",
+                 labels={"서명": "책 제목", "대출건수": "대출 건수"})
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def yearly_chart(yearly):
+    import plotly.express as px
+
+    return px.line(yearly, x="출판년도", y="대출건수",
+                   title="출판년도별 총 대출 건수 추이")
+
+
+def publisher_chart(top_publishers):
+    import plotly.express as px
+
+    return px.bar(top_publishers, x="출판사", y="대출건수",
+                  title="대출 건수 상위 출판사", text="대출건수")
+
+
+def author_chart(top_authors):
+    import plotly.express as px
+
+    return px.bar(top_authors, x="저자", y="대출건수",
+                  title="대출 건수 상위 저자", text="대출건수")
+
+
+def kdc_tree_chart(ids, labels, parents, loans, books, kind="treemap", title="KDC 분류별 대출 건수"):
+    """databack.kdc.KdcTree 배열로 그리는 트리맵/선버스트.
+
+    두 단계까지만 보이고, 칸을 누르면 브라우저에서 바로 그 아래 단계로 들어갑니다. (서버를 다시 실행하지 않음)
+    """
+    trace = go.Treemap if kind == "treemap" else go.Sunburst
+    fig = go.Figure(trace(
+        ids=ids, labels=labels, parents=parents, values=loans, customdata=books,
+        branchvalues="total", maxdepth=2,
+        hovertemplate="%{label}<br>대출 %{value:,}건 (상위 분류의 %{percentParent:.1%})<br>도서 %{customdata:,}권<extra></extra>",
+    ))
+    fig.update_layout(title_text=title, height=600, margin=dict(t=50, l=10, r=10, b=10))
+    return fig
+
+
+def kdc_tree_arrays(tree):
+    """KdcTree → kdc_tree_chart 의 인자 (ids, labels, parents, loans, books)."""
+    return (tree.ids.tolist(), tree.labels.tolist(), tree.parents.tolist(), tree.loans.tolist(), tree.books.tolist())
+
+
+def loan_dashboard(df, top_n=20):
+    """대출 현황 대시보드의 차트 목록: 이름 → (차트 함수, 인자)."""
+    from databack.kdc import KdcTree
+
+    return {
+        "top_books": (top_books_chart, (top_books(df, top_n), top_n)),
+        "yearly": (yearly_chart, (yearly_loans(df),)),
+        "publisher": (publisher_chart, (top_loans_by(df, "출판사"),)),
+        "author": (author_chart, (top_loans_by(df, "저자"),)),
+        "kdc": (kdc_tree_chart, kdc_tree_arrays(KdcTree.from_frame(df))),
+    }
@@ -0,0 +1,366 @@
+"""이름으로 불러오는 공용 데이터셋.
+
+각 페이지는 파일/URL/API 를 직접 읽지 않고 `load("이름", ...)` 으로 데이터를 받습니다.
+모든 데이터셋은 하나의 LRU 캐시(databack.cache)를 공유하므로
+캐시 정책(TTL, 용량, 원본 파일 변경 시 무효화)이 한곳에서 관리됩니다.
+
+주의: 반환된 DataFrame 은 여러 세션이 함께 쓰는 객체이므로
+페이지에서 값을 바꿔야 한다면 먼저 .copy() 하세요.
+"""
+import os
+from pathlib import Path
+
+from databack import tracing
+from databack.cache import LRUCache, estimate_size, file_fingerprint
+
+ROOT = Path(__file__).resolve().parent.parent
+
+POPULATION_CSV = ROOT / "202504_202504_연령별인구현황_월간_남녀합계.csv"
+POPULATION_URL = "https://raw.githubusercontent.com/hachori/databack/main/202504_202504_%EC%97%B0%EB%A0%B9%EB%B3%84%EC%9D%B8%EA%B5%AC%ED%98%84%ED%99%A9_%EC%9B%94%EA%B0%84_%EB%82%A8%EB%85%80%ED%95%A9%EA%B3%84.csv"
+# python -m databack.ingest population ... 로 시도별로 나눠 저장한 전국 인구 파일 (있으면 우선 사용)
+POPULATION_STORE = Path(os.environ.get("DATABACK_POPULATION_STORE", ROOT / "data" / "population"))
+BOOK_LOANS_CSV = ROOT / "BestLoanList_20250527071549.csv"
+STUDENT_IDS_XLSX = ROOT / "정보.xlsx"
+# 시가총액 순위 후보 종목(databack.ranking). 저장소의 CSV 가 기본값이고,
+# ranking.refresh_universe() 로 새로 받은 값은 parquet 파일에 저장됩니다.
+UNIVERSE_CSV = ROOT / "databack" / "resources" / "universe.csv"
+UNIVERSE_PARQUET = Path(os.environ.get("DATABACK_UNIVERSE", ROOT / "universe.parquet"))
+# 인구 지도용 행정구역 경계 GeoJSON (sido.geojson, sigungu.geojson) 을 두는 폴더 (databack.geo)
+BOUNDARY_DIR = Path(os.environ.get("DATABACK_BOUNDARY_DIR", ROOT / "data" / "boundaries"))
+
+# pandas/yfinance 등 무거운 모듈은 실제로 데이터를 읽는 로더 안에서 import 합니다.
+# (이 모듈만 import 하는 페이지의 시작 시간을 늘리지 않기 위함)
+
+# 캐시 용량은 환경 변수로 조정할 수 있습니다 (기본 256MB).
+cache = LRUCache(max_bytes=int(os.environ.get("DATABACK_CACHE_MB", "256")) * 1024 * 1024)
+
+# 로드한 표의 컬럼 형식을 스키마대로 줄입니다 (databack.dtypes). DATABACK_COMPACT_DTYPES=0 이면 끕니다.
+COMPACT_DTYPES = os.environ.get("DATABACK_COMPACT_DTYPES", "1") != "0"
+
+# 주가(yfinance) 표의 스키마
+STOCK_SCHEMA = {
+    "Open": "float32", "High": "float32", "Low": "float32", "Close": "float32", "Adj Close": "float32",
+    "Volume": "uint32", "Dividends": "float32", "Stock Splits": "float32", "Capital Gains": "float32",
+}
+
+_REGISTRY = {}
+
+# (데이터셋 이름, 파라미터) → 형식을 줄이기 전/후 메모리 (바이트)
+_MEMORY = {}
+
+
+class Dataset:
+    """등록된 데이터셋 하나의 로더와 캐시 정책."""
+
+    def __init__(self, name, loader, ttl=None, files=None, schema=None):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        # files: 원본 파일 경로 목록 (또는 params 를 받아 목록을 돌려주는 함수)
+        self.files = files
+        # schema: 컬럼 → 줄일 형식 (databack.dtypes.compact)
+        self.schema = schema
+
+    def fingerprint(self, params):
+        files = self.files(**params) if callable(self.files) else self.files
+        return file_fingerprint(*files) if files else None
+
+
+def register(name, ttl=None, files=None, schema=None):
+    """데이터셋 로더를 등록하는 데코레이터."""
+    def decorator(func):
+        _REGISTRY[name] = Dataset(name, func, ttl=ttl, files=files, schema=schema)
+        return func
+    return decorator
+
+
+def names():
+    """등록된 데이터셋 이름 목록."""
+    return sorted(_REGISTRY)
+
+
+def load(name, refresh=False, **params):
+    """이름으로 데이터셋을 불러옵니다. 캐시에 있으면 캐시된 값을 반환합니다."""
+    dataset = _REGISTRY[name]
+    key = (name, tuple(sorted(params.items())))
+    if refresh:
+        cache.invalidate_key(key)
+
+    with tracing.span(f"dataset:{name}") as info:
+        info["cache"] = "hit"
+
+        def loader():
+            info["cache"] = "miss"
+            value = dataset.loader(**params)
+            if dataset.schema and COMPACT_DTYPES:
+                value = _compact(key, value, dataset.schema)
+            return value
+
+        return cache.get_or_load(
+            key,
+            loader,
+            ttl=dataset.ttl,
+            fingerprint=dataset.fingerprint(params),
+            group=name,
+        )
+
+
+def _compact(key, value, schema):
+    from databack.dtypes import compact
+
+    before = estimate_size(value)
+    value = compact(value, schema)
+    _MEMORY[key] = (before, estimate_size(value))
+    return value
+
+
+def memory_report():
+    """형식을 줄인 데이터셋별 메모리 (줄이기 전/후 MB, 비율). 캐시에서 빠진 항목은 제외합니다."""
+    keys = cache.keys()
+    rows = []
+    for key, (before, after) in list(_MEMORY.items()):
+        if key not in keys:
+            _MEMORY.pop(key, None)
+            continue
+        name, params = key
+        rows.append({
+            "dataset": name,
+            "params": ", ".join(f"{k}={v}" for k, v in params),
+            "before_mb": before / 1024 / 1024,
+            "after_mb": after / 1024 / 1024,
+            "ratio": after / before if before else 1.0,
+        })
+    return rows
+
+
+def fingerprint(name, **params):
+    """데이터셋 원본 파일의 지문. 파일이 바뀌면 값이 달라집니다. (원본 파일이 없는 데이터셋은 None)"""
+    return _REGISTRY[name].fingerprint(params)
+
+
+def invalidate(name=None):
+    """데이터셋(없으면 전체)의 캐시를 비웁니다."""
+    return cache.invalidate(name)
+
+
+def cache_stats():
+    """캐시 사용량과 데이터셋별 적중/실패/로딩 시간 통계."""
+    return cache.stats()
+
+
+def read_csv_any_encoding(source, encodings=("euc-kr", "cp949", "utf-8"), **kwargs):
+    """공공데이터 CSV 처럼 인코딩이 제각각인 파일을 순서대로 시도해 읽습니다."""
+    import pandas as pd
+
+    last_error = None
+    for encoding in encodings:
+        try:
+            return pd.read_csv(source, encoding=encoding, **kwargs)
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise last_error
+
+
+# --- 데이터셋 정의 ---
+
+@register("population", files=[POPULATION_CSV], schema={"*_계_*": "int32"})
+def _load_population():
+    """행정구역별 연령별 인구 현황 (저장소의 CSV, 없으면 GitHub 원본). 인구수는 "1,234" 형식이라 쉼표를 빼고 숫자로 읽습니다."""
+    from databack import ingest
+
+    if POPULATION_CSV.exists():
+        return ingest.read_csv_filtered(POPULATION_CSV, thousands=",")
+    return read_csv_any_encoding(POPULATION_URL, thousands=",")
+
+
+@register("population_region", files=[POPULATION_CSV, POPULATION_STORE], schema={"*_계_*": "int32"})
+def _load_population_region(region="서울특별시"):
+    """인구 현황 중 행정구역 이름에 region 이 들어간 줄만 (region 은 '서울특별시'처럼 시도 이름으로 시작).
+
+    시도별 분할 저장본이 있으면 그 시도 파일만 읽고, 없으면 CSV 를 조금씩 읽으면서 그 시도 줄만 남깁니다.
+    """
+    from databack import ingest
+
+    sido = region.split()[0]
+    df = ingest.read_partitioned(POPULATION_STORE, "시도", sido) if POPULATION_STORE.exists() else None
+    if df is None and POPULATION_CSV.exists():
+        df = ingest.read_csv_filtered(
+            POPULATION_CSV, where=lambda chunk: chunk["행정구역"].str.startswith(sido), thousands=",",
+        )
+    if df is None:
+        df = load("population")
+    return df[df["행정구역"].str.contains(region)].reset_index(drop=True)
+
+
+@register("age_table", files=[POPULATION_CSV])
+def _load_age_table():
+    """모든 행정구역의 나이별 인구와 누적합 (databack.ages.AgeTable). 연령대 합계가 뺄셈 한 번."""
+    from databack.ages import AgeTable
+
+    return AgeTable.from_population(load("population"))
+
+
+@register("region_indicators", files=[POPULATION_CSV])
+def _load_region_indicators(level="sido"):
+    """시도/시군구별 인구 지표와 경계에 이을 행정기관코드 앞자리 (databack.geo.region_indicators)."""
+    from databack import geo
+
+    return geo.region_indicators(load("age_table"), level)
+
+
+def boundary_file(level):
+    """행정구역 경계 GeoJSON 경로 (level: "sido" / "sigungu")."""
+    return BOUNDARY_DIR / f"{level}.geojson"
+
+
+@register("boundary_topology", files=lambda level="sido": [boundary_file(level)])
+def _load_boundary_topology(level="sido"):
+    """경계 GeoJSON 의 공유 경계선 위상 (databack.geo.Topology). 원본 하나에 한 번만 만듭니다."""
+    from databack import geo
+
+    return geo.Topology.from_geojson(boundary_file(level), digits=geo.LEVELS[level])
+
+
+@register("boundary_topojson", files=lambda level="sido", zoom=7: [boundary_file(level)])
+def _load_boundary_topojson(level="sido", zoom=7):
+    """zoom 에 맞게 단순화한 경계 TopoJSON 글자. 만든 파일은 원본 옆에 저장해 다음 실행에도 씁니다."""
+    from databack import geo
+
+    source = boundary_file(level)
+    cached = geo.cache_path(source, zoom)
+    if cached.exists() and cached.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return cached.read_text(encoding="utf-8")
+    text = load("boundary_topology", level=level).to_topojson(zoom)
+    cached.write_text(text, encoding="utf-8")
+    return text
+
+
+@register("book_loans", files=[BOOK_LOANS_CSV], schema={
+    "서명": "category", "저자": "category", "출판사": "category", "출판년도": "category", "KDC": "category",
+    "순위": "int32", "대출건수": "int32", "권": "float32", "ISBN부가기호": "float32",
+})
+def _load_book_loans(kdc_range=None):
+    """도서 대출 순위 목록. kdc_range=(처음, 끝) 이면 KDC 가 그 범위(끝 포함)인 책만 남기면서 읽습니다."""
+    from databack import ingest
+
+    def in_range(chunk):
+        return chunk["KDC"].between(*kdc_range)
+
+    read_kwargs, _, _ = ingest.PRESETS["book_loans"]
+    where = in_range if kdc_range is not None else None
+    return ingest.read_csv_filtered(BOOK_LOANS_CSV, where=where, encoding="cp949", **read_kwargs)
+
+
+@register("kdc_tree", files=[BOOK_LOANS_CSV])
+def _load_kdc_tree():
+    """KDC 대분류 → 강목 → 요목별 대출 건수 트리 (databack.kdc.KdcTree). KDC, 대출건수 컬럼만 조금씩 읽어 만듭니다."""
+    from databack import ingest
+    from databack.kdc import KdcTree
+
+    read_kwargs, _, _ = ingest.PRESETS["book_loans"]
+    return KdcTree.from_csv(BOOK_LOANS_CSV, encoding="cp949", **read_kwargs)
+
+
+@register("book_neighbors", files=[BOOK_LOANS_CSV])
+def _load_book_neighbors(k=10):
+    """book_loans 의 책마다 비슷한 책 상위 k 권 표 (databack.similar.SimilarBooks). 줄 번호는 book_loans 와 같습니다."""
+    from databack.similar import SimilarBooks
+
+    return SimilarBooks.build(load("book_loans"), k=k)
+
+
+@register("student_ids", files=[STUDENT_IDS_XLSX])
+def _load_student_ids():
+    """이름/번호/ID 정보."""
+    import pandas as pd
+
+    return pd.read_excel(STUDENT_IDS_XLSX)
+
+
+@register("student_id_index", files=[STUDENT_IDS_XLSX])
+def _load_student_id_index():
+    """이름/번호 키를 정리한 아이디 조인 표 (databack.roster.id_index)."""
+    from databack import roster
+
+    return roster.id_index(load("student_ids"))
+
+
+@register("stock_history", ttl=3600, schema=STOCK_SCHEMA)
+def _load_stock_history(ticker, period="1y"):
+    """yf.Ticker().history() 로 받은 OHLCV 데이터 (1시간마다 갱신)."""
+    import yfinance as yf
+
+    return yf.Ticker(ticker).history(period=period)
+
+
+@register("stock_download", ttl=3600, schema=STOCK_SCHEMA)
+def _load_stock_download(ticker, period="1y"):
+    """yf.download() 로 받은 OHLCV 데이터 ('Adj Close' 포함, 1시간마다 갱신)."""
+    import yfinance as yf
+
+    return yf.download(ticker, period=period, progress=False, auto_adjust=False)
+
+
+@register("stock_closes", ttl=3600)
+def _load_stock_closes(tickers, period="5d"):
+    """여러 종목의 최근 종가를 yf.download() 한 번으로 받습니다 (티커별 Series, 못 받은 종목은 NaN)."""
+    import pandas as pd
+    import yfinance as yf
+
+    tickers = list(tickers)
+    data = yf.download(tickers, period=period, progress=False, auto_adjust=False)
+    if data.empty or "Close" not in data:
+        return pd.Series(float("nan"), index=tickers)
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    return close.ffill().iloc[-1].reindex(tickers)
+
+
+@register("fx_rates", ttl=3600)
+def _load_fx_rates(currencies, period="1y"):
+    """통화별 USD 환율 행렬 (날짜 × 통화). 저장해 둔 환율에 모자란 날짜만 받아 붙입니다 (databack.fx)."""
+    from databack import fx
+
+    return fx.update_rates(currencies, fx.period_start(period))
+
+
+@register("ohlc_pyramid", ttl=3600)
+def _load_ohlc_pyramid(ticker, period="1y"):
+    """stock_history 일봉으로 만든 일봉/주봉/월봉 묶음 (databack.ohlc.OHLCPyramid)."""
+    from databack.ohlc import OHLCPyramid
+
+    return OHLCPyramid(load("stock_history", ticker=ticker, period=period))
+
+
+@register("intraday_bars", ttl=60, schema=STOCK_SCHEMA)
+def _load_intraday_bars(ticker, interval="5m", days=1):
+    """거래소 현지 오늘까지 봉이 있는 최근 days 거래일의 분봉 (databack.intraday 저장소에 없는 날짜만 받고, 파일은 메모리 맵으로 읽음)."""
+    from databack import intraday
+
+    store = intraday.BarStore()
+    window = store.recent_sessions(ticker, interval, days)
+    if window is None:
+        today = intraday.exchange_today(ticker)
+        return store.frame(ticker, interval, today, today)
+    return store.frame(ticker, interval, *window)
+
+
+@register("market_universe", files=[UNIVERSE_PARQUET, UNIVERSE_CSV])
+def _load_market_universe():
+    """시가총액 순위 후보 종목과 발행주식수 (새로 받은 parquet, 없으면 저장소의 CSV)."""
+    import pandas as pd
+
+    if UNIVERSE_PARQUET.exists():
+        return pd.read_parquet(UNIVERSE_PARQUET)
+    return pd.read_csv(UNIVERSE_CSV, dtype={"ticker": str})
+
+
+@register("task_sheet", ttl=30)
+def _load_task_sheet(worksheet="시트1"):
+    """'다했어요' 구글 시트 (여러 학생이 동시에 열어도 30초에 한 번만 읽음)."""
+    import streamlit as st
+    from streamlit_gsheets import GSheetsConnection
+
+    conn = st.connection("gsheets", type=GSheetsConnection)
+    return conn.read(worksheet=worksheet, ttl=0)
@@ -0,0 +1,60 @@
+"""불러온 표의 컬럼 형식(dtype)을 더 작은 형식으로 바꾸는 단계.
+
+pandas 는 숫자를 기본으로 float64/int64(8바이트)로, 글자는 한 칸마다 문자열 객체로 저장합니다.
+데이터셋마다 스키마(컬럼 → 형식)를 정해 두고 로드 직후 한 번 바꾸면
+같은 데이터가 캐시에서 차지하는 메모리가 절반 이하로 줄어듭니다.
+
+- "float32": 주가처럼 유효숫자 7자리면 충분한 실수
+- "uint32" / "int32" 등: 값 범위가 그 형식에 들어갈 때만 바꿉니다. (넘치면 원래 형식 유지)
+- "category": 같은 글자가 반복되는 컬럼(출판사, 저자 등)을 정수 코드 + 목록으로 저장
+
+스키마의 컬럼 이름에는 "*_계_*" 처럼 와일드카드를 쓸 수 있고,
+yf.download() 처럼 컬럼이 (이름, 티커) 튜플이면 첫 번째 이름으로 찾습니다.
+
+    compact_df = dtypes.compact(df, {"Close": "float32", "Volume": "uint32"})
+"""
+from fnmatch import fnmatchcase
+
+import numpy as np
+import pandas as pd
+
+
+def _target(schema, column):
+    name = column[0] if isinstance(column, tuple) else column
+    if name in schema:
+        return schema[name]
+    for pattern, dtype in schema.items():
+        if fnmatchcase(str(name), pattern):
+            return dtype
+    return None
+
+
+def _fits(series, dtype):
+    info = np.iinfo(dtype)
+    if series.isna().any():
+        return False
+    return series.empty or (series.min() >= info.min and series.max() <= info.max)
+
+
+def compact(df, schema):
+    """schema 에 맞춰 컬럼 형식을 줄인 DataFrame. 바꿀 컬럼이 없으면 df 를 그대로 돌려줍니다.
+
+    숫자 형식은 원래 숫자인 컬럼에만 적용하고, 정수 형식은 빈 값 없이 범위에 맞을 때만 적용합니다.
+    """
+    changes = {}
+    for column in df.columns:
+        dtype = _target(schema, column)
+        if dtype is None:
+            continue
+        series = df[column]
+        if dtype == "category":
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                changes[column] = "category"
+            continue
+        dtype = np.dtype(dtype)
+        if series.dtype == dtype or not pd.api.types.is_numeric_dtype(series.dtype):
+            continue
+        if dtype.kind in "iu" and not _fits(series, dtype):
+            continue
+        changes[column] = dtype
+    return df.astype(changes) if changes else df
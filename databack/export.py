@@ -0,0 +1,234 @@
+"""차트를 파일(HTML/PNG/PDF)로 한꺼번에 내보내는 명령.
+
+    python -m databack.export                                  # 모든 행정구역 피라미드 + 대출 현황 차트, HTML
+    python -m databack.export --formats html png pdf --workers 8
+    python -m databack.export --level sido --output 보고서
+
+- 행정구역별 인구 피라미드: <출력 폴더>/pyramid/<행정기관코드>_<이름>.<형식>
+- 도서 대출 현황 대시보드 차트: <출력 폴더>/loans/<차트 이름>.<형식>
+
+차트는 페이지와 같은 함수(databack.charts)로 그립니다. Streamlit 서버 없이 실행됩니다.
+
+- 프로세스 풀: 작업을 여러 프로세스에 나눠 그리고, 프로세스마다 렌더러(데이터와 kaleido 브라우저)를
+  처음에 한 번만 준비해 계속 씁니다. (그림마다 브라우저를 새로 띄우면 PNG 한 장에 1초 이상 걸림)
+- 바로 저장: 그린 파일은 그 자리에서 저장하고 manifest.csv 에 한 줄씩 적습니다.
+  중간에 멈춰도 이미 만든 파일은 남고, 다시 실행하면 모든 형식이 이미 있는 차트는 건너뜁니다. (--overwrite 로 다시 그림)
+- HTML 은 plotly.js 를 폴더마다 한 번만 저장하고(plotly.min.js) 파일마다 참조하므로 한 장에 수십 KB 입니다.
+- PNG/PDF 는 kaleido 1.0 이상과 Chrome 이 필요합니다: pip install kaleido && plotly_get_chrome
+
+작업 함수는 프로세스 풀에서 실행할 수 있도록 모듈 최상위 함수입니다.
+"""
+import csv
+import os
+import time
+from pathlib import Path
+
+FORMATS = ("html", "png", "pdf")
+IMAGE_FORMATS = ("png", "pdf")
+
+# 피라미드를 그릴 행정구역 단위 ("all" 은 읍면동까지 전체)
+REGION_LEVELS = ("all", "sido", "sigungu")
+
+OUTPUT_DIR = Path(os.environ.get("DATABACK_EXPORT_DIR", Path(__file__).resolve().parent.parent / "exports"))
+
+MANIFEST_COLUMNS = ["kind", "name", "files", "bytes", "seconds", "worker"]
+
+
+def _file_stem(text):
+    # 파일 이름에 쓸 수 없거나 불편한 글자는 바꿉니다.
+    return "".join("_" if char in ' /\\:*?"<>|' else char for char in str(text))
+
+
+def task_path(output_dir, table, task, fmt):
+    """작업 (종류, 이름) 의 출력 파일 경로 (예: pyramid/1111000000_서울특별시_종로구.html)."""
+    kind, name = task
+    if kind == "pyramid":
+        name = _file_stem(f"{table.codes[name]}_{table.regions[name]}")
+    return Path(output_dir) / kind / f"{name}.{fmt}"
+
+
+class Renderer:
+    """프로세스 하나가 계속 쓰는 차트 렌더러.
+
+    행정구역 나이별 인구(AgeTable)와 대출 차트 입력을 한 번 받아 두고,
+    PNG/PDF 를 만들 때는 kaleido 브라우저를 한 번 띄워 모든 그림에 다시 씁니다.
+    """
+
+    def __init__(self, output_dir, formats, table=None, loans=None, scale=2):
+        self.output_dir = Path(output_dir)
+        self.formats = tuple(formats)
+        self.table = table
+        self.loans = loans or {}
+        self.scale = scale
+        self._kaleido = None
+        if any(fmt in IMAGE_FORMATS for fmt in self.formats):
+            import kaleido
+
+            kaleido.start_sync_server(silence_warnings=True)
+            self._kaleido = kaleido
+
+    def close(self):
+        if self._kaleido is not None:
+            self._kaleido.stop_sync_server(silence_warnings=True)
+            self._kaleido = None
+
+    def figure(self, task):
+        """작업 (종류, 이름) 의 차트."""
+        from databack import analytics, charts
+
+        kind, name = task
+        if kind == "pyramid":
+            region = self.table.regions[name]
+            melted = analytics.age_pyramid_from_counts(region, self.table.counts[name])
+            return charts.pyramid_chart(melted, f"{region} 연령별 인구 피라미드 ({self.table.month})")
+        build, args = self.loans[name]
+        return build(*args)
+
+    def render(self, task):
+        """차트 하나를 그려 형식마다 저장하고 manifest 한 줄(dict)을 돌려줍니다."""
+        started = time.perf_counter()
+        fig = self.figure(task)
+        paths = []
+        for fmt in self.formats:
+            path = task_path(self.output_dir, self.table, task, fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 다 쓴 뒤에 이름을 바꾸므로, 중간에 멈춰도 반쯤 쓴 파일이 완성된 파일로 남지 않습니다.
+            partial = path.with_name(f"{path.stem}.partial.{fmt}")
+            if fmt == "html":
+                # plotly.js 는 같은 폴더의 plotly.min.js 를 함께 쓰도록 (파일마다 3MB 를 넣지 않음)
+                fig.write_html(partial, include_plotlyjs="directory")
+            else:
+                fig.write_image(partial, format=fmt, scale=self.scale)
+            os.replace(partial, path)
+            paths.append(path)
+        return {
+            "kind": task[0],
+            "name": paths[0].stem if paths else str(task[1]),
+            "files": ";".join(str(path.relative_to(self.output_dir)) for path in paths),
+            "bytes": sum(path.stat().st_size for path in paths),
+            "seconds": round(time.perf_counter() - started, 4),
+            "worker": os.getpid(),
+        }
+
+
+# 프로세스 풀의 각 프로세스가 가진 렌더러 (_init_worker 가 한 번 만듦)
+_renderer = None
+
+
+def _init_worker(output_dir, formats, table, loans, scale):
+    import atexit
+
+    global _renderer
+    _renderer = Renderer(output_dir, formats, table=table, loans=loans, scale=scale)
+    atexit.register(_renderer.close)
+
+
+def _render(task):
+    return _renderer.render(task)
+
+
+def tasks_for(table, loans, level="all"):
+    """내보낼 차트 목록: [("pyramid", 행정구역 번호), ..., ("loans", 차트 이름), ...]."""
+    if level == "all":
+        indices = range(len(table))
+    else:
+        from databack import geo
+
+        indices = geo.level_mask(table.codes, level).nonzero()[0].tolist()
+    return [("pyramid", index) for index in indices] + [("loans", name) for name in loans]
+
+
+def export(output_dir=OUTPUT_DIR, formats=("html",), level="all", workers=1, overwrite=False,
+           scale=2, chunksize=8, progress=None):
+    """모든 행정구역 인구 피라미드와 대출 현황 차트를 파일로 내보내고 새로 그린 차트 수를 돌려줍니다.
+
+    progress: (끝난 수, 전체 수, manifest 한 줄) 을 받는 함수 (그림 하나가 끝날 때마다 호출)
+    """
+    from databack import charts, datasets
+
+    formats = tuple(dict.fromkeys(formats))
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"형식은 {FORMATS} 중에서 고르세요: {unknown}")
+    if any(fmt in IMAGE_FORMATS for fmt in formats):
+        try:
+            import kaleido
+        except ImportError:
+            raise RuntimeError("PNG/PDF 로 내보내려면 kaleido 1.0 이상이 필요합니다: pip install kaleido && plotly_get_chrome") from None
+        if not hasattr(kaleido, "start_sync_server"):
+            raise RuntimeError("kaleido 가 오래된 버전입니다. 1.0 이상으로 올려 주세요: pip install -U kaleido")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "manifest.csv"
+    if overwrite:
+        manifest_path.unlink(missing_ok=True)
+
+    table = datasets.load("age_table")
+    loans = charts.loan_dashboard(datasets.load("book_loans"))
+    tasks = tasks_for(table, loans, level)
+    if not overwrite:
+        # 고른 형식의 파일이 모두 있는 차트는 건너뜁니다.
+        tasks = [task for task in tasks
+                 if not all(task_path(output_dir, table, task, fmt).exists() for fmt in formats)]
+
+    new_file = not manifest_path.exists()
+    with open(manifest_path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        if new_file:
+            writer.writeheader()
+        if workers > 1 and len(tasks) > 1:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(output_dir, formats, table, loans, scale),
+            ) as executor:
+                results = executor.map(_render, tasks, chunksize=chunksize)
+                _write(results, writer, f, len(tasks), progress)
+        else:
+            renderer = Renderer(output_dir, formats, table=table, loans=loans, scale=scale)
+            try:
+                _write(map(renderer.render, tasks), writer, f, len(tasks), progress)
+            finally:
+                renderer.close()
+    return len(tasks)
+
+
+def _write(results, writer, f, total, progress):
+    # 결과가 나오는 대로 manifest 에 적고 바로 디스크에 씁니다. (중간에 멈춰도 끝난 차트는 기록됨)
+    for number, row in enumerate(results, start=1):
+        writer.writerow(row)
+        f.flush()
+        if progress is not None:
+            progress(number, total, row)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="인구 피라미드와 대출 현황 차트를 파일로 내보내기")
+    parser.add_argument("--output", default=str(OUTPUT_DIR), help=f"출력 폴더 (기본: {OUTPUT_DIR})")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["html"])
+    parser.add_argument("--level", choices=REGION_LEVELS, default="all", help="피라미드를 그릴 행정구역 단위")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수")
+    parser.add_argument("--scale", type=float, default=2, help="PNG/PDF 해상도 배율")
+    parser.add_argument("--overwrite", action="store_true", help="이미 내보낸 차트도 다시 그리기")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    def report(number, total, row):
+        if number == total or number % 100 == 0:
+            elapsed = time.perf_counter() - started
+            print(f"{number:,}/{total:,} ({number / elapsed:,.1f}개/초) {row['files']}", flush=True)
+
+    try:
+        count = export(args.output, args.formats, level=args.level, workers=args.workers,
+                       overwrite=args.overwrite, scale=args.scale, progress=report)
+    except (RuntimeError, ValueError) as e:
+        parser.exit(1, f"{e}\n")
+    print(f"새로 그린 차트 {count:,}개, {time.perf_counter() - started:.1f}초 → {args.output}")
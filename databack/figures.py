@@ -0,0 +1,112 @@
+"""Plotly 차트 캐시.
+
+rerun 마다 같은 데이터로 go.Figure / px 차트를 다시 만들고 다시 JSON 으로 바꾸는 대신,
+(차트를 만드는 함수, 입력 데이터, 차트 옵션)의 지문이 같으면 전에 만들어 둔 JSON 과 그 dict 를 그대로 씁니다.
+dict 는 차트를 만들 때 한 번만 만들어 두므로 캐시 적중 때는 JSON 을 다시 읽지 않습니다.
+캐시는 크기 제한 LRU(databack.cache)라서 오래 켜 둔 서버에서도 메모리가 max_bytes 를 넘지 않습니다.
+
+    from databack import figures
+
+    def build_price_chart(stock_data, height):
+        fig = go.Figure(...)
+        return fig
+
+    fig = figures.cached("price", build_price_chart, stock_data, height=600)
+    st.plotly_chart(fig, use_container_width=True)
+
+차트 함수가 쓰는 값은 모두 인자로 넘겨야 합니다. (함수 밖 변수는 지문에 들어가지 않음)
+돌려받은 차트는 수정하지 말고 바로 st.plotly_chart 에 넘기세요.
+"""
+import hashlib
+import json
+import os
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from databack import tracing
+from databack.cache import LRUCache, value_fingerprint
+
+cache = LRUCache(max_bytes=int(os.environ.get("DATABACK_FIGURE_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def _code_key(func):
+    """함수 코드가 바뀌면(페이지 파일 수정) 다른 값이 되도록 코드 내용으로 키를 만듭니다."""
+    h = hashlib.blake2b(digest_size=16)
+
+    def add(code):
+        h.update(code.co_code)
+        for const in code.co_consts:
+            if hasattr(const, "co_code"):
+                add(const)
+            else:
+                h.update(repr(const).encode())
+
+    add(func.__code__)
+    return (func.__code__.co_filename, func.__qualname__, h.hexdigest())
+
+
+class _FrozenSpec:
+    """캐시에 넣는 값: 차트 JSON 과 그것을 한 번 읽어 둔 dict."""
+
+    __slots__ = ("json", "dict")
+
+    def __init__(self, spec):
+        self.json = spec
+        self.dict = json.loads(spec)
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        # 읽어 둔 dict 는 숫자가 파이썬 객체가 되므로 JSON 글자 수의 몇 배를 차지합니다. (JSON 과 합쳐 대략 4배로 셈)
+        return len(self.json) * 4
+
+
+class FrozenFigure(go.Figure):
+    """이미 JSON 으로 만들어 둔 차트.
+
+    st.plotly_chart 는 차트를 figure.to_dict() 로 꺼내 JSON 으로 바꾸는데,
+    여기서는 to_dict() 가 캐시에 같이 넣어 둔 dict 를 그대로 돌려주므로
+    트레이스를 다시 만들거나 검증하거나 JSON 을 다시 읽는 비용이 들지 않습니다.
+    (여러 세션이 같은 dict 를 함께 쓰므로 고치면 안 됩니다)
+    """
+
+    def __init__(self, spec):
+        super().__init__()
+        self._frozen_spec = spec
+
+    def to_dict(self):
+        return self._frozen_spec.dict
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+    def to_json(self, *args, **kwargs):
+        return self._frozen_spec.json
+
+
+def cached(name, build, *inputs, **options):
+    """build(*inputs, **options) 로 만든 차트를 캐시에서 꺼내거나 새로 만들어 돌려줍니다.
+
+    name 은 통계(cache_stats)에 쓰이는 차트 이름입니다.
+    """
+    with tracing.span(f"figure:{name}") as info:
+        info["cache"] = "hit"
+
+        def loader():
+            info["cache"] = "miss"
+            return _FrozenSpec(pio.to_json(build(*inputs, **options), validate=False))
+
+        key = (name, _code_key(build), value_fingerprint(inputs, options))
+        spec = cache.get_or_load(key, loader, group=name)
+        # 적중일 때 이 구간의 시간이 곧 적중 비용입니다. (Streamlit 이 보내는 비용은 페이지의 render: 구간)
+        info["bytes"] = len(spec.json)
+        return FrozenFigure(spec)
+
+
+def invalidate(name=None):
+    """name 차트(없으면 전체)의 캐시를 비웁니다."""
+    return cache.invalidate(name)
+
+
+def cache_stats():
+    return cache.stats()
@@ -0,0 +1,218 @@
+"""통화가 다른 종목의 가격을 USD 로 맞추기.
+
+- 통화: 종목의 통화는 유니버스(market_universe)의 currency 컬럼, 없으면 티커 끝(.SR, .KS 등)으로 정합니다.
+- 환율 행렬: 날짜 × 통화 (1 단위 통화 = 몇 USD). 야후 파이낸스의 <통화>USD=X 종가를 받아 parquet 파일에 저장하고,
+  다음부터는 저장된 마지막 날짜 근처부터만 받아 이어 붙입니다. (통화가 늘어도 요청은 한 번)
+  데이터셋 "fx_rates" 가 1시간 동안 캐시합니다. 환율을 받지 못하면 고정환율(FIXED_TO_USD) 통화만 씁니다.
+- 변환: 가격 행렬(날짜 × 종목)에 같은 모양으로 펼친 환율 행렬을 한 번 곱합니다.
+
+    rates = datasets.load("fx_rates", currencies=("KRW", "SAR"), period="1y")
+    usd = fx.to_usd(prices, fx.currencies_for(tickers), rates)
+"""
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from databack import datasets
+
+# 1 단위 통화 = 몇 USD. 고정환율(페그) 통화는 환율을 받지 못해도 이 값으로 바꿉니다.
+FIXED_TO_USD = {"USD": 1.0, "SAR": 1 / 3.75}
+
+# 유니버스에 없는 종목은 티커 끝으로 통화를 정합니다. (영국 .L 은 펜스 단위라 넣지 않음)
+SUFFIX_CURRENCY = {
+    ".SR": "SAR", ".KS": "KRW", ".KQ": "KRW", ".T": "JPY", ".HK": "HKD", ".TW": "TWD",
+    ".SS": "CNY", ".SZ": "CNY", ".PA": "EUR", ".DE": "EUR", ".AS": "EUR",
+}
+
+FX_PARQUET = Path(os.environ.get("DATABACK_FX", datasets.ROOT / "data" / "fx_rates.parquet"))
+
+# 저장된 마지막 며칠은 다시 받아 장중(잠정) 환율을 확정 값으로 고칩니다.
+OVERLAP_DAYS = 5
+
+
+def currencies_for(tickers):
+    """티커 목록의 통화 목록 (유니버스 → 티커 끝 → USD 순으로 정함)."""
+    universe = datasets.load("market_universe")
+    known = dict(zip(universe["ticker"], universe["currency"]))
+    currencies = []
+    for ticker in tickers:
+        currency = known.get(ticker)
+        if not currency:
+            suffix = "." + ticker.rsplit(".", 1)[-1] if "." in ticker else ""
+            currency = SUFFIX_CURRENCY.get(suffix, "USD")
+        currencies.append(currency)
+    return currencies
+
+
+def period_start(period, today=None):
+    """yfinance 기간 글자('1y', '5y', 'max')의 첫날."""
+    today = pd.Timestamp(today or date.today()).normalize()
+    if period == "max":
+        return pd.Timestamp("2000-01-01")
+    return today - pd.DateOffset(years=int(period.rstrip("y")))
+
+
+def download_rates(currencies, start):
+    """야후 파이낸스에서 start 이후의 환율 종가를 한 번에 받습니다. (날짜 × 통화, 못 받으면 빈 표)"""
+    import yfinance as yf
+
+    tickers = [f"{currency}USD=X" for currency in currencies]
+    try:
+        data = yf.download(tickers, start=pd.Timestamp(start).date(), progress=False, auto_adjust=False)
+    except Exception:
+        return pd.DataFrame()
+    if data.empty or "Close" not in data:
+        return pd.DataFrame()
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    close = close.rename(columns=dict(zip(tickers, currencies)))
+    close.index = pd.DatetimeIndex(close.index).tz_localize(None).normalize()
+    return close.dropna(how="all")
+
+
+def update_rates(currencies, start, path=None, download=download_rates, today=None):
+    """저장된 환율 행렬에 모자란 구간만 받아 붙이고, start 이후의 (날짜 × 통화) 환율 행렬을 돌려줍니다.
+
+    download: (통화 목록, 시작일) → 날짜 × 통화 표 를 돌려주는 함수 (테스트에서 바꿔 끼움)
+    """
+    path = Path(path or FX_PARQUET)
+    start = pd.Timestamp(start).normalize()
+    today = pd.Timestamp(today or date.today()).normalize()
+    stored = pd.read_parquet(path) if path.exists() else pd.DataFrame(index=pd.DatetimeIndex([]))
+
+    # 처음 보는 통화(또는 start 보다 늦게 시작한 통화)는 start 부터, 나머지는 저장된 마지막 날짜 조금 앞부터 받습니다.
+    # 같은 첫날끼리 묶어 한 번에 받으므로 통화가 늘어도 요청은 많아야 두 번입니다. 고정환율 통화는 받지 않습니다.
+    groups = {}
+    for currency in dict.fromkeys(currencies):
+        if currency in FIXED_TO_USD:
+            continue
+        have = stored[currency].dropna() if currency in stored else pd.Series(dtype=float)
+        # (start 가 주말/휴일이면 저장된 첫날이 며칠 늦을 수 있음)
+        if have.empty or have.index[0] > start + pd.Timedelta(days=OVERLAP_DAYS):
+            groups.setdefault(start, []).append(currency)
+        elif have.index[-1] < today:
+            groups.setdefault("tail", []).append((currency, have.index[-1] - pd.Timedelta(days=OVERLAP_DAYS)))
+    if "tail" in groups:
+        tail = groups.pop("tail")
+        groups.setdefault(min(first for _, first in tail), []).extend(currency for currency, _ in tail)
+
+    fetched = [download(group, first) for first, group in groups.items()]
+    fetched = [frame for frame in fetched if not frame.empty]
+    if fetched:
+        for frame in fetched:
+            stored = frame.combine_first(stored)
+        stored = stored.sort_index()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.stem}.partial{path.suffix}")
+        stored.to_parquet(partial)
+        os.replace(partial, path)
+
+    rates = stored.reindex(columns=list(dict.fromkeys(currencies)))
+    rates = rates[rates.index >= start - pd.Timedelta(days=OVERLAP_DAYS)].ffill()
+    for currency in rates.columns:
+        if currency in FIXED_TO_USD:
+            rates[currency] = rates[currency].fillna(FIXED_TO_USD[currency])
+    return rates.astype(float)
+
+
+def to_usd(prices, currencies, rates):
+    """가격 행렬(날짜 × 종목)을 USD 로 바꿉니다. currencies 는 열마다의 통화입니다.
+
+    환율 행렬을 가격 날짜에 맞춘 뒤(그날 환율이 없으면 직전 값) 열마다 그 통화의 환율을 골라
+    가격과 같은 모양으로 만들고 한 번 곱합니다. 환율을 모르는 통화의 열은 NaN 이 됩니다.
+    """
+    currencies = list(currencies)
+    if all(currency == "USD" for currency in currencies):
+        return prices
+    dates = pd.DatetimeIndex(prices.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    dates = dates.normalize()
+
+    table = rates.copy()
+    table["USD"] = 1.0
+    table = table.sort_index()
+    # 날짜마다 그날 이전의 마지막 환율 (가격이 환율보다 먼저 시작하면 첫 환율)
+    fx = np.full((len(dates), len(currencies)), np.nan)
+    codes = table.columns.get_indexer(currencies)
+    known = codes >= 0
+    if len(table):
+        position = np.clip(table.index.searchsorted(dates, side="right") - 1, 0, None)
+        fx[:, known] = table.to_numpy(dtype=float)[position][:, codes[known]]
+    # 환율을 받지 못한 고정환율 통화는 고정값으로
+    fixed = np.array([FIXED_TO_USD.get(currency, np.nan) for currency in currencies])
+    fx = np.where(np.isnan(fx), fixed, fx)
+    return pd.DataFrame(prices.to_numpy(dtype=float) * fx, index=prices.index, columns=prices.columns)
+
+
+def rates_for(currencies, period="1y"):
+    """currencies 중 USD 가 아닌 통화의 환율 행렬 (데이터셋 "fx_rates", 모두 USD 면 빈 표)."""
+    foreign = tuple(sorted({currency for currency in currencies if currency not in ("USD", None)}))
+    if not foreign:
+        return pd.DataFrame()
+    return datasets.load("fx_rates", currencies=foreign, period=period)
+
+
+def matrix_to_usd(prices, tickers, period="1y"):
+    """열이 종목인 가격 행렬을 USD 로 (tickers 는 열마다의 티커)."""
+    currencies = currencies_for(tickers)
+    return to_usd(prices, currencies, rates_for(currencies, period))
+
+
+# 주가 표에서 통화 단위인 컬럼 (Volume 등은 그대로)
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close"]
+
+
+def frames_to_usd(frames, tickers, period="1y"):
+    """{이름: 주가 표} 의 가격 컬럼을 USD 로 바꾼 새 dict 와, 환율을 몰라 바꾸지 못한 이름 목록.
+
+    모두 USD 종목이면 받은 dict 를 그대로 돌려줍니다. (차트 캐시가 그대로 맞도록)
+    """
+    currencies = dict(zip(frames, currencies_for(tickers)))
+    if all(currency == "USD" for currency in currencies.values()):
+        return frames, []
+    rates = rates_for(currencies.values(), period)
+
+    converted, missing = {}, []
+    for name, data in frames.items():
+        currency = currencies[name]
+        if currency == "USD":
+            converted[name] = data
+            continue
+        if currency not in FIXED_TO_USD and (currency not in rates or rates[currency].isna().all()):
+            converted[name] = data
+            missing.append(name)
+            continue
+        columns = [column for column in PRICE_COLUMNS if column in data.columns]
+        data = data.copy()
+        data[columns] = to_usd(data[columns], [currency] * len(columns), rates).astype(data[columns].dtypes.iloc[0])
+        converted[name] = data
+    return converted, missing
+
+
+def price_matrix(frames, column="Close"):
+    """{이름: 주가 표} → (날짜 × 이름) 가격 행렬.
+
+    거래소마다 시간대가 달라(예: 뉴욕, 리야드) 시각으로 맞추면 같은 날이 다른 줄이 되므로, 현지 날짜로 맞춥니다.
+    """
+    columns = {}
+    for name, data in frames.items():
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        series = pd.Series(data[column].to_numpy(dtype=float), index=index.normalize())
+        columns[name] = series[~series.index.duplicated(keep="last")]
+    return pd.DataFrame(columns).sort_index()
+
+
+def latest_to_usd(currencies, period="1y"):
+    """통화별 최근 환율 {통화: USD}. 환율을 받지 못한 통화는 FIXED_TO_USD 값 (그것도 없으면 빠짐)."""
+    rates = dict(FIXED_TO_USD)
+    latest = rates_for(currencies, period).ffill()
+    if len(latest):
+        rates.update({currency: rate for currency, rate in latest.iloc[-1].items() if not np.isnan(rate)})
+    return rates
@@ -0,0 +1,193 @@
+"""오프라인 지명 사전 (gazetteer).
+
+자주 입력되는 장소 이름(서울역, N서울타워 등)은 원격 지오코더(Nominatim)를
+부르지 않고 로컬 사전에서 바로 위도/경도를 찾습니다.
+
+- 정확히 일치: 정규화한 이름/별칭 -> 좌표 (dict 조회)
+- 접두어 검색: 정렬된 키 목록에서 bisect 로 범위를 찾음 (자동완성용)
+- 초성 검색: "ㅅㅇㅇ" 처럼 초성만 입력해도 후보를 제안
+- 유사 검색: 자모 단위 2-gram 역색인으로 후보를 좁힌 뒤 유사도로 정렬
+"""
+import unicodedata
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "resources" / "gazetteer.tsv"
+
+# 한글 음절 분해용 상수 (유니코드 한글 음절 = 0xAC00 + (초성*21 + 중성)*28 + 종성)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+
+def normalize(text):
+    """비교용 키로 정규화합니다 (NFC, 공백 제거, 대소문자 무시)."""
+    text = unicodedata.normalize("NFC", str(text))
+    return "".join(text.split()).casefold()
+
+
+def to_choseong(text):
+    """한글 음절을 초성으로 바꿉니다. (예: '서울역' -> 'ㅅㅇㅇ')"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            chars.append(_CHOSEONG[(code - _HANGUL_BASE) // 588])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def to_jamo(text):
+    """한글 음절을 자모 단위로 풀어 씁니다. (예: '역' -> 'ㅇㅕㄱ')"""
+    chars = []
+    for ch in text:
+        code = ord(ch) - _HANGUL_BASE
+        if 0 <= code <= _HANGUL_LAST - _HANGUL_BASE:
+            chars.append(_CHOSEONG[code // 588])
+            chars.append(_JUNGSEONG[(code % 588) // 28])
+            if code % 28:
+                chars.append(_JONGSEONG[code % 28])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def _is_choseong_query(text):
+    return bool(text) and all(ch in _CHOSEONG for ch in text)
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+
+class Gazetteer:
+    """지명/별칭 -> (위도, 경도) 로컬 색인."""
+
+    def __init__(self, entries):
+        # entries: (대표 이름, 위도, 경도, [별칭...]) 목록
+        self._coords = {}      # 대표 이름 -> (위도, 경도)
+        self._by_key = {}      # 정규화 키 -> 대표 이름
+        for name, lat, lon, aliases in entries:
+            self._coords[name] = (float(lat), float(lon))
+            for label in [name, *aliases]:
+                key = normalize(label)
+                if key:
+                    # 같은 키가 여러 번 나오면 먼저 등록된 장소를 우선합니다.
+                    self._by_key.setdefault(key, name)
+
+        # (검색용 문자열, 키) 쌍을 정렬해 두고 bisect 로 접두어 범위를 찾습니다.
+        self._keys = sorted((key, key) for key in self._by_key)
+        self._choseong_keys = sorted((to_choseong(key), key) for key in self._by_key)
+
+        self._jamo = {key: to_jamo(key) for key in self._by_key}
+        self._bigram_index = {}
+        for key, jamo in self._jamo.items():
+            for gram in _bigrams(jamo):
+                self._bigram_index.setdefault(gram, []).append(key)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """탭으로 구분된 사전 파일(이름, 위도, 경도, 별칭|별칭...)을 읽습니다."""
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.split("\t")
+                name, lat, lon = parts[0], parts[1], parts[2]
+                aliases = [a for a in parts[3].split("|") if a] if len(parts) > 3 else []
+                entries.append((name, lat, lon, aliases))
+        return cls(entries)
+
+    def __len__(self):
+        return len(self._coords)
+
+    def lookup(self, place_name):
+        """정확히 일치하는 이름/별칭의 (위도, 경도)를 반환합니다. 없으면 None."""
+        name = self._by_key.get(normalize(place_name))
+        return self._coords[name] if name else None
+
+    def resolve(self, place_name, cutoff=0.8):
+        """정확 일치 -> 유사 일치 순서로 찾아 (대표 이름, 위도, 경도)를 반환합니다."""
+        name = self._by_key.get(normalize(place_name))
+        if name is None:
+            matches = self.fuzzy(place_name, limit=1, cutoff=cutoff)
+            if not matches:
+                return None
+            name = matches[0]
+        lat, lon = self._coords[name]
+        return name, lat, lon
+
+    @staticmethod
+    def _prefix_keys(sorted_pairs, prefix, limit):
+        found = []
+        i = bisect_left(sorted_pairs, (prefix, ""))
+        while i < len(sorted_pairs) and len(found) < limit:
+            text, key = sorted_pairs[i]
+            if not text.startswith(prefix):
+                break
+            found.append(key)
+            i += 1
+        return found
+
+    def suggest(self, text, limit=10):
+        """입력 중인 문자열에 대한 자동완성 후보(대표 이름)를 반환합니다."""
+        query = normalize(text)
+        if not query:
+            return []
+
+        pairs = self._choseong_keys if _is_choseong_query(query) else self._keys
+        keys = self._prefix_keys(pairs, query, limit * 3)
+        # 짧은(=더 정확한) 키를 먼저 보여줍니다.
+        keys.sort(key=len)
+
+        names = []
+        for key in keys:
+            name = self._by_key[key]
+            if name not in names:
+                names.append(name)
+            if len(names) >= limit:
+                break
+
+        # 접두어로 찾은 후보가 없으면 오타를 감안한 유사 검색으로 제안합니다.
+        if not names:
+            names = self.fuzzy(text, limit=limit, cutoff=0.6)
+        return names
+
+    def fuzzy(self, text, limit=5, cutoff=0.75):
+        """자모 단위 유사도로 가까운 대표 이름을 찾습니다."""
+        query = to_jamo(normalize(text))
+        if not query:
+            return []
+
+        # 자모 2-gram 을 하나라도 공유하는 키만 후보로 삼습니다.
+        counts = {}
+        for gram in _bigrams(query):
+            for key in self._bigram_index.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+        candidates = sorted(counts, key=counts.get, reverse=True)[:30]
+
+        scored = []
+        for key in candidates:
+            matcher = SequenceMatcher(None, query, self._jamo[key])
+            # 계산이 싼 상한값부터 확인해 가망 없는 후보를 빨리 버립니다.
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                scored.append((score, key))
+        scored.sort(reverse=True)
+
+        names = []
+        for _, key in scored:
+            name = self._by_key[key]
+            if name not in names:
+                names.append(name)
+            if len(names) >= limit:
+                break
+        return names
@@ -0,0 +1,313 @@
+"""행정구역 경계를 지도 축척(zoom)별로 단순화한 TopoJSON 으로 만드는 모듈.
+
+시도/시군구 경계 GeoJSON 원본(수십 MB)을 그대로 지도에 넣으면 브라우저로 보내는 데이터가 너무 큽니다.
+
+1. 좌표를 정수 격자로 양자화하고, 이웃한 행정구역이 함께 쓰는 경계선(arc)은 한 번만 저장하는
+   위상(topology)을 만듭니다. (Topology.from_geojson, 원본 하나에 한 번)
+2. arc 마다 Douglas-Peucker 로 그 zoom 에서 1 픽셀보다 작은 굴곡을 없앱니다.
+   공유 경계를 한 번만 단순화하므로 이웃한 구역 사이에 틈이나 겹침이 생기지 않습니다.
+3. 좌표를 앞 점과의 차이(delta)로 적은 TopoJSON 글자로 저장합니다.
+   folium.Choropleth(geo_data=json.loads(text), topojson="objects.regions") 로 바로 그릴 수 있습니다.
+
+경계 원본은 행정안전부 행정기관코드(시도 2자리, 시군구 5자리)가 속성에 있는 경위도(WGS84) GeoJSON 입니다.
+(예: 국가공간정보포털 시도 경계의 CTPRVN_CD, 시군구 경계의 SIG_CD. 다른 좌표계라면 먼저 경위도로 변환하세요.)
+datasets.BOUNDARY_DIR 에 sido.geojson / sigungu.geojson 으로 두면 인구 지도 페이지에서 씁니다.
+
+    python -m databack.geo sigungu      # zoom 별 TopoJSON 을 미리 만들고 크기를 출력
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 경계 단위 → 행정기관코드 앞자리 수
+LEVELS = {"sido": 2, "sigungu": 5}
+LEVEL_NAMES = {"sido": "시도", "sigungu": "시군구"}
+
+# 지도 상세도 이름 → 단순화 기준 zoom (Leaflet 축척, 숫자가 클수록 확대)
+ZOOM_LEVELS = {"전국": 7, "시도": 9, "시군구": 11}
+
+# 경계 GeoJSON 속성에서 코드/이름을 찾을 때 차례로 보는 이름
+CODE_PROPERTIES = ("code", "CTPRVN_CD", "SIG_CD", "adm_cd", "sido", "sgg")
+NAME_PROPERTIES = ("name", "CTP_KOR_NM", "SIG_KOR_NM", "adm_nm", "sidonm", "sggnm")
+
+# 경계 전체 범위(가로/세로 중 긴 쪽)를 나누는 격자 수. 한국 전체(약 8도)에서 한 칸 ≈ 10m
+QUANTIZATION = 100_000
+
+
+def pixel_degrees(zoom):
+    """zoom 에서 화면 1 픽셀이 차지하는 경도(도)."""
+    return 360 / (256 * 2 ** zoom)
+
+
+def _property(properties, candidates):
+    for name in candidates:
+        if properties.get(name) not in (None, ""):
+            return str(properties[name])
+    return None
+
+
+def _polygons(geometry):
+    """GeoJSON Polygon/MultiPolygon → 다각형 목록 (다각형 = 고리 좌표 목록, 첫 고리가 바깥 경계)."""
+    if geometry is None:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"다각형이 아닌 경계는 쓸 수 없습니다: {geometry['type']}")
+
+
+def _quantize_ring(ring, translate, scale):
+    """고리 좌표를 격자 좌표 튜플 목록으로 (닫는 점과 연속으로 겹친 점은 뺌). 점이 3개 미만이면 None."""
+    points = np.rint((np.asarray(ring, dtype=float)[:, :2] - translate) / scale).astype(np.int64)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (np.diff(points, axis=0) != 0).any(axis=1)
+    points = points[keep]
+    if len(points) > 1 and (points[0] == points[-1]).all():
+        points = points[:-1]
+    if len(points) < 3:
+        return None
+    return [tuple(point) for point in points.tolist()]
+
+
+def _junctions(rings):
+    """두 개 이상의 경계선이 만나는 점. 고리마다 점의 (앞 점, 뒤 점)이 처음 본 것과 다르면 갈림점입니다."""
+    neighbors = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            a, b = ring[i - 1], ring[(i + 1) % n]
+            pair = (a, b) if a < b else (b, a)
+            seen = neighbors.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def simplify(points, tolerance):
+    """Douglas-Peucker 단순화. 양 끝점은 남기고, 선에서 tolerance 보다 가까운 점은 뺍니다.
+
+    points: (점 수 × 2) 배열. 시작점과 끝점이 같은 닫힌 선이면 시작점에서의 거리로 나눕니다.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+    xy = points.astype(float)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a = xy[start]
+        dx, dy = xy[end] - a
+        offsets = xy[start + 1:end] - a
+        length = np.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(offsets[:, 0] * dy - offsets[:, 1] * dx) / length
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance:
+            middle = start + 1 + farthest
+            keep[middle] = True
+            stack.append((start, middle))
+            stack.append((middle, end))
+    return points[keep]
+
+
+def _requantize(points, step):
+    """격자 좌표를 step 칸 단위 격자로 옮깁니다. 그 결과 겹친 중간 점은 빼고 양 끝점은 남깁니다."""
+    if step == 1:
+        return points
+    points = np.rint(points / step).astype(points.dtype)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:-1] = (np.diff(points[:-1], axis=0) != 0).any(axis=1)
+    return points[keep]
+
+
+class Topology:
+    """행정구역 경계의 위상: 공유 경계선(arc) 목록 + 구역별 (코드, 이름, 다각형의 고리별 arc 번호).
+
+    arc 번호가 음수(~i)면 i 번 arc 를 거꾸로 따라간다는 뜻입니다. (TopoJSON 규칙)
+    """
+
+    def __init__(self, arcs, regions, translate, scale):
+        self.arcs = arcs            # arc 별 격자 좌표 배열 (점 수 × 2, int32)
+        self.regions = regions      # [(코드, 이름, [[고리별 arc 번호 목록], ...]), ...]
+        self.translate = translate  # 격자 (0, 0) 의 경위도
+        self.scale = scale          # 격자 한 칸의 크기(도)
+
+    @classmethod
+    def from_geojson(cls, source, digits=None, quantization=QUANTIZATION):
+        """경계 GeoJSON 파일(또는 FeatureCollection dict)로 위상을 만듭니다.
+
+        digits: 코드 앞 몇 자리를 쓸지 (시도 2, 시군구 5). 10자리 행정기관코드 속성도 맞춰 자릅니다.
+        """
+        if isinstance(source, dict):
+            collection = source
+        else:
+            with open(source, encoding="utf-8") as f:
+                collection = json.load(f)
+        features = collection["features"]
+
+        coordinates = np.concatenate([
+            np.asarray(ring, dtype=float)[:, :2]
+            for feature in features
+            for polygon in _polygons(feature["geometry"])
+            for ring in polygon
+        ])
+        translate = coordinates.min(axis=0)
+        scale = float((coordinates.max(axis=0) - translate).max()) / (quantization - 1) or 1.0
+
+        shapes = []
+        for number, feature in enumerate(features):
+            properties = feature.get("properties") or {}
+            code = _property(properties, CODE_PROPERTIES)
+            if code is None:
+                raise ValueError(f"{number}번째 경계에 행정구역 코드 속성({', '.join(CODE_PROPERTIES)})이 없습니다.")
+            code = code[:digits] if digits else code
+            name = _property(properties, NAME_PROPERTIES) or code
+            polygons = []
+            for polygon in _polygons(feature["geometry"]):
+                rings = [_quantize_ring(ring, translate, scale) for ring in polygon]
+                if rings and rings[0] is not None:
+                    polygons.append([ring for ring in rings if ring is not None])
+            shapes.append((code, name, polygons))
+
+        junctions = _junctions(ring for _, _, polygons in shapes for polygon in polygons for ring in polygon)
+        arcs = []
+        index = {}
+
+        def arc_number(points):
+            key = tuple(points)
+            if key in index:
+                return index[key]
+            reverse = key[::-1]
+            if reverse in index:
+                return ~index[reverse]
+            index[key] = len(arcs)
+            arcs.append(np.array(points, dtype=np.int32))
+            return index[key]
+
+        regions = []
+        for code, name, polygons in shapes:
+            arc_polygons = []
+            for polygon in polygons:
+                arc_rings = []
+                for ring in polygon:
+                    cuts = [i for i, point in enumerate(ring) if point in junctions]
+                    if not cuts:
+                        # 다른 구역과 만나지 않는 고리(섬 등)는 가장 작은 점에서 시작하는 닫힌 arc 하나
+                        start = ring.index(min(ring))
+                        arc_rings.append([arc_number(ring[start:] + ring[:start + 1])])
+                        continue
+                    start = cuts[0]
+                    rotated = ring[start:] + ring[:start + 1]
+                    cuts = [i - start for i in cuts] + [len(ring)]
+                    arc_rings.append([arc_number(rotated[a:b + 1]) for a, b in zip(cuts, cuts[1:])])
+                arc_polygons.append(arc_rings)
+            regions.append((code, name, arc_polygons))
+        return cls(arcs, regions, translate.tolist(), scale)
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        return sum(arc.nbytes for arc in self.arcs) + 100 * len(self.regions)
+
+    @property
+    def n_points(self):
+        return sum(len(arc) for arc in self.arcs)
+
+    def to_topojson(self, zoom):
+        """zoom 에서 1 픽셀보다 작은 굴곡을 없앤 TopoJSON 글자 (objects.regions, 속성 code / name).
+
+        단순화 후 점이 3개 미만이 된 고리(작은 섬 등)는 뺍니다.
+        """
+        tolerance = pixel_degrees(zoom) / self.scale
+        # 좌표도 1/4 픽셀 격자로 다시 양자화해서 delta 숫자의 자릿수를 줄입니다.
+        step = max(1, int(tolerance / 4))
+        simplified = [_requantize(simplify(arc, tolerance), step) for arc in self.arcs]
+
+        def ring_points(ring):
+            return sum(len(simplified[i if i >= 0 else ~i]) - 1 for i in ring)
+
+        geometries = []
+        for code, name, polygons in self.regions:
+            kept = []
+            for polygon in polygons:
+                rings = [ring for ring in polygon if ring_points(ring) >= 3]
+                if rings and rings[0] is polygon[0]:
+                    kept.append(rings)
+            geometry = {"properties": {"code": code, "name": name}}
+            if len(kept) == 1:
+                geometry.update(type="Polygon", arcs=kept[0])
+            elif kept:
+                geometry.update(type="MultiPolygon", arcs=kept)
+            else:
+                geometry["type"] = None
+            geometries.append(geometry)
+
+        encoded = []
+        for arc in simplified:
+            deltas = arc.astype(np.int64)
+            deltas[1:] -= arc[:-1]
+            encoded.append(deltas.tolist())
+        topology = {
+            "type": "Topology",
+            "transform": {"scale": [self.scale * step] * 2, "translate": self.translate},
+            "objects": {"regions": {"type": "GeometryCollection", "geometries": geometries}},
+            "arcs": encoded,
+        }
+        return json.dumps(topology, ensure_ascii=False, separators=(",", ":"))
+
+
+def cache_path(source, zoom):
+    """원본 경계 파일 옆에 저장하는 zoom 별 TopoJSON 경로 (예: sigungu.z9.topojson)."""
+    source = Path(source)
+    return source.with_name(f"{source.stem}.z{zoom}.topojson")
+
+
+def level_mask(codes, level):
+    """10자리 행정기관코드 목록에서 level(시도/시군구)에 해당하는 행의 True/False 배열.
+
+    시도는 뒤 8자리가 0, 시군구는 뒤 5자리만 0 인 코드입니다.
+    """
+    digits = LEVELS[level]
+    codes = pd.Series(codes, dtype="string").fillna("")
+    mask = codes.str[digits:].str.fullmatch("0+").fillna(False)
+    if level == "sigungu":
+        mask &= codes.str[2:digits] != "000"
+    return mask.to_numpy(dtype=bool)
+
+
+def region_indicators(table, level):
+    """AgeTable 의 인구 지표 중 level(시도/시군구) 행만 골라 경계와 이을 code(2/5자리) 컬럼을 붙인 표."""
+    digits = LEVELS[level]
+    codes = pd.Series(table.codes, dtype="string").fillna("")
+    mask = level_mask(table.codes, level)
+    frame = table.indicators()[mask].reset_index(drop=True)
+    frame.insert(0, "code", codes[mask].str[:digits].to_numpy())
+    return frame
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from databack import datasets
+
+    parser = argparse.ArgumentParser(description="행정구역 경계를 zoom 별 TopoJSON 으로 미리 만들기")
+    parser.add_argument("level", choices=sorted(LEVELS))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    topology = datasets.load("boundary_topology", level=args.level)
+    print(f"위상: 구역 {len(topology.regions):,}개, arc {len(topology.arcs):,}개, 점 {topology.n_points:,}개 "
+          f"({time.perf_counter() - started:.1f}초)")
+    for label, zoom in ZOOM_LEVELS.items():
+        text = datasets.load("boundary_topojson", level=args.level, zoom=zoom)
+        print(f"{label}(zoom {zoom}): {len(text.encode('utf-8')) / 1024:,.0f} KB → {cache_path(datasets.boundary_file(args.level), zoom)}")
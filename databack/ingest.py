@@ -0,0 +1,161 @@
+"""큰 공공데이터 CSV 를 조금씩 읽는 수집 경로.
+
+전국 월간 연령별 인구 파일이나 도서관 전체 대출 목록처럼 저장소의 샘플보다 훨씬 큰 CSV 도
+chunk(기본 10만 줄) 단위로 읽으면서 필요한 컬럼만 남기고(projection) 필요한 줄만 걸러서(filter)
+처리하므로, 입력 크기와 관계없이 메모리는 chunk 하나 + 남긴 결과만큼만 씁니다.
+
+- stream_csv(): 걸러낸 chunk(DataFrame)를 차례로 돌려주는 제너레이터
+- write_partitioned(): chunk 들을 분할 키(예: 시도, KDC 대분류)별 폴더의 parquet 파일로 저장
+  (`<출력 폴더>/<키 이름>=<값>/part-00000.parquet`, pd.read_parquet 으로 키를 골라 읽을 수 있음)
+
+    python -m databack.ingest population 전국_연령별인구현황.csv data/population
+    python -m databack.ingest book_loans 전체대출목록.csv data/book_loans
+
+인코딩은 파일 앞부분으로 한 번 정합니다. (파일 중간에서 인코딩을 바꿔 다시 읽을 수 없으므로)
+"""
+import codecs
+from pathlib import Path
+
+import pandas as pd
+
+# UTF-8 은 규칙이 엄격해서 cp949 파일을 UTF-8 로 잘못 읽는 일이 거의 없으므로 먼저 시도합니다.
+# cp949 는 euc-kr 을 포함합니다.
+STREAM_ENCODINGS = ("utf-8", "cp949")
+
+CHUNK_ROWS = 100_000
+
+
+def detect_encoding(path, encodings=STREAM_ENCODINGS, sample_bytes=1024 * 1024):
+    """파일 앞부분(sample_bytes)을 오류 없이 읽을 수 있는 첫 인코딩."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+    for encoding in encodings:
+        try:
+            # 샘플 끝에서 글자가 잘렸을 수 있으므로 final=False 로 읽습니다.
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError(encodings[-1], sample[:1], 0, 1, f"{path} 의 인코딩을 알 수 없습니다 ({encodings})")
+
+
+def stream_csv(path, columns=None, where=None, encoding=None, chunk_rows=CHUNK_ROWS, **read_kwargs):
+    """CSV 를 chunk_rows 줄씩 읽어 걸러낸 DataFrame 을 차례로 돌려줍니다.
+
+    columns: 남길 컬럼 목록 (나머지 컬럼은 읽으면서 버림)
+    where: chunk 를 받아 남길 줄의 True/False Series 를 돌려주는 함수
+    read_kwargs: pd.read_csv 에 그대로 넘깁니다 (dtype, thousands 등).
+    """
+    encoding = encoding or detect_encoding(path)
+    reader = pd.read_csv(path, encoding=encoding, usecols=columns, chunksize=chunk_rows, **read_kwargs)
+    with reader:
+        for chunk in reader:
+            if where is not None:
+                chunk = chunk[where(chunk)]
+            if not chunk.empty:
+                yield chunk
+
+
+def read_csv_filtered(path, columns=None, where=None, **kwargs):
+    """stream_csv 로 걸러낸 결과를 하나의 DataFrame 으로 합칩니다. (남는 줄이 없으면 컬럼만 있는 빈 표)"""
+    chunks = list(stream_csv(path, columns=columns, where=where, **kwargs))
+    if chunks:
+        return pd.concat(chunks, ignore_index=True)
+    kwargs.pop("chunk_rows", None)
+    encoding = kwargs.pop("encoding", None) or detect_encoding(path)
+    return pd.read_csv(path, encoding=encoding, usecols=columns, nrows=0, **kwargs)
+
+
+def _folder_value(value):
+    # 폴더 이름에 쓸 수 없는 글자는 바꿉니다.
+    return str(value).replace("/", "_").replace("\\", "_").replace("=", "_")
+
+
+def write_partitioned(chunks, output_dir, partition_by, partition_name=None):
+    """chunk 들을 분할 키별 폴더에 parquet 파일로 저장하고 (분할 키 → 줄 수)를 돌려줍니다.
+
+    partition_by: 컬럼 이름, 또는 chunk 를 받아 줄마다 키(Series)를 돌려주는 함수
+    partition_name: 폴더 이름에 쓸 키 이름 (함수를 넘겼을 때 필요)
+    chunk 마다 분할별로 파일 하나씩 쓰므로 전체 데이터를 메모리에 모으지 않습니다.
+    컬럼 형식은 첫 chunk 를 기준으로 맞추므로, chunk 마다 형식이 달라질 수 있는 컬럼은 read_csv 의 dtype 으로 정해 주세요.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_dir = Path(output_dir)
+    partition_name = partition_name or partition_by
+    if callable(partition_name):
+        raise ValueError("partition_by 에 함수를 넘길 때는 partition_name 도 정해야 합니다.")
+    if output_dir.exists() and any(output_dir.rglob("*.parquet")):
+        raise FileExistsError(f"{output_dir} 에 이미 parquet 파일이 있습니다. 빈 폴더를 지정하세요.")
+
+    schema = None
+    counts = {}
+    for number, chunk in enumerate(chunks):
+        keys = partition_by(chunk) if callable(partition_by) else chunk[partition_by]
+        chunk = chunk.drop(columns=[partition_name], errors="ignore")
+        for key, part in chunk.groupby(keys.to_numpy(), sort=False):
+            table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+            schema = schema or table.schema
+            folder = output_dir / f"{partition_name}={_folder_value(key)}"
+            folder.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, folder / f"part-{number:05d}.parquet")
+            counts[key] = counts.get(key, 0) + len(part)
+    return counts
+
+
+def read_partitioned(output_dir, partition_name, value, columns=None):
+    """write_partitioned 로 저장한 폴더에서 분할 키가 value 인 부분만 읽습니다."""
+    folder = Path(output_dir) / f"{partition_name}={_folder_value(value)}"
+    if not folder.exists():
+        return None
+    return pd.read_parquet(folder, columns=columns)
+
+
+# --- 자주 쓰는 파일의 설정 ---
+
+def population_sido(chunk):
+    """연령별 인구 현황의 시도 이름 (예: '서울특별시  (1100000000)' → '서울특별시')."""
+    return chunk["행정구역"].str.split().str[0]
+
+
+def book_kdc_class(chunk):
+    """대출 목록의 KDC 대분류 (0~9, 분류가 없으면 '미분류')."""
+    kdc = pd.to_numeric(chunk["KDC"], errors="coerce")
+    return (kdc // 100).astype("Int64").astype(str).replace("<NA>", "미분류")
+
+
+# 이름 → (read_csv 옵션, 분할 키 함수, 분할 키 이름)
+PRESETS = {
+    "population": ({"thousands": ","}, population_sido, "시도"),
+    "book_loans": (
+        {"dtype": {"서명": str, "저자": str, "출판사": str, "출판년도": str,
+                   "권": "float64", "ISBN": "float64", "ISBN부가기호": "float64", "KDC": "float64"}},
+        book_kdc_class,
+        "KDC대분류",
+    ),
+}
+
+
+def ingest(preset, source, output_dir, columns=None, where=None, chunk_rows=CHUNK_ROWS):
+    """PRESETS 의 설정으로 source CSV 를 읽어 output_dir 에 분할 저장합니다."""
+    read_kwargs, partition_by, partition_name = PRESETS[preset]
+    chunks = stream_csv(source, columns=columns, where=where, chunk_rows=chunk_rows, **read_kwargs)
+    return write_partitioned(chunks, output_dir, partition_by, partition_name)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="큰 CSV 를 조금씩 읽어 분할 parquet 으로 저장")
+    parser.add_argument("preset", choices=sorted(PRESETS))
+    parser.add_argument("source", help="입력 CSV")
+    parser.add_argument("output", help="출력 폴더 (비어 있어야 함)")
+    parser.add_argument("--columns", nargs="+", help="남길 컬럼 (분할 키를 계산하는 컬럼 포함)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    counts = ingest(args.preset, args.source, args.output, columns=args.columns, chunk_rows=args.chunk_rows)
+    for key, rows in sorted(counts.items(), key=lambda item: str(item[0])):
+        print(f"{key}: {rows:,}줄")
+    print(f"저장: {args.output}")
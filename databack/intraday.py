@@ -0,0 +1,366 @@
+"""분봉(1분/5분/15분) 주가를 종목·날짜별 Arrow 파일로 저장하고 메모리 맵으로 읽기.
+
+    store = BarStore()                                   # 기본: data/bars 폴더, 야후 파이낸스
+    store.ensure("AAPL", "1m", start, end)               # 저장소에 없는 날짜만 받아서 저장
+    start, end = store.recent_sessions("AAPL", "5m", 5)  # 거래소 현지 오늘까지 봉이 있는 최근 5거래일
+    table = store.table("AAPL", "1m", start, end)        # pyarrow.Table (파일을 메모리 맵으로 연 그대로)
+    df = store.frame("AAPL", "5m", start, end)           # pandas DataFrame (고른 구간만 메모리로)
+
+저장 위치: <BARS_DIR>/<간격>/<종목>/<YYYY-MM-DD>.arrow (거래소 현지 날짜, 압축하지 않은 Arrow IPC 파일)
+- 파일을 메모리 맵으로 열기 때문에 몇 달 치 분봉이 있어도 RAM 으로 읽지 않고, 구간을 잘라도 복사하지 않습니다.
+  pandas 로 바꿀 때(frame) 고른 구간만 메모리에 올라갑니다.
+- 날짜 하나가 파일 하나라서 새 날짜를 받을 때 기존 파일을 다시 쓰지 않습니다.
+  오늘(장중) 파일은 아직 완성되지 않았으므로 ensure 할 때마다 다시 받습니다.
+- 거래가 없던 평일(휴장일)은 빈 파일로 저장해 다시 받지 않습니다.
+
+데이터는 source 가 받아 옵니다 (fetch(ticker, interval, start, end) → DataFrame,
+available(ticker, interval, start, end) → 받을 수 있는 (첫날, 마지막 날) 또는 None).
+구간을 나눠 받는 source 는 봉이 있었던 요청 구간을 DataFrame.attrs["fetched"] 에 [(첫날, 마지막 날), ...] 로 적어
+빈 응답을 받은 구간이 휴장일로 기록되지 않게 합니다. (없으면 요청한 구간 전체를 받은 것으로 봄)
+기본은 YahooSource 이고, 테스트나 오프라인에서는 녹화해 둔 파일을 읽는 RecordedSource 로 바꿔 씁니다.
+환경 변수 DATABACK_BAR_SOURCE 에 녹화 폴더를 지정하면 페이지도 그 폴더를 씁니다.
+
+    python -m databack.intraday record AAPL MSFT --interval 5m --days 30 --output 녹화폴더
+    python -m databack.intraday fetch AAPL MSFT --interval 1m --days 5
+"""
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+INTERVALS = ("1m", "5m", "15m")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+BARS_DIR = Path(os.environ.get("DATABACK_BARS_DIR", Path(__file__).resolve().parent.parent / "data" / "bars"))
+
+# 야후 파이낸스 분봉 제한: (오늘부터 거슬러 받을 수 있는 날 수, 요청 한 번에 받을 수 있는 날 수)
+YAHOO_LIMITS = {"1m": (30, 7), "5m": (60, 60), "15m": (60, 60)}
+
+# 티커 끝으로 정하는 거래소 시간대 (나머지는 미국 동부). '오늘'은 거래소 현지 날짜로 셉니다.
+EXCHANGE_TZ = {
+    ".KS": "Asia/Seoul", ".KQ": "Asia/Seoul", ".SR": "Asia/Riyadh", ".T": "Asia/Tokyo", ".HK": "Asia/Hong_Kong",
+    ".SS": "Asia/Shanghai", ".SZ": "Asia/Shanghai", ".TW": "Asia/Taipei", ".L": "Europe/London",
+    ".PA": "Europe/Paris", ".DE": "Europe/Berlin", ".AS": "Europe/Amsterdam",
+}
+DEFAULT_TZ = "America/New_York"
+
+# 최근 거래일을 찾을 때 더 거슬러 보는 평일 수 (휴장일, 아직 열리지 않은 오늘)
+SESSION_SLACK = 5
+
+# 차트에서 봉이 너무 많을 때 묶는 간격 (촘촘한 것부터)
+RESAMPLE_LEVELS = (("1m", "1min"), ("5m", "5min"), ("15m", "15min"), ("30m", "30min"), ("60m", "60min"))
+LABELS = {"1m": "1분봉", "5m": "5분봉", "15m": "15분봉", "30m": "30분봉", "60m": "60분봉"}
+
+
+def _check_interval(interval):
+    if interval not in INTERVALS:
+        raise ValueError(f"간격은 {INTERVALS} 중에서 고르세요: {interval}")
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def trading_days(start, end):
+    """start~end 사이의 평일 날짜 목록 (휴장일은 받아 봐야 알 수 있으므로 포함)."""
+    return [day.date() for day in pd.bdate_range(_as_date(start), _as_date(end))]
+
+
+def exchange_tz(ticker):
+    suffix = "." + ticker.rsplit(".", 1)[-1] if "." in ticker else ""
+    return EXCHANGE_TZ.get(suffix, DEFAULT_TZ)
+
+
+def exchange_today(ticker):
+    """그 종목 거래소의 현지 오늘 날짜 (서버 시간대와 관계없음)."""
+    return pd.Timestamp.now(tz=exchange_tz(ticker)).date()
+
+
+def recent_days(days, today=None):
+    """오늘을 포함한 최근 days 평일의 (첫날, 오늘)."""
+    today = _as_date(today or date.today())
+    return pd.bdate_range(end=today, periods=days)[0].date(), today
+
+
+def _local_dates(index):
+    """봉 시각의 거래소 현지 날짜 배열 (시각에 시간대가 없으면 UTC 로 봄)."""
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.normalize().tz_localize(None).date
+
+
+# --- 데이터 소스 ---
+
+class YahooSource:
+    """야후 파이낸스 분봉 (yf.Ticker().history(interval=...))."""
+
+    def available(self, ticker, interval, start, end, today=None):
+        """받을 수 있는 구간 (start, end). 너무 오래된 날은 잘라냅니다. 받을 수 없으면 None."""
+        lookback, _ = YAHOO_LIMITS[interval]
+        today = _as_date(today or date.today())
+        start = max(_as_date(start), today - timedelta(days=lookback - 1))
+        end = min(_as_date(end), today)
+        return (start, end) if start <= end else None
+
+    def fetch(self, ticker, interval, start, end):
+        import yfinance as yf
+
+        _, span = YAHOO_LIMITS[interval]
+        frames, fetched = [], []
+        day = _as_date(start)
+        while day <= _as_date(end):
+            stop = min(day + timedelta(days=span - 1), _as_date(end))
+            # end 는 그날을 포함하지 않으므로 하루 뒤로
+            data = yf.Ticker(ticker).history(interval=interval, start=day, end=stop + timedelta(days=1), prepost=False)
+            if not data.empty:
+                frames.append(data[[column for column in COLUMNS if column in data.columns]])
+                fetched.append((day, stop))
+            day = stop + timedelta(days=1)
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="Datetime"))
+        data = pd.concat(frames)
+        data = data[~data.index.duplicated(keep="last")].sort_index()
+        # 빈 응답(요청 제한 등)을 받은 구간은 빼서, 그 날짜들이 휴장일로 기록되지 않게 합니다.
+        data.attrs["fetched"] = fetched
+        return data
+
+
+class RecordedSource:
+    """녹화해 둔 분봉 파일(<폴더>/<종목>_<간격>.parquet)을 읽는 소스. 네트워크 없이 같은 데이터를 다시 씁니다.
+
+    파일은 record() 로 만들거나, 시간대가 있는 DatetimeIndex 와 Open/High/Low/Close/Volume 컬럼의 표를
+    to_parquet 으로 저장하면 됩니다.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._frames = {}
+
+    def path(self, ticker, interval):
+        return self.directory / f"{ticker}_{interval}.parquet"
+
+    def _frame(self, ticker, interval):
+        key = (ticker, interval)
+        if key not in self._frames:
+            path = self.path(ticker, interval)
+            self._frames[key] = pd.read_parquet(path).sort_index() if path.exists() else None
+        return self._frames[key]
+
+    def available(self, ticker, interval, start, end, today=None):
+        """녹화한 날짜 범위와 겹치는 구간 (녹화 파일이 없거나 겹치지 않으면 None)."""
+        data = self._frame(ticker, interval)
+        if data is None or data.empty:
+            return None
+        days = _local_dates(data.index)
+        start, end = max(_as_date(start), days[0]), min(_as_date(end), days[-1])
+        return (start, end) if start <= end else None
+
+    def fetch(self, ticker, interval, start, end):
+        data = self._frame(ticker, interval)
+        if data is None:
+            raise FileNotFoundError(f"녹화한 분봉 파일이 없습니다: {self.path(ticker, interval)}")
+        days = _local_dates(data.index)
+        return data[(days >= _as_date(start)) & (days <= _as_date(end))]
+
+
+def record(source, directory, tickers, interval, start, end):
+    """source 에서 받은 분봉을 RecordedSource 가 읽는 파일로 저장하고 경로 목록을 돌려줍니다."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for ticker in tickers:
+        path = RecordedSource(directory).path(ticker, interval)
+        source.fetch(ticker, interval, start, end).to_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def default_source():
+    """DATABACK_BAR_SOURCE 에 폴더가 지정되어 있으면 RecordedSource, 아니면 YahooSource."""
+    recorded = os.environ.get("DATABACK_BAR_SOURCE")
+    return RecordedSource(recorded) if recorded else YahooSource()
+
+
+# --- 저장소 ---
+
+def _to_table(df):
+    import pyarrow as pa
+
+    index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+    arrays = {"time": pa.array(index.as_unit("ns"), type=pa.timestamp("ns", tz=str(index.tz)))}
+    for column in COLUMNS:
+        values = df[column].to_numpy() if column in df.columns else np.full(len(df), np.nan)
+        dtype = pa.int64() if column == "Volume" else pa.float64()
+        arrays[column] = pa.array(np.nan_to_num(values, nan=0) if column == "Volume" else values, type=dtype)
+    return pa.table(arrays)
+
+
+class BarStore:
+    """종목·간격·날짜별 Arrow 파일 저장소."""
+
+    def __init__(self, root=None, source=None):
+        self.root = Path(root or BARS_DIR)
+        self.source = source if source is not None else default_source()
+
+    def path(self, ticker, interval, day):
+        return self.root / interval / ticker / f"{_as_date(day).isoformat()}.arrow"
+
+    def stored_days(self, ticker, interval):
+        folder = self.root / interval / ticker
+        if not folder.exists():
+            return []
+        return sorted(date.fromisoformat(path.stem) for path in folder.glob("*.arrow") if ".partial" not in path.name)
+
+    def missing(self, ticker, interval, start, end, today=None):
+        """저장해야 할 날짜: 파일이 없는 평일과 오늘 이후(장중이라 아직 바뀔 수 있음)."""
+        today = _as_date(today or date.today())
+        return [day for day in trading_days(start, end)
+                if day >= today or not self.path(ticker, interval, day).exists()]
+
+    def ensure(self, ticker, interval, start, end, today=None):
+        """start~end 중 저장소에 없는 날짜를 한 번에 받아 날짜별로 저장하고, 저장한 날 수를 돌려줍니다."""
+        _check_interval(interval)
+        days = self.missing(ticker, interval, start, end, today=today)
+        if not days:
+            return 0
+        window = self.source.available(ticker, interval, days[0], days[-1], today=today)
+        if window is None:
+            return 0
+        days = [day for day in days if window[0] <= day <= window[1]]
+        if not days:
+            return 0
+        data = self.source.fetch(ticker, interval, days[0], days[-1])
+        if data is None or data.empty:
+            # 구간 전체가 비었으면 일시적인 실패(요청 제한 등)일 수 있으므로 아무것도 기록하지 않습니다. (다음에 다시 받음)
+            return 0
+        local = _local_dates(data.index)
+        fetched = data.attrs.get("fetched", [(days[0], days[-1])])
+        written = 0
+        for day in days:
+            bars = data[local == day]
+            # 봉이 있었던 요청 구간 안인데 봉이 없는 평일은 휴장일 → 빈 파일로 기록
+            if bars.empty and not any(first <= day <= last for first, last in fetched):
+                continue
+            self._write(self.path(ticker, interval, day), bars)
+            written += 1
+        return written
+
+    def _write(self, path, df):
+        import pyarrow as pa
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = _to_table(df)
+        # 다 쓴 뒤에 이름을 바꾸므로 읽는 쪽이 반쯤 쓴 파일을 보지 않습니다.
+        partial = path.with_name(f"{path.stem}.partial.arrow")
+        with pa.OSFile(str(partial), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(partial, path)
+
+    def open_day(self, ticker, interval, day):
+        """그날 파일을 메모리 맵으로 연 pyarrow.Table (없으면 None). 데이터를 RAM 으로 읽지 않습니다."""
+        import pyarrow as pa
+
+        path = self.path(ticker, interval, day)
+        if not path.exists():
+            return None
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    def recent_sessions(self, ticker, interval, sessions, today=None):
+        """거래소 현지 오늘까지 봉이 있는 마지막 sessions 거래일의 (첫날, 마지막 날). 하나도 없으면 None.
+
+        휴장일이나 아직 장이 열리지 않은 오늘은 건너뛰도록 SESSION_SLACK 평일 더 거슬러 받아 둡니다.
+        """
+        today = _as_date(today or exchange_today(ticker))
+        start, _ = recent_days(sessions + SESSION_SLACK, today=today)
+        self.ensure(ticker, interval, start, today, today=today)
+        days = [day for day in self.stored_days(ticker, interval)
+                if start <= day <= today and self.open_day(ticker, interval, day).num_rows]
+        if not days:
+            return None
+        days = days[-sessions:]
+        return days[0], days[-1]
+
+    def table(self, ticker, interval, start=None, end=None):
+        """start~end 의 분봉 pyarrow.Table. 날짜 파일을 잘라 이어 붙이기만 하므로 복사가 없습니다.
+
+        start/end 가 날짜면 그날 전체, 시각이면 그 시각까지 (end 포함)
+        """
+        import pyarrow as pa
+
+        _check_interval(interval)
+        stored = self.stored_days(ticker, interval)
+        first = _as_date(start) if start is not None else (stored[0] if stored else None)
+        last = _as_date(end) if end is not None else (stored[-1] if stored else None)
+        tables = []
+        for day in stored:
+            if not first <= day <= last:
+                continue
+            table = self.open_day(ticker, interval, day)
+            if table.num_rows == 0:
+                continue
+            if day == first and isinstance(start, datetime):
+                table = table.slice(self._position(table, start, "left"))
+            if day == last and isinstance(end, datetime):
+                table = table.slice(0, self._position(table, end, "right"))
+            tables.append(table)
+        if not tables:
+            return _to_table(pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], tz="UTC")))
+        return pa.concat_tables(tables)
+
+    @staticmethod
+    def _position(table, moment, side):
+        times = table.column("time")
+        moment = pd.Timestamp(moment)
+        if moment.tz is None:
+            moment = moment.tz_localize(times.type.tz)
+        utc = times.combine_chunks().to_numpy()  # 하루치 시각만 (수백 개)
+        return int(np.searchsorted(utc, np.datetime64(moment.tz_convert("UTC").tz_localize(None)), side=side))
+
+    def frame(self, ticker, interval, start=None, end=None):
+        """start~end 의 분봉 DataFrame (index: 거래소 현지 시각, 컬럼: Open/High/Low/Close/Volume)."""
+        df = self.table(ticker, interval, start, end).to_pandas()
+        return df.set_index("time").rename_axis("Datetime")
+
+
+def fit_bars(df, interval, max_bars):
+    """봉이 max_bars 개 이하가 되도록 interval 이상의 가장 촘촘한 간격으로 묶은 (간격 이름, 봉)."""
+    from databack.ohlc import resample_ohlc
+
+    names = [name for name, _ in RESAMPLE_LEVELS]
+    levels = RESAMPLE_LEVELS[names.index(interval):]
+    for name, rule in levels:
+        bars = df if name == interval else resample_ohlc(df, rule)
+        if len(bars) <= max_bars:
+            break
+    return name, bars
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="분봉을 받아 저장소(fetch)나 녹화 파일(record)로 저장")
+    parser.add_argument("command", choices=["fetch", "record"])
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--interval", choices=INTERVALS, default="5m")
+    parser.add_argument("--days", type=int, default=5, help="오늘을 포함한 최근 평일 수")
+    parser.add_argument("--root", default=str(BARS_DIR), help=f"저장소 폴더 (fetch, 기본: {BARS_DIR})")
+    parser.add_argument("--output", help="녹화 폴더 (record)")
+    args = parser.parse_args()
+
+    start, end = recent_days(args.days)
+    if args.command == "record":
+        if not args.output:
+            parser.error("record 에는 --output 폴더가 필요합니다.")
+        for path in record(YahooSource(), args.output, args.tickers, args.interval, start, end):
+            print(path)
+    else:
+        store = BarStore(args.root)
+        for ticker in args.tickers:
+            written = store.ensure(ticker, args.interval, start, end)
+            print(f"{ticker} {args.interval}: {written}일 저장, {store.table(ticker, args.interval, start, end).num_rows:,}개 봉")
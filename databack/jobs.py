@@ -0,0 +1,217 @@
+"""무거운 계산을 별도 프로세스에서 돌리는 작업 큐.
+
+Streamlit 스크립트 스레드에서 큰 계산을 하면 그 세션이 멈추고,
+GIL 때문에 같은 서버의 다른 세션도 느려집니다.
+여기서는 계산을 프로세스 풀에 맡기고, 결과는 크기 제한 LRU 캐시(databack.cache)에 보관합니다.
+
+- 같은 작업(같은 함수 + 같은 입력)이 실행 중이면 새로 돌리지 않고 그 작업을 함께 기다립니다.
+- 끝난 작업의 결과는 캐시에서 바로 돌려줍니다.
+- 실패한 작업은 다음 submit 한 번에 그 작업을 그대로 돌려주어 wait 가 예외를 내게 하고, 그다음 submit 부터 다시 돌립니다.
+- 끝난 작업은 결과 캐시와 별도로 KEEP_FINISHED_SECONDS 동안 들고 있어서, 결과가 캐시보다 크거나 그 사이에
+  캐시에서 밀려나도 wait 가 다시 실행한 페이지는 같은 결과를 가져갑니다. (다시 계산하지 않음)
+
+    from databack import analytics, jobs
+
+    job = jobs.submit(analytics.correlation_matrix, prices)
+    corr = jobs.wait(job, "상관관계를 계산하는 중입니다...")
+    if corr is not None:
+        ...
+
+작업 함수는 프로세스 사이에서 전달되어야 하므로 databack.analytics 처럼
+모듈 최상위에 정의된 함수여야 합니다. (페이지 파일 안의 함수는 안 됨)
+입력이 커서 지문 계산이 부담되면 key= 로 대신 쓸 값을 넘기세요. (예: 원본 파일 지문)
+돌려받은 결과는 여러 세션이 함께 쓰는 객체이므로 바꿔야 한다면 먼저 .copy() 하세요.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+from concurrent.futures.process import BrokenProcessPool
+
+from databack.cache import LRUCache, value_fingerprint
+
+MAX_WORKERS = int(os.environ.get("DATABACK_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+
+# 끝난 작업을 결과 캐시와 별도로 들고 있는 시간 (wait 가 페이지를 다시 실행해 결과를 가져갈 때까지)
+KEEP_FINISHED_SECONDS = 60
+
+
+class Job:
+    """제출한 작업 하나. 상태와 결과를 확인할 수 있습니다."""
+
+    def __init__(self, key, name, future=None, value=None):
+        self.key = key
+        self.name = name
+        self.future = future
+        self._value = value
+        self.submitted_at = time.monotonic()
+
+    def done(self):
+        return self.future is None or self.future.done()
+
+    def result(self, timeout=None):
+        """결과를 돌려줍니다. timeout 초 안에 끝나지 않으면 TimeoutError 를 냅니다."""
+        if self.future is None:
+            return self._value
+        return self.future.result(timeout=timeout)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.submitted_at
+
+    @property
+    def status(self):
+        if self.future is None:
+            return "cached"
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        return "error" if self.future.exception() is not None else "done"
+
+
+@contextmanager
+def _main_module_hidden():
+    """spawn 으로 띄우는 프로세스가 지금의 __main__ 을 다시 실행하지 않도록 잠시 가립니다.
+
+    Streamlit 은 페이지 스크립트를 실행하는 동안 그 스크립트를 __main__ 으로 등록하므로,
+    그대로 두면 작업 프로세스가 시작하면서 페이지 전체를 한 번 더 실행하려고 합니다.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class JobRunner:
+    """프로세스 풀 + 결과 캐시 + 중복 제거."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_bytes=128 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.results = LRUCache(max_bytes=max_bytes)
+        self._executor = None
+        self._running = {}
+        self._failed = {}  # 작업 키 → 실패한 Job (다음 submit 이 한 번 가져감)
+        self._finished = {}  # 작업 키 → (성공한 Job, 끝난 시각). KEEP_FINISHED_SECONDS 동안만
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # 프로세스 풀은 처음 작업이 들어올 때 만듭니다.
+        # Streamlit 서버는 여러 스레드를 쓰므로 fork 대신 spawn 으로 새 프로세스를 띄웁니다.
+        # 작업 프로세스는 여기서 한꺼번에 띄워 두어서, 이후 submit 때는 새 프로세스가 생기지 않게 합니다.
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with _main_module_hidden():
+                executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                for future in [executor.submit(os.getpid) for _ in range(self.max_workers)]:
+                    future.result()
+            self._executor = executor
+        return self._executor
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """func(*args, **kwargs) 작업을 제출하고 Job 을 돌려줍니다."""
+        name = f"{func.__module__}.{func.__qualname__}"
+        job_key = (name, key if key is not None else value_fingerprint(args, kwargs))
+
+        cached = self.results.get(job_key, group=name)
+        if cached is not None:
+            return Job(job_key, name, value=cached)
+
+        with self._lock:
+            self._drop_expired()
+            job = self._running.get(job_key) or self._failed.pop(job_key, None)
+            if job is None and job_key in self._finished:
+                job = self._finished[job_key][0]
+            if job is not None:
+                return job
+            try:
+                future = self._get_executor().submit(func, *args, **kwargs)
+            except BrokenProcessPool:
+                # 작업 프로세스가 비정상 종료되면 풀을 정리하고 새로 만듭니다.
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                future = self._get_executor().submit(func, *args, **kwargs)
+            job = self._running[job_key] = Job(job_key, name, future=future)
+        # 이미 끝난 작업이면 콜백이 바로 실행되므로 잠금을 푼 뒤에 등록합니다.
+        future.add_done_callback(lambda f: self._finish(job))
+        return job
+
+    def _finish(self, job):
+        # 결과를 캐시에 넣은 뒤에 실행 목록에서 빼야, 그 사이에 들어온 submit 이 같은 작업을 또 돌리지 않습니다.
+        failed = job.future.cancelled() or job.future.exception() is not None
+        if not failed:
+            self.results.put(job.key, job.future.result(), group=job.name, load_seconds=job.elapsed)
+        with self._lock:
+            if not failed:
+                self._finished[job.key] = (job, time.monotonic())
+            elif not job.future.cancelled():
+                self._failed[job.key] = job
+            self._running.pop(job.key, None)
+
+    def _drop_expired(self):
+        # self._lock 을 잡은 상태에서 부릅니다.
+        deadline = time.monotonic() - KEEP_FINISHED_SECONDS
+        for key in [key for key, (_, finished_at) in self._finished.items() if finished_at < deadline]:
+            del self._finished[key]
+
+    def running(self):
+        """실행 중이거나 대기 중인 작업 목록."""
+        with self._lock:
+            return list(self._running.values())
+
+    def invalidate(self, name=None):
+        """name 함수(없으면 전체)의 결과 캐시를 비웁니다."""
+        with self._lock:
+            for key in [key for key in self._finished if name is None or key[0] == name]:
+                del self._finished[key]
+        return self.results.invalidate(name)
+
+    def stats(self):
+        stats = self.results.stats()
+        stats["running"] = len(self.running())
+        stats["max_workers"] = self.max_workers
+        return stats
+
+
+runner = JobRunner()
+
+
+def submit(func, *args, key=None, **kwargs):
+    """공용 작업 큐에 작업을 제출합니다."""
+    return runner.submit(func, *args, key=key, **kwargs)
+
+
+def wait(job, message="계산 중입니다...", timeout=0.3, interval=0.5):
+    """Streamlit 페이지에서 작업 결과를 가져옵니다.
+
+    timeout 초 안에 끝나면 결과를 바로 돌려줍니다. 아니면 진행 상황을 표시하고 None 을 돌려주며,
+    작업이 끝나면 페이지를 다시 실행해서 그때 결과를 가져가게 합니다. (그동안 화면은 멈추지 않음)
+    작업이 실패했으면 그 예외를 그대로 냅니다.
+    """
+    import streamlit as st
+
+    try:
+        return job.result(timeout=timeout)
+    except TimeoutError:
+        pass
+
+    @st.fragment(run_every=interval)
+    def progress():
+        if job.done():
+            st.rerun()
+        st.caption(f"⏳ {message} ({job.elapsed:.1f}초)")
+
+    progress()
+    return None
+
+
+def stats():
+    return runner.stats()
@@ -0,0 +1,185 @@
+"""KDC(한국십진분류법) 계층별 대출 건수 트리.
+
+대출 목록의 KDC 값(예: 813.7)을 대분류(800 문학) → 강목(810 한국문학) → 요목(813) 으로 나누고,
+모든 단계의 대출 건수/도서 수 합계를 한 번에 계산해 작은 배열 트리로 저장합니다.
+
+노드는 전위 순서(부모 바로 뒤에 자식들)로 저장하고 노드마다 하위 트리가 끝나는 위치를 기억하므로,
+어떤 노드의 하위 트리든 배열을 잘라내기만 하면 됩니다. (클릭할 때마다 DataFrame 을 다시 묶지 않음)
+
+    tree = datasets.load("kdc_tree")
+    tree.ids, tree.labels, tree.parents, tree.loans   # plotly treemap/sunburst 에 그대로 넘김
+    tree.subtree("81")                                # 한국문학 아래만
+    tree.children("8")                                # 문학의 강목별 합계 표
+
+KDC 가 비어 있는 책은 '미분류' 로 묶습니다.
+"""
+import numpy as np
+import pandas as pd
+
+CLASS_NAMES = {
+    "0": "총류", "1": "철학", "2": "종교", "3": "사회과학", "4": "자연과학",
+    "5": "기술과학", "6": "예술", "7": "언어", "8": "문학", "9": "역사",
+}
+
+# 강목 이름 (이름이 없는 강목은 번호만 표시)
+DIVISION_NAMES = {
+    "01": "도서학·서지학", "02": "문헌정보학", "03": "백과사전", "04": "강연집·수필집·연설문집",
+    "05": "일반 연속간행물", "06": "일반 학회·단체·협회·기관", "07": "신문·저널리즘", "08": "일반 전집·총서", "09": "향토자료",
+    "11": "형이상학", "12": "인식론·인과론·인간학", "13": "철학의 체계", "14": "경학", "15": "동양철학·동양사상",
+    "16": "서양철학", "17": "논리학", "18": "심리학", "19": "윤리학·도덕철학",
+    "21": "비교종교", "22": "불교", "23": "기독교", "24": "도교", "25": "천도교",
+    "27": "힌두교·브라만교", "28": "이슬람교", "29": "기타 제종교",
+    "31": "통계자료", "32": "경제학", "33": "사회학·사회문제", "34": "정치학", "35": "행정학",
+    "36": "법률·법학", "37": "교육학", "38": "풍습·예절·민속학", "39": "국방·군사학",
+    "41": "수학", "42": "물리학", "43": "화학", "44": "천문학", "45": "지학",
+    "46": "광물학", "47": "생명과학", "48": "식물학", "49": "동물학",
+    "51": "의학", "52": "농업·농학", "53": "공학·공업일반", "54": "건축·건축학", "55": "기계공학",
+    "56": "전기공학·통신공학·전자공학", "57": "화학공학", "58": "제조업", "59": "생활과학",
+    "62": "조각·조형미술", "63": "공예", "64": "서예", "65": "회화·도화·디자인",
+    "66": "사진예술", "67": "음악", "68": "공연예술·매체예술", "69": "오락·스포츠",
+    "71": "한국어", "72": "중국어", "73": "일본어", "74": "영어", "75": "독일어",
+    "76": "프랑스어", "77": "스페인어·포르투갈어", "78": "이탈리아어", "79": "기타 제어",
+    "81": "한국문학", "82": "중국문학", "83": "일본문학", "84": "영미문학", "85": "독일문학",
+    "86": "프랑스문학", "87": "스페인·포르투갈문학", "88": "이탈리아문학", "89": "기타 제문학",
+    "91": "아시아", "92": "유럽", "93": "아프리카", "94": "북아메리카", "95": "남아메리카",
+    "96": "오세아니아", "97": "양극지방", "98": "지리", "99": "전기",
+}
+
+UNCLASSIFIED = "미분류"
+
+
+def section_codes(kdc):
+    """KDC 값(숫자 또는 글자)의 요목 번호 3자리 (예: 813.7 → '813', 31 → '031'). 없으면 '미분류'."""
+    number = pd.to_numeric(pd.Series(kdc).astype("object"), errors="coerce")
+    valid = number.between(0, 999.9999)
+    codes = number.where(valid).floordiv(1).astype("Int64").astype("string").str.zfill(3)
+    return codes.fillna(UNCLASSIFIED).astype(str)
+
+
+def section_totals(df):
+    """대출 목록의 요목별 (대출건수 합계, 도서 수). 트리를 만드는 입력이며 chunk 별로 구해 더할 수 있습니다."""
+    sections = section_codes(df["KDC"]).to_numpy()
+    loans = pd.to_numeric(df["대출건수"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    return pd.DataFrame({"loans": loans, "books": 1}, index=sections).groupby(level=0).sum()
+
+
+def _label(node_id):
+    if node_id == UNCLASSIFIED:
+        return UNCLASSIFIED
+    if len(node_id) == 1:
+        return f"{node_id}00 {CLASS_NAMES[node_id]}"
+    if len(node_id) == 2:
+        # 끝자리가 0 인 강목(예: 800)은 그 대분류 전체를 다루는 책
+        name = DIVISION_NAMES.get(node_id) or (f"{CLASS_NAMES[node_id[0]]} 일반" if node_id[1] == "0" else None)
+        return f"{node_id}0 {name}" if name else f"{node_id}0"
+    return node_id
+
+
+class KdcTree:
+    """대분류 → 강목 → 요목 트리. 노드별 배열은 전위 순서이고 end[i] 는 i 의 하위 트리가 끝나는 위치입니다."""
+
+    def __init__(self, ids, parents, depth, loans, books, end):
+        self.ids = np.asarray(ids, dtype=object)
+        self.labels = np.array([_label(node_id) for node_id in self.ids], dtype=object)
+        self.parents = np.asarray(parents, dtype=object)   # 최상위 노드의 부모는 "" (plotly 규칙)
+        self.depth = np.asarray(depth, dtype=np.int8)      # 0 대분류, 1 강목, 2 요목
+        self.loans = np.asarray(loans, dtype=np.int64)
+        self.books = np.asarray(books, dtype=np.int64)
+        self.end = np.asarray(end, dtype=np.int32)
+        self._position = {node_id: i for i, node_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_totals(cls, totals):
+        """section_totals() 결과(요목 → loans, books)로 모든 단계의 합계를 만듭니다."""
+        totals = totals.groupby(level=0).sum().sort_index(key=lambda index: index.map(lambda s: (s == UNCLASSIFIED, s)))
+        sections = totals.index.to_numpy(dtype=object)
+        classes = np.array([s if s == UNCLASSIFIED else s[0] for s in sections], dtype=object)
+        divisions = np.array([None if s == UNCLASSIFIED else s[:2] for s in sections], dtype=object)
+
+        ids, parents, depth, loans, books, end = [], [], [], [], [], []
+
+        def add(node_id, parent, level, rows):
+            ids.append(node_id)
+            parents.append(parent)
+            depth.append(level)
+            loans.append(int(totals["loans"].to_numpy()[rows].sum()))
+            books.append(int(totals["books"].to_numpy()[rows].sum()))
+            end.append(None)
+            return len(ids) - 1
+
+        # 요목 번호가 정렬되어 있으므로 같은 대분류/강목은 연속된 구간입니다.
+        for class_id in pd.unique(classes):
+            class_rows = classes == class_id
+            top = add(class_id, "", 0, class_rows)
+            if class_id != UNCLASSIFIED:
+                for division_id in pd.unique(divisions[class_rows]):
+                    division_rows = divisions == division_id
+                    middle = add(division_id, class_id, 1, division_rows)
+                    for row in np.flatnonzero(division_rows):
+                        leaf = add(sections[row], division_id, 2, [row])
+                        end[leaf] = leaf + 1
+                    end[middle] = len(ids)
+            end[top] = len(ids)
+        return cls(ids, parents, depth, loans, books, end)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls.from_totals(section_totals(df))
+
+    @classmethod
+    def from_csv(cls, path, chunk_rows=None, **read_kwargs):
+        """대출 목록 CSV 를 KDC, 대출건수 컬럼만 조금씩 읽어 트리를 만듭니다. (파일 크기와 관계없이 메모리 일정)"""
+        from databack import ingest
+
+        options = {"chunk_rows": chunk_rows} if chunk_rows else {}
+        chunks = ingest.stream_csv(path, columns=["KDC", "대출건수"], **options, **read_kwargs)
+        totals = [section_totals(chunk) for chunk in chunks]
+        if not totals:
+            return cls.from_totals(pd.DataFrame({"loans": [], "books": []}, dtype=np.int64))
+        return cls.from_totals(pd.concat(totals))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        arrays = self.depth.nbytes + self.loans.nbytes + self.books.nbytes + self.end.nbytes
+        return arrays + sum(len(label) * 3 + len(node_id) + 100 for node_id, label in zip(self.ids, self.labels))
+
+    def label(self, node_id):
+        """노드 번호의 표시 이름 (예: '81' → '810 한국문학')."""
+        return self.labels[self._position[node_id]]
+
+    def subtree(self, node_id=None):
+        """node_id 와 그 아래 노드만 담은 트리 (None 이면 전체). 배열을 잘라내기만 합니다."""
+        if node_id is None:
+            return self
+        start = self._position[node_id]
+        stop = self.end[start]
+        parents = self.parents[start:stop].copy()
+        parents[0] = ""
+        return KdcTree(self.ids[start:stop], parents, self.depth[start:stop] - self.depth[start],
+                       self.loans[start:stop], self.books[start:stop], self.end[start:stop] - start)
+
+    def children(self, node_id=None):
+        """node_id 바로 아래 노드들의 합계 표 (None 이면 대분류). 비율은 node_id 합계 대비 %."""
+        if node_id is None:
+            rows = np.flatnonzero(self.depth == 0)
+            total = self.loans[rows].sum()
+        else:
+            start = self._position[node_id]
+            rows = start + np.flatnonzero(self.depth[start:self.end[start]] == self.depth[start] + 1)
+            total = self.loans[start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(total > 0, self.loans[rows] / total * 100, np.nan)
+        return pd.DataFrame({
+            "분류": self.ids[rows],
+            "이름": self.labels[rows],
+            "대출건수": self.loans[rows],
+            "도서수": self.books[rows],
+            "비율": share,
+        })
+
+    def options(self):
+        """대분류와 강목 노드 번호 목록 (하위 트리를 고르는 선택 상자용, 자식이 있는 노드만)."""
+        return [node_id for i, node_id in enumerate(self.ids) if self.depth[i] < 2 and self.end[i] > i + 1]
@@ -0,0 +1,75 @@
+"""여러 해상도(일봉/주봉/월봉)의 OHLC 봉.
+
+10~20년치 일봉을 그대로 캔들스틱으로 그리면 봉이 수천 개가 되어 전송량과 그리는 시간이 커집니다.
+종목마다 주봉/월봉을 미리 한 번 만들어 두고, 보여줄 구간에 봉이 max_bars 개 이하가 되는
+가장 촘촘한 해상도를 골라 씁니다. 구간을 좁히면(확대) 자동으로 더 촘촘한 봉으로 바뀌므로
+어떤 구간을 보든 봉 수는 max_bars 이하로 유지됩니다.
+
+    pyramid = OHLCPyramid(history)            # yf.Ticker(...).history() 결과
+    resolution, bars = pyramid.bars(start, end)   # ("주봉", DataFrame)
+"""
+import pandas as pd
+
+# (이름, resample 규칙). 촘촘한 것부터 순서대로.
+LEVELS = (("일봉", None), ("주봉", "W-FRI"), ("월봉", "ME"))
+
+# 캔들스틱 차트 한 개에 그릴 최대 봉 수 (폭 1000px 안팎 차트에서 봉 하나가 2px 이상 되도록)
+MAX_BARS = 400
+
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample_ohlc(df, rule):
+    """일봉을 rule(예: 'W-FRI', 'ME') 간격의 봉으로 합칩니다. 거래가 없는 구간은 뺍니다."""
+    agg = {column: how for column, how in _AGG.items() if column in df.columns}
+    return df[list(agg)].resample(rule).agg(agg).dropna(subset=["Close"])
+
+
+class OHLCPyramid:
+    """한 종목의 일봉/주봉/월봉."""
+
+    def __init__(self, daily):
+        columns = [column for column in _AGG if column in daily.columns]
+        base = daily[columns].sort_index()
+        self.levels = [
+            (name, base if rule is None else resample_ohlc(base, rule))
+            for name, rule in LEVELS
+        ]
+
+    @property
+    def start(self):
+        return self.levels[0][1].index[0]
+
+    @property
+    def end(self):
+        return self.levels[0][1].index[-1]
+
+    def __len__(self):
+        return len(self.levels[0][1])
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        return sum(int(bars.memory_usage(deep=deep).sum()) for _, bars in self.levels)
+
+    def _timestamp(self, value, index):
+        ts = pd.Timestamp(value)
+        if index.tz is not None and ts.tz is None:
+            ts = ts.tz_localize(index.tz)
+        return ts
+
+    def bars(self, start=None, end=None, max_bars=MAX_BARS):
+        """start~end 구간을 max_bars 개 이하로 그릴 수 있는 가장 촘촘한 (해상도 이름, 봉)을 돌려줍니다.
+
+        가장 거친 해상도로도 넘치면 그 해상도의 봉을 그대로 돌려줍니다.
+        """
+        for name, bars in self.levels:
+            index = bars.index
+            lo = index.searchsorted(self._timestamp(start, index), "left") if start is not None else 0
+            # end 는 그날 전체를 포함하도록 다음 날 0시 직전까지로 봅니다.
+            hi = (
+                index.searchsorted(self._timestamp(end, index) + pd.Timedelta(days=1), "left")
+                if end is not None else len(index)
+            )
+            if hi - lo <= max_bars:
+                break
+        return name, bars.iloc[lo:hi]
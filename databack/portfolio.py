@@ -0,0 +1,121 @@
+"""포트폴리오 백테스트.
+
+종목별 비중과 리밸런싱 주기로 포트폴리오 가치(자산 곡선), 회전율, 낙폭, 샤프 지수를 계산합니다.
+날짜마다 파이썬 반복문을 돌지 않고 수익률 행렬 전체에 대한 배열 연산으로 계산하며,
+비중 조합 여러 개(시나리오)도 행렬 곱 한 번으로 함께 계산합니다.
+
+    returns = portfolio.returns_matrix(prices)             # 날짜 × 종목 종가 → 일간 수익률
+    result = portfolio.backtest(returns, [0.5, 0.3, 0.2], rebalance="M")
+    result["equity"], result["drawdown"], result["stats"]
+
+    swept = portfolio.sweep(returns, 1000, rebalance="M")  # 무작위 비중 1000개를 한 번에
+
+작업 큐(databack.jobs)에서 실행할 수 있도록 모두 모듈 최상위 함수이고 Streamlit 은 import 하지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+# 리밸런싱 주기: None 이면 처음 비중으로 산 뒤 그대로 둡니다. 나머지는 pandas 기간(Period) 단위.
+REBALANCE_FREQS = (None, "D", "W", "M", "Q", "Y")
+
+TRADING_DAYS = 252
+
+
+def returns_matrix(prices):
+    """날짜 × 종목 가격표를 (모든 종목에 값이 있는 날짜만 남겨) 일간 수익률 행렬로 바꿉니다."""
+    return prices.dropna().pct_change().iloc[1:]
+
+
+def rebalance_mask(index, freq):
+    """날짜마다 그날 장 시작 전에 목표 비중으로 되돌리는지(True) 여부. 첫날은 항상 True."""
+    mask = np.zeros(len(index), dtype=bool)
+    if freq is not None and len(index) > 1:
+        naive = index.tz_localize(None) if getattr(index, "tz", None) is not None else index
+        labels = naive.to_period(freq).asi8
+        mask[1:] = labels[1:] != labels[:-1]
+    mask[:1] = True
+    return mask
+
+
+def _simulate(returns, weights, rebalance):
+    """(자산 곡선 S×T, 리밸런싱마다 바꾼 비중 합 S) 를 계산합니다. 시작 가치는 1.
+
+    리밸런싱 사이(구간)에는 종목별 가치가 각자의 누적 수익률만큼 불어나므로,
+    구간 시작 대비 포트폴리오 가치 = 비중 @ 종목별 누적 성장률 (행렬 곱 한 번)이고
+    구간 끝 가치들을 누적곱하면 각 구간의 시작 가치가 됩니다.
+    """
+    R = returns.to_numpy(dtype=float)
+    W = np.atleast_2d(np.asarray(weights, dtype=float))
+    W = W / W.sum(axis=1, keepdims=True)
+    T = len(R)
+
+    starts = rebalance_mask(returns.index, rebalance)
+    start_idx = np.flatnonzero(starts)
+    end_idx = np.append(start_idx[1:] - 1, T - 1)
+    segment = np.cumsum(starts) - 1
+
+    # 종목별 누적 성장률(앞에 1 을 붙임) → 날짜마다 자기 구간 시작 대비 성장률 (T×N)
+    growth = np.vstack([np.ones((1, R.shape[1])), np.cumprod(1 + R, axis=0)])
+    since_start = growth[1:] / growth[start_idx[segment]]
+
+    within = W @ since_start.T                        # S×T, 구간 시작 대비 포트폴리오 가치
+    segment_growth = within[:, end_idx]               # S×J, 구간마다 불어난 배수
+    at_start = np.hstack([np.ones((len(W), 1)), np.cumprod(segment_growth, axis=1)[:, :-1]])
+    equity = at_start[:, segment] * within
+
+    # 회전율: 리밸런싱 직전(앞 구간 끝)에 가격 변동으로 바뀐 비중을 목표 비중으로 되돌린 양
+    before = end_idx[:-1]
+    drifted = W[:, None, :] * since_start[before][None, :, :] / within[:, before, None]
+    turnover = 0.5 * np.abs(W[:, None, :] - drifted).sum(axis=(1, 2))
+    return equity, turnover
+
+
+def _stats(equity, turnover, periods_per_year):
+    years = equity.shape[1] / periods_per_year
+    previous = np.hstack([np.ones((len(equity), 1)), equity[:, :-1]])
+    daily = equity / previous - 1
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = daily.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+        sharpe = daily.mean(axis=1) * periods_per_year / volatility
+    stats = {
+        "total_return": equity[:, -1] - 1,
+        "cagr": equity[:, -1] ** (1 / years) - 1,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.min(axis=1),
+        "turnover": turnover / years,
+    }
+    return stats, drawdown
+
+
+def backtest(returns, weights, rebalance="M", periods_per_year=TRADING_DAYS):
+    """비중 weights(종목 수 N 개, 또는 시나리오 S × N)로 투자했을 때의 결과.
+
+    rebalance: REBALANCE_FREQS 중 하나. 비중은 합이 1 이 되도록 맞춥니다.
+    반환 dict:
+      equity   — 날짜 × 시나리오 자산 곡선 (시작 1)
+      drawdown — 날짜 × 시나리오 고점 대비 낙폭 (0 이하)
+      stats    — 시나리오별 total_return, cagr, volatility, sharpe(무위험 수익률 0), max_drawdown,
+                 turnover(연 환산 단방향 회전율, 1 = 한 해에 포트폴리오 전체를 한 번 바꿈)
+    """
+    equity, turnover = _simulate(returns, weights, rebalance)
+    stats, drawdown = _stats(equity, turnover, periods_per_year)
+    return {
+        "equity": pd.DataFrame(equity.T, index=returns.index),
+        "drawdown": pd.DataFrame(drawdown.T, index=returns.index),
+        "stats": pd.DataFrame(stats),
+    }
+
+
+def random_weights(n_assets, n, seed=0):
+    """합이 1 인 무작위 비중 n 개 (n × n_assets, 디리클레 분포)."""
+    return np.random.default_rng(seed).dirichlet(np.ones(n_assets), size=n)
+
+
+def sweep(returns, n=1000, rebalance="M", seed=0, periods_per_year=TRADING_DAYS):
+    """무작위 비중 n 개를 한꺼번에 백테스트한 성과표. (종목 비중 컬럼 + backtest 의 stats 컬럼)"""
+    weights = random_weights(returns.shape[1], n, seed)
+    equity, turnover = _simulate(returns, weights, rebalance)
+    stats, _ = _stats(equity, turnover, periods_per_year)
+    return pd.concat([pd.DataFrame(weights, columns=returns.columns), pd.DataFrame(stats)], axis=1)
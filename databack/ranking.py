@@ -0,0 +1,157 @@
+"""시가총액 순위.
+
+페이지마다 손으로 적어 두던 "시가총액 상위 기업" 목록 대신,
+후보 종목(유니버스)의 발행주식수 × 최근 종가로 시가총액을 계산해 상위 N개를 고릅니다.
+
+- 유니버스: 종목별 이름/회사/시장/통화/발행주식수/기준가. 저장소의 resources/universe.csv 가 기본이고,
+  refresh_universe() 로 yfinance 에서 새로 받은 값은 parquet 파일(열 단위 저장)에 저장합니다.
+- 가격: 데이터셋 "stock_closes" (유니버스 전체 종가를 한 번에 받아 1시간 캐시).
+  종가를 받지 못한 종목은 유니버스에 적어 둔 기준가(ref_price)를 씁니다.
+- 환율: 통화별 최근 환율(databack.fx, 1시간 캐시)로 USD 시가총액을 구합니다. 환율을 받지 못하면 고정환율 통화만.
+- 계산: 시가총액은 배열 곱셈 한 번으로, 상위 N개는 np.argpartition 으로 N개만 고른 뒤 그 N개만 정렬합니다.
+
+    from databack import ranking
+
+    top_companies = ranking.top_companies(10)   # {"Microsoft": "MSFT", ...} 시가총액 순
+
+    python -m databack.ranking --refresh [구성종목.csv]   # 유니버스 새로고침 (네트워크 필요)
+"""
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from databack import datasets, fx, tracing
+
+UNIVERSE_COLUMNS = ["ticker", "name", "issuer", "market", "currency", "shares_outstanding", "ref_price", "ref_date"]
+
+# 1 단위 통화 = 몇 USD. 환율을 받지 못했을 때 쓰는 고정환율(페그) 통화 (databack.fx.FIXED_TO_USD)
+# 최근 환율도 고정환율도 없는 통화의 종목은 시가총액을 USD 로 바꿀 수 없어 순위에서 빠집니다.
+FX_TO_USD = fx.FIXED_TO_USD
+
+
+def market_caps(universe, prices, fx_rates=None):
+    """유니버스 각 행의 USD 시가총액 배열. (발행주식수 × 가격 × 환율, 계산할 수 없으면 NaN)"""
+    fx_rates = FX_TO_USD if fx_rates is None else fx_rates
+    shares = universe["shares_outstanding"].to_numpy(dtype=float)
+    rates = universe["currency"].map(fx_rates).to_numpy(dtype=float)
+    return shares * np.asarray(prices, dtype=float) * rates
+
+
+def top_n_indices(values, n):
+    """values 에서 큰 값 n 개의 위치를 큰 순서대로 돌려줍니다. NaN 은 뺍니다.
+
+    전체를 정렬하지 않고 argpartition 으로 n 개만 고른 뒤 그 n 개만 정렬합니다.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    if n < len(valid):
+        valid = valid[np.argpartition(-values[valid], n - 1)[:n]]
+    return valid[np.argsort(-values[valid], kind="stable")]
+
+
+def latest_prices(universe):
+    """유니버스 각 행의 (가격 배열, 최근 종가인지 여부 배열). 최근 종가가 없으면 기준가를 씁니다."""
+    closes = datasets.load("stock_closes", tickers=tuple(universe["ticker"]))
+    latest = closes.reindex(universe["ticker"]).to_numpy(dtype=float)
+    is_latest = ~np.isnan(latest)
+    return np.where(is_latest, latest, universe["ref_price"].to_numpy(dtype=float)), is_latest
+
+
+@tracing.traced("ranking")
+def rank(n=10, markets=None, per_issuer=True, fx_rates=None):
+    """시가총액 상위 n 개 종목 표 (시가총액 큰 순).
+
+    markets: 고를 시장 목록 (예: ["S&P500"]). 없으면 전체.
+    per_issuer: True 면 한 회사의 여러 주식(예: GOOGL/GOOG)을 회사 전체 시가총액으로 합쳐
+    가장 큰 주식 하나만 남깁니다. (이름은 회사 이름)
+    fx_rates: {통화: USD 환율}. 없으면 최근 환율 (databack.fx.latest_to_usd)
+    반환 컬럼: name, ticker, market, currency, price, market_cap_usd, price_source('latest'/'ref')
+    """
+    universe = datasets.load("market_universe")
+    price, is_latest = latest_prices(universe)
+    if fx_rates is None:
+        fx_rates = fx.latest_to_usd(universe["currency"])
+    caps = market_caps(universe, price, fx_rates)
+    if markets is not None:
+        caps = np.where(universe["market"].isin(markets).to_numpy(), caps, np.nan)
+    if per_issuer:
+        by_issuer = pd.Series(caps).groupby(universe["issuer"].to_numpy())
+        is_main = caps == by_issuer.transform("max").to_numpy()
+        caps = np.where(is_main, by_issuer.transform("sum").to_numpy(), np.nan)
+
+    order = top_n_indices(caps, n)
+    table = universe.iloc[order][["name", "ticker", "market", "currency"]].reset_index(drop=True)
+    if per_issuer:
+        table["name"] = universe["issuer"].to_numpy()[order]
+    table["price"] = price[order]
+    table["market_cap_usd"] = caps[order]
+    table["price_source"] = np.where(is_latest[order], "latest", "ref")
+    return table
+
+
+def top_companies(n=10, **options):
+    """시가총액 상위 n 개 기업의 {이름: 티커} (시가총액 큰 순). options 는 rank() 와 같습니다."""
+    table = rank(n, **options)
+    return dict(zip(table["name"], table["ticker"]))
+
+
+def refresh_universe(constituents=None, path=None):
+    """yfinance 에서 발행주식수와 최근 종가를 새로 받아 유니버스 parquet 파일을 다시 씁니다. (네트워크 필요)
+
+    constituents: 후보 종목 목록 (ticker, name, market, currency 컬럼이 있는 DataFrame 또는 CSV 경로).
+    없으면 지금 유니버스의 종목을 그대로 씁니다. S&P 500 / KOSPI 200 구성 종목 CSV 를 넘겨 유니버스를 넓힐 수 있습니다.
+    새 값을 받지 못한 종목은 이전에 알던 값을 그대로 둡니다.
+    """
+    import yfinance as yf
+
+    previous = datasets.load("market_universe").set_index("ticker")
+    if constituents is None:
+        universe = previous.reset_index()
+    elif isinstance(constituents, (str, Path)):
+        universe = pd.read_csv(constituents, dtype={"ticker": str})
+    else:
+        universe = constituents.copy()
+    if "issuer" not in universe:
+        universe["issuer"] = universe["name"]
+    for column in ("shares_outstanding", "ref_price", "ref_date"):
+        if column not in universe:
+            universe[column] = universe["ticker"].map(previous[column])
+
+    shares, prices = [], []
+    for ticker in universe["ticker"]:
+        try:
+            info = yf.Ticker(ticker).fast_info
+            shares.append(info["shares"])
+            prices.append(info["last_price"])
+        except Exception:
+            shares.append(np.nan)
+            prices.append(np.nan)
+    shares = pd.Series(shares, index=universe.index, dtype=float)
+    prices = pd.Series(prices, index=universe.index, dtype=float)
+
+    universe["shares_outstanding"] = shares.fillna(universe["shares_outstanding"])
+    universe["ref_price"] = prices.fillna(universe["ref_price"])
+    universe["ref_date"] = universe["ref_date"].where(prices.isna(), date.today().isoformat())
+
+    path = Path(path or datasets.UNIVERSE_PARQUET)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    universe = universe[UNIVERSE_COLUMNS]
+    universe.to_parquet(path, index=False)
+    datasets.invalidate("market_universe")
+    return universe
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="시가총액 순위 보기 / 유니버스 새로고침")
+    parser.add_argument("--refresh", nargs="?", const="", metavar="CSV", help="유니버스 새로고침 (구성 종목 CSV 선택)")
+    parser.add_argument("-n", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.refresh is not None:
+        refreshed = refresh_universe(args.refresh or None)
+        print(f"유니버스 {len(refreshed)}개 종목 저장: {datasets.UNIVERSE_PARQUET}")
+    print(rank(args.n).to_string())
@@ -0,0 +1,142 @@
+"""몬테카를로 위험 분석 (VaR / CVaR).
+
+일간 수익률 행렬(날짜 × 종목)로 앞으로 horizon 일 동안의 가상 경로를 수만 개 만들고,
+그 동안 포트폴리오를 그대로 들고 있었을 때의 수익률 분포에서 VaR/CVaR 를 계산합니다.
+
+- 경로 만드는 방법
+  - "bootstrap": 과거의 하루(모든 종목의 그날 수익률 한 줄)를 무작위로 골라 이어 붙입니다.
+  - "normal": 과거 수익률의 평균과 공분산 행렬을 따르는 다변량 정규분포에서 뽑습니다.
+- 메모리: 경로는 chunk 단위(한 번에 최대 CHUNK_BYTES 바이트)로 만들고 경로별 최종 수익률만 남깁니다.
+  경로 수를 늘려도 메모리는 chunk 하나 + 경로 수만큼의 숫자만 씁니다.
+- 재현성: seed 를 주면 경로 PATH_BLOCK 개 묶음(block)마다 SeedSequence 로 나눈 시드를 씁니다.
+  block 크기는 고정이므로 chunk 크기(chunk_bytes)나 프로세스 수(workers)와 관계없이 항상 같은 결과가 나옵니다.
+
+    paths = risk.simulate(returns, weights, horizon=10, n_paths=50_000, seed=0)
+    table = risk.var_cvar(paths)        # 신뢰수준별 VaR / CVaR (손실률, 양수)
+
+    python -m benchmarks.montecarlo      # 초당 경로 수 벤치마크
+
+작업 큐(databack.jobs)에서 실행할 수 있도록 모두 모듈 최상위 함수이고 Streamlit 은 import 하지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+METHODS = ("bootstrap", "normal")
+
+# chunk 하나에서 만드는 (경로 × 일 × 종목) 수익률 배열의 최대 크기
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# 난수 흐름(시드) 하나가 만드는 경로 수. chunk 는 block 을 몇 개씩 묶어 계산합니다. (바꾸면 같은 seed 의 결과가 달라짐)
+PATH_BLOCK = 1024
+
+CONFIDENCE_LEVELS = (0.95, 0.99)
+
+
+def block_sizes(n_paths):
+    """n_paths 개의 경로를 PATH_BLOCK 개씩 나눈 block 별 경로 수 목록."""
+    sizes = [PATH_BLOCK] * (n_paths // PATH_BLOCK)
+    if n_paths % PATH_BLOCK:
+        sizes.append(n_paths % PATH_BLOCK)
+    return sizes
+
+
+def chunk_sizes(n_paths, horizon, n_assets, chunk_bytes=CHUNK_BYTES):
+    """n_paths 개의 경로를 메모리 한도 안에서 만들 수 있는 chunk 별 block 수 목록. (chunk 는 block 하나 이상)"""
+    per_chunk = max(1, chunk_bytes // (PATH_BLOCK * horizon * n_assets * 8))
+    n_blocks = len(block_sizes(n_paths))
+    sizes = [per_chunk] * (n_blocks // per_chunk)
+    if n_blocks % per_chunk:
+        sizes.append(n_blocks % per_chunk)
+    return sizes
+
+
+def _cholesky(cov):
+    """공분산 행렬의 촐레스키 분해. 수치 오차로 양의 정부호가 아니면 대각에 아주 작은 값을 더합니다."""
+    jitter = 0.0
+    for _ in range(6):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, 1e-12 * np.trace(cov) / len(cov) or 1e-12)
+    raise np.linalg.LinAlgError("공분산 행렬을 분해할 수 없습니다.")
+
+
+def _simulate_chunk(sizes, horizon, weights, method, data, seeds):
+    """block 들(block 별 경로 수와 시드)의 horizon 일 포트폴리오 수익률 (길이 sum(sizes) 배열)."""
+    return np.concatenate([
+        _simulate_block(size, horizon, weights, method, data, seed) for size, seed in zip(sizes, seeds)
+    ])
+
+
+def _simulate_block(size, horizon, weights, method, data, seed):
+    """경로 size 개의 horizon 일 포트폴리오 수익률 (길이 size 배열)."""
+    rng = np.random.default_rng(seed)
+    if method == "bootstrap":
+        days = rng.integers(0, len(data), size=(size, horizon))
+        daily = data[days]                                          # size × horizon × N
+    else:
+        mean, chol = data
+        daily = rng.standard_normal((size, horizon, len(mean))) @ chol.T + mean
+    # 기간 동안 리밸런싱하지 않으므로 종목별 누적 성장률에 처음 비중을 곱해 더합니다.
+    growth = np.prod(1 + daily, axis=1)                             # size × N
+    return growth @ weights - 1
+
+
+def simulate(returns, weights, horizon=10, n_paths=50_000, method="bootstrap", seed=None,
+             workers=1, chunk_bytes=CHUNK_BYTES):
+    """horizon 일 동안 포트폴리오를 들고 있었을 때의 수익률을 n_paths 개 경로로 시뮬레이션합니다.
+
+    returns: 날짜 × 종목 일간 수익률 (databack.portfolio.returns_matrix)
+    weights: 종목별 비중 (합이 1 이 되도록 맞춤)
+    seed: 정수를 주면 항상 같은 결과 (workers, chunk_bytes 와 관계없음). None 이면 매번 다름.
+    workers: 2 이상이면 chunk 들을 그 수만큼의 프로세스에 나눠 계산합니다.
+    chunk_bytes: 한 번에 만드는 수익률 배열의 최대 크기 (block 하나보다 작게는 나누지 않음)
+    """
+    if method not in METHODS:
+        raise ValueError(f"method 는 {METHODS} 중 하나여야 합니다: {method!r}")
+    values = returns.to_numpy(dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+
+    if method == "bootstrap":
+        data = values
+    else:
+        data = (values.mean(axis=0), _cholesky(np.atleast_2d(np.cov(values, rowvar=False))))
+
+    # 시드는 block 마다 정하고, chunk 는 연속된 block 들을 묶기만 합니다.
+    blocks = block_sizes(n_paths)
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    tasks, start = [], 0
+    for count in chunk_sizes(n_paths, horizon, values.shape[1], chunk_bytes):
+        tasks.append((blocks[start:start + count], horizon, weights, method, data, seeds[start:start + count]))
+        start += count
+
+    if workers > 1 and len(tasks) > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            chunks = list(executor.map(_simulate_chunk, *zip(*tasks)))
+    else:
+        chunks = [_simulate_chunk(*task) for task in tasks]
+    return np.concatenate(chunks)
+
+
+def var_cvar(path_returns, levels=CONFIDENCE_LEVELS):
+    """신뢰수준별 VaR(손실률 분위수)와 CVaR(VaR 를 넘는 손실의 평균). 손실은 양수로 표시합니다."""
+    losses = -np.asarray(path_returns, dtype=float)
+    rows = []
+    for level in levels:
+        var = np.quantile(losses, level)
+        rows.append({"confidence": level, "var": var, "cvar": losses[losses >= var].mean()})
+    return pd.DataFrame(rows)
+
+
+def risk_report(returns, weights, horizon=10, n_paths=50_000, method="bootstrap", seed=0, bins=100):
+    """페이지용 요약: (VaR/CVaR 표, 수익률 분포 히스토그램(구간 경계, 개수)).
+
+    경로별 수익률 전체 대신 히스토그램만 돌려주므로 작업 큐 결과 캐시에 부담이 없습니다.
+    """
+    paths = simulate(returns, weights, horizon=horizon, n_paths=n_paths, method=method, seed=seed)
+    counts, edges = np.histogram(paths, bins=bins)
+    return var_cvar(paths), (edges, counts)
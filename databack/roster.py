@@ -0,0 +1,132 @@
+"""명단(이름, 번호) 으로 아이디를 한꺼번에 찾기.
+
+선생님이 올린 반 명단(CSV/엑셀)의 모든 줄을 정보.xlsx 아이디 표와 한 번의 해시 조인(pd.merge)으로 잇습니다.
+줄마다 표 전체를 필터링하지 않으므로 명단이 수천 줄이어도 한 번에 끝납니다.
+
+양쪽 키는 같은 모양으로 맞춘 뒤 비교합니다.
+- 이름: 앞뒤/중간 공백 정리, 유니코드 NFC (맥에서 만든 파일의 풀어쓴 한글도 같은 이름으로)
+- 번호: 3, "3", "03", 3.0, "3번" 을 모두 정수 3 으로
+
+    index = datasets.load("student_id_index")
+    result = roster.resolve(roster.read_roster(uploaded_file), index)
+"""
+from pathlib import Path
+
+import pandas as pd
+
+NAME_COLUMNS = ["이름", "성명", "학생", "name"]
+NUMBER_COLUMNS = ["번호", "출석번호", "학번", "number", "no"]
+
+# 결과 컬럼의 값
+FOUND = "찾음"
+NOT_FOUND = "없음"
+AMBIGUOUS = "중복"  # 정보.xlsx 에 같은 이름/번호가 여러 줄 (아이디가 다름)
+INVALID = "입력 오류"  # 이름이 비었거나 번호가 숫자가 아님
+
+
+def normalize_names(names):
+    """이름 키: 공백 정리 + NFC. 빈 이름은 <NA>."""
+    names = pd.Series(names, dtype="string").str.normalize("NFC").str.split().str.join(" ")
+    return names.mask(names == "")
+
+
+def normalize_numbers(numbers):
+    """번호 키: 정수(Int64). 3, '03', 3.0, '3번' → 3. 숫자가 아니거나 소수면 <NA>."""
+    numbers = pd.Series(numbers)
+    numeric = pd.to_numeric(numbers, errors="coerce")
+    digits = numbers.astype("string").str.extract(r"^\s*(\d+)\s*번?\s*$", expand=False)
+    numeric = numeric.fillna(pd.to_numeric(digits, errors="coerce"))
+    return numeric.where(numeric % 1 == 0).astype("Int64")
+
+
+def id_index(df):
+    """정보.xlsx 표 → 조인용 키 표 (_이름, _번호, ID, _개수). 같은 키가 여러 줄이면 _개수 > 1."""
+    index = pd.DataFrame({
+        "_이름": normalize_names(df["이름"]).to_numpy(),
+        "_번호": normalize_numbers(df["번호"]).to_numpy(),
+        "ID": df["ID"].to_numpy(),
+    }).dropna(subset=["_이름", "_번호"])
+    counts = index.groupby(["_이름", "_번호"])["ID"].transform("nunique")
+    index = index.drop_duplicates(["_이름", "_번호"]).assign(_개수=counts)
+    return index.reset_index(drop=True)
+
+
+def _find_column(df, candidates):
+    columns = {str(column).strip().lower(): column for column in df.columns}
+    for candidate in candidates:
+        if candidate.lower() in columns:
+            return columns[candidate.lower()]
+    return None
+
+
+def read_roster(file, name=None):
+    """업로드한 CSV/엑셀 명단을 읽어 (이름, 번호) 컬럼이 있는 표로 돌려줍니다.
+
+    file: 경로 또는 파일 객체(st.file_uploader). name 이 없으면 file.name 의 확장자로 형식을 고릅니다.
+    이름/번호 컬럼이 없으면 ValueError.
+    """
+    suffix = Path(name or getattr(file, "name", str(file))).suffix.lower()
+    if suffix in (".xlsx", ".xls"):
+        df = pd.read_excel(file, dtype=str)
+    else:
+        # 엑셀에서 저장한 한글 CSV 는 cp949 인 경우가 많습니다.
+        raw = file.read() if hasattr(file, "read") else Path(file).read_bytes()
+        for encoding in ("utf-8-sig", "cp949"):
+            try:
+                text = raw.decode(encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError("CSV 파일의 글자 인코딩을 알 수 없습니다. UTF-8 이나 CP949 로 저장해 주세요.")
+        from io import StringIO
+
+        df = pd.read_csv(StringIO(text), dtype=str)
+
+    name_column = _find_column(df, NAME_COLUMNS)
+    number_column = _find_column(df, NUMBER_COLUMNS)
+    if name_column is None or number_column is None:
+        raise ValueError(
+            f"명단에 이름 컬럼({', '.join(NAME_COLUMNS)} 중 하나)과 번호 컬럼({', '.join(NUMBER_COLUMNS)} 중 하나)이 있어야 합니다. "
+            f"(지금 컬럼: {', '.join(map(str, df.columns))})"
+        )
+    return df.rename(columns={name_column: "이름", number_column: "번호"})
+
+
+def resolve(roster, index):
+    """명단의 모든 줄에 ID 와 결과(찾음/없음/중복/입력 오류) 컬럼을 붙입니다. 명단의 줄 순서는 그대로입니다."""
+    keys = pd.DataFrame({
+        "_이름": normalize_names(roster["이름"]).to_numpy(),
+        "_번호": normalize_numbers(roster["번호"]).to_numpy(),
+    })
+    joined = keys.merge(index, on=["_이름", "_번호"], how="left", validate="many_to_one")
+
+    result = roster.reset_index(drop=True).copy()
+    result["ID"] = joined["ID"].to_numpy()
+    status = pd.Series(NOT_FOUND, index=result.index)
+    status[joined["ID"].notna().to_numpy()] = FOUND
+    status[(joined["_개수"] > 1).fillna(False).to_numpy()] = AMBIGUOUS
+    status[(keys["_이름"].isna() | keys["_번호"].isna()).to_numpy()] = INVALID
+    result["결과"] = status
+    result.loc[result["결과"] == AMBIGUOUS, "ID"] = None
+    return result
+
+
+def lookup(index, name, number):
+    """한 명의 (ID, 결과). 결과가 찾음이 아니면 ID 는 None 입니다."""
+    found = resolve(pd.DataFrame({"이름": [name], "번호": [number]}), index).iloc[0]
+    return (found["ID"] if found["결과"] == FOUND else None), found["결과"]
+
+
+def to_excel_bytes(df, sheet_name="아이디"):
+    """내려받기용 엑셀 파일 내용."""
+    from io import BytesIO
+
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False, sheet_name=sheet_name)
+    return buffer.getvalue()
+
+
+def to_csv_bytes(df):
+    """내려받기용 CSV 파일 내용 (엑셀에서 한글이 깨지지 않도록 BOM 을 붙인 UTF-8)."""
+    return df.to_csv(index=False).encode("utf-8-sig")
@@ -0,0 +1,217 @@
+"""비슷한 책 추천: 희소 특징 행렬과 미리 계산한 top-k 이웃 표.
+
+책마다 저자, 출판사, KDC(대분류/강목/요목), 제목 단어를 특징으로 하는 희소 행렬(scipy.sparse)을 만들고,
+데이터셋을 읽을 때 모든 책의 코사인 유사도 상위 k 권을 한 번에 계산해 (책 수 × k) 표로 저장합니다.
+추천은 표의 한 줄을 읽는 것이라 책 수와 관계없이 바로 끝납니다. (매번 모든 책과 비교하지 않음)
+
+- 특징 값 = 종류별 가중치(FEATURE_WEIGHTS) × IDF. 드문 저자/단어를 함께 가질수록 더 비슷합니다.
+- 너무 흔한 특징(전체의 max_df 비율 또는 max_books 권보다 많은 책이 가진 것)은 뺍니다.
+  특징 하나가 d 권에 있으면 유사도 계산이 d² 만큼 늘어나므로, 계산량이 책 수의 제곱이 아니라
+  (특징 값 개수 × max_books) 를 넘지 않게 됩니다. (책이 많아지면 대분류 같은 넓은 특징은 저절로 빠짐)
+- 유사도 행렬은 결과 크기가 block_entries 를 넘지 않도록 줄 묶음(block)씩 계산하고 바로 상위 k 만 남깁니다.
+- 제목이 똑같은 책(같은 시리즈의 다른 권)은 추천에서 빼고, 추천 안에서도 같은 제목은 한 권만 보입니다.
+
+    neighbors = datasets.load("book_neighbors")
+    rows, scores = neighbors.lookup(row)          # row: book_loans 표의 줄 번호
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+FEATURE_WEIGHTS = {
+    "author": 3.0,
+    "publisher": 1.0,
+    "kdc_class": 0.5,
+    "kdc_division": 1.0,
+    "kdc_section": 1.5,
+    "title": 2.0,
+}
+
+TOP_K = 10
+MAX_DF = 0.5
+MAX_BOOKS = 300
+BLOCK_ENTRIES = 20_000_000
+
+# 저자 글자에서 이름이 아닌 부분: "글: ", "(그림)", " 지음" 등
+_ROLE_PREFIX = re.compile(r"^[^:]*:\s*")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+_ROLE_SUFFIX = re.compile(r"\s+(글|그림|지음|지은이|옮김|옮긴이|원작|감수|만화|번역|엮음|글·그림|저|역|편)$")
+_TITLE_WORD = re.compile(r"\w{2,}")
+
+
+def author_names(text):
+    """저자 글자의 이름 목록. ('원작: 흔한남매 ;그림: 유난희' → ['흔한남매', '유난희'])"""
+    names = []
+    for part in re.split(r"[;,]", str(text)):
+        part = _ROLE_PREFIX.sub("", _PARENTHESES.sub("", part)).strip()
+        part = _ROLE_SUFFIX.sub("", part).strip()
+        if part and part != "nan":
+            names.append(part)
+    return names
+
+
+def title_words(text):
+    """제목의 두 글자 이상 단어 (괄호와 부제 구분 기호는 무시)."""
+    return [word.lower() for word in _TITLE_WORD.findall(str(text))]
+
+
+def _tokens(df):
+    """(줄 번호, 특징 종류, 특징 값) 표. 같은 줄의 같은 특징은 한 번만."""
+    from databack.kdc import UNCLASSIFIED, section_codes
+
+    sections = pd.Series(section_codes(df["KDC"]).to_numpy(), index=np.arange(len(df)))
+    classified = sections[sections != UNCLASSIFIED]
+    parts = [
+        ("author", pd.Series(df["저자"].astype(str).map(author_names).to_numpy()).explode()),
+        ("publisher", pd.Series(df["출판사"].astype(str).to_numpy())),
+        ("kdc_class", classified.str[:1]),
+        ("kdc_division", classified.str[:2]),
+        ("kdc_section", classified),
+        ("title", pd.Series(df["서명"].astype(str).map(title_words).to_numpy()).explode()),
+    ]
+    frames = []
+    for kind, values in parts:
+        values = values.dropna()
+        values = values[values.astype(str).str.len() > 0]
+        values = values[values.astype(str) != "nan"]
+        frames.append(pd.DataFrame({"row": values.index.to_numpy(dtype=np.int64), "kind": kind,
+                                    "value": values.astype(str).to_numpy()}))
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+
+def feature_matrix(df, weights=FEATURE_WEIGHTS, max_df=MAX_DF, max_books=MAX_BOOKS):
+    """책 × 특징 희소 행렬 (줄마다 길이 1 로 정규화, scipy.sparse.csr_matrix)."""
+    from scipy import sparse
+
+    tokens = _tokens(df)
+    features, feature_ids = np.unique(tokens["kind"] + "\x1f" + tokens["value"], return_inverse=True)
+    n_books = len(df)
+    doc_freq = np.bincount(feature_ids, minlength=len(features))
+    keep = doc_freq <= max(1, min(max_df * n_books, max_books))
+    idf = np.log((1 + n_books) / (1 + doc_freq)) + 1
+    kind_weight = tokens["kind"].map(weights).to_numpy(dtype=float)
+
+    mask = keep[feature_ids]
+    values = (kind_weight * idf[feature_ids])[mask]
+    matrix = sparse.csr_matrix(
+        (values, (tokens["row"].to_numpy()[mask], feature_ids[mask])), shape=(n_books, len(features)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def _blocks(matrix, block_entries):
+    """유사도 결과(줄 묶음 × 전체 책)가 block_entries 를 넘지 않도록 나눈 줄 경계."""
+    binary = matrix.copy()
+    binary.data[:] = 1
+    # 줄마다 같은 특징을 가진 책 수의 합 = 그 줄의 유사도 결과 크기의 상한
+    doc_freq = np.asarray(binary.sum(axis=0)).ravel()
+    work = np.cumsum(binary @ doc_freq)
+    bounds = [0]
+    while bounds[-1] < matrix.shape[0]:
+        done = work[bounds[-1] - 1] if bounds[-1] else 0
+        stop = int(np.searchsorted(work, done + block_entries, side="right"))
+        bounds.append(min(max(stop, bounds[-1] + 1), matrix.shape[0]))
+    return bounds
+
+
+def top_k_neighbors(matrix, k=TOP_K, exclude=None, block_entries=BLOCK_ENTRIES):
+    """모든 줄의 코사인 유사도 상위 k 개 (이웃 줄 번호, 유사도). 이웃이 k 개보다 적으면 -1 / 0 으로 채웁니다.
+
+    exclude: 줄마다의 그룹 번호 배열. 같은 그룹(예: 같은 제목)끼리는 이웃에서 빼고,
+    다른 그룹의 책은 그룹마다 한 권만 남깁니다. (자기 자신은 항상 뺌)
+    """
+    n = matrix.shape[0]
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    transposed = matrix.T.tocsc()
+    bounds = _blocks(matrix, block_entries)
+    for start, stop in zip(bounds, bounds[1:]):
+        block = (matrix[start:stop] @ transposed).tocsr()
+        counts = np.diff(block.indptr)
+        rows = np.repeat(np.arange(start, stop), counts)
+        drop = block.indices == rows
+        if exclude is not None:
+            drop |= exclude[block.indices] == exclude[rows]
+        block.data[drop] = 0
+        block.eliminate_zeros()
+
+        # 줄 번호 오름차순, 같은 줄에서는 유사도 내림차순으로 정렬한 뒤 줄마다 앞에서 k 개
+        counts = np.diff(block.indptr)
+        rows = np.repeat(np.arange(stop - start), counts)
+        order = np.lexsort((-block.data, rows))
+        rows, indices, data = rows[order], block.indices[order], block.data[order]
+        if exclude is not None:
+            # 같은 그룹의 책(같은 제목의 여러 권)은 유사도가 가장 높은 한 권만 남깁니다.
+            _, first = np.unique(rows.astype(np.int64) * (exclude.max() + 1) + exclude[indices], return_index=True)
+            first.sort()
+            rows, indices, data = rows[first], indices[first], data[first]
+        starts = np.searchsorted(rows, rows, side="left")
+        rank = np.arange(len(rows)) - starts
+        keep = rank < k
+        neighbors[start + rows[keep], rank[keep]] = indices[keep]
+        scores[start + rows[keep], rank[keep]] = data[keep]
+    return neighbors, scores
+
+
+class SimilarBooks:
+    """책마다 미리 계산한 비슷한 책 상위 k 권 (줄 번호와 유사도)."""
+
+    def __init__(self, neighbors, scores):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @classmethod
+    def build(cls, df, k=TOP_K, weights=FEATURE_WEIGHTS, max_df=MAX_DF, max_books=MAX_BOOKS,
+              block_entries=BLOCK_ENTRIES):
+        """대출 목록 표(서명, 저자, 출판사, KDC 컬럼)로 이웃 표를 만듭니다."""
+        matrix = feature_matrix(df, weights=weights, max_df=max_df, max_books=max_books)
+        titles = pd.factorize(df["서명"].astype(str).str.strip())[0]
+        return cls(*top_k_neighbors(matrix, k=k, exclude=titles, block_entries=block_entries))
+
+    def __len__(self):
+        return len(self.neighbors)
+
+    def memory_usage(self, deep=True):
+        # databack.cache.estimate_size 가 캐시 용량을 계산할 때 씁니다.
+        return self.neighbors.nbytes + self.scores.nbytes
+
+    def lookup(self, row, n=None):
+        """row 번째 책과 비슷한 책의 (줄 번호 배열, 유사도 배열). 유사도 내림차순, 최대 n 권."""
+        found = self.neighbors[row] >= 0
+        rows, scores = self.neighbors[row][found], self.scores[row][found]
+        return rows[:n], scores[:n]
+
+
+def shared_features(df, row, others):
+    """row 번째 책과 others 의 책마다 같은 점 설명 (예: '저자 설민석, 분류 911')."""
+    from databack.kdc import section_codes
+
+    def describe(i):
+        return {
+            "author": set(author_names(df["저자"].iloc[i])),
+            "publisher": {str(df["출판사"].iloc[i])},
+            "kdc": set(section_codes([df["KDC"].iloc[i]])) - {"미분류"},
+            "title": set(title_words(df["서명"].iloc[i])),
+        }
+
+    base = describe(row)
+    reasons = []
+    for other in others:
+        target = describe(other)
+        parts = []
+        if base["author"] & target["author"]:
+            parts.append("저자 " + ", ".join(sorted(base["author"] & target["author"])))
+        if base["publisher"] & target["publisher"]:
+            parts.append("출판사")
+        for kdc in base["kdc"]:
+            for other_kdc in target["kdc"]:
+                common = kdc if kdc == other_kdc else (kdc[:2] + "0" if kdc[:2] == other_kdc[:2] else None)
+                if common:
+                    parts.append(f"분류 {common}")
+        if base["title"] & target["title"]:
+            parts.append("제목 " + ", ".join(sorted(base["title"] & target["title"])[:3]))
+        reasons.append(" · ".join(parts))
+    return reasons
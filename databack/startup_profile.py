@@ -0,0 +1,117 @@
+"""페이지별 시작(import) 시간 프로파일러.
+
+각 페이지를 새 파이썬 프로세스에서 `-X importtime` 으로 한 번 실행하고,
+Streamlit 자체를 불러온 뒤에 그 페이지 때문에 추가로 import 된 모듈의 시간을 집계합니다.
+
+    python -m databack.startup_profile               # main.py + pages/*.py 전체
+    python -m databack.startup_profile pages/piramid.py --top 15
+    python -m databack.startup_profile --json startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+_MARKER = "__databack_page_start__"
+
+# 하위 프로세스에서 실행할 코드: Streamlit 을 먼저 불러온 뒤(기준선) 표시를 남기고 페이지를 실행합니다.
+_RUNNER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout=300)
+print({marker!r}, file=sys.stderr, flush=True)
+started = time.perf_counter()
+at.run()
+print("__databack_run_seconds__", time.perf_counter() - started, file=sys.stderr, flush=True)
+"""
+
+
+def parse_importtime(lines):
+    """`-X importtime` 출력 줄을 (모듈, 자체 us, 누적 us, 깊이) 목록으로 바꿉니다."""
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # 모듈 이름 앞 공백 1칸 뒤로, 중첩 깊이마다 2칸씩 들여쓰기 됩니다.
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def profile_page(page, timeout=600):
+    """페이지 하나를 새 프로세스에서 실행해 import 시간 정보를 dict 로 반환합니다."""
+    code = _RUNNER.format(root=str(ROOT), page=str(Path(page).resolve()), marker=_MARKER)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=timeout,
+    )
+    wall = time.perf_counter() - started
+
+    lines = proc.stderr.splitlines()
+    try:
+        start = lines.index(_MARKER)
+    except ValueError:
+        start = len(lines)
+    run_seconds = None
+    for line in lines[start:]:
+        if line.startswith("__databack_run_seconds__"):
+            run_seconds = float(line.split()[1])
+
+    baseline = parse_importtime(lines[:start])
+    page_rows = parse_importtime(lines[start:])
+    # 최상위(깊이 0) import 의 누적 시간을 더하면 페이지가 추가로 쓴 import 시간이 됩니다.
+    top_level = sorted(
+        ((name, cumulative) for name, _, cumulative, depth in page_rows if depth == 0),
+        key=lambda row: row[1], reverse=True,
+    )
+    return {
+        "page": str(Path(page).resolve().relative_to(ROOT)),
+        "returncode": proc.returncode,
+        "baseline_import_ms": sum(c for _, _, c, d in baseline if d == 0) / 1000,
+        "page_import_ms": sum(c for _, c in top_level) / 1000,
+        "first_run_ms": run_seconds * 1000 if run_seconds is not None else None,
+        "process_wall_ms": wall * 1000,
+        "modules": [{"module": name, "cumulative_ms": c / 1000} for name, c in top_level],
+    }
+
+
+def default_pages():
+    return [ROOT / "main.py", *sorted((ROOT / "pages").glob("*.py"))]
+
+
+def format_report(results, top=10):
+    lines = []
+    for result in results:
+        first_run = result["first_run_ms"]
+        run_text = f"첫 실행 {first_run:.0f} ms" if first_run is not None else "실행 실패"
+        lines.append(f"{result['page']}: 페이지 import {result['page_import_ms']:.0f} ms, {run_text}")
+        for module in result["modules"][:top]:
+            lines.append(f"    {module['cumulative_ms']:9.1f} ms  {module['module']}")
+    if results:
+        lines.append(f"(Streamlit/AppTest 기준선 import: {results[0]['baseline_import_ms']:.0f} ms, 각 페이지 시간에서 제외)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 import 시간 프로파일러")
+    parser.add_argument("pages", nargs="*", help="프로파일할 페이지 (기본: main.py + pages/*.py)")
+    parser.add_argument("--top", type=int, default=10, help="페이지별로 보여줄 모듈 수")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    pages = [Path(p) for p in args.pages] or default_pages()
+    results = [profile_page(page) for page in pages]
+    print(format_report(results, top=args.top))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""'다했어요' 현황판의 친구별 통계: 연속 달성, 최장 연속, 주간 완료 수, 순위표.
+
+완료 기록이 하나 들어올 때마다 그 친구의 통계만 O(1) 로 고치고(record),
+시트에서 기록 전체를 다시 읽었을 때만 pandas 로 한 번에 다시 계산합니다(from_records).
+그래서 몇 년 치 기록이 쌓여도 화면을 다시 그릴 때 전체 목록을 훑지 않습니다.
+
+    stats = CompletionStats.from_records(st.session_state.completed_tasks)
+    stats.record("김철수", datetime.now())
+    stats.leaderboard()
+
+연속 달성은 학교 가는 날(월~금, WEEKMASK) 기준입니다. 금요일에 하고 월요일에 하면 이어진 것으로 보고,
+주말에 한 기록은 연속 달성과 주간 완료 수에서 다음 월요일(다음 주)로 셉니다.
+한 번만 완료할 수 있는 '하루'와 날짜별 완료자 목록은 달력 날짜 기준입니다. (토요일에 했어도 월요일에 또 할 수 있음)
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+WEEKMASK = "1111100"  # 월 화 수 목 금 토 일
+EPOCH = np.datetime64("2000-01-03")  # 월요일 (학교 날 번호 0)
+
+
+def school_days(dates):
+    """날짜 배열의 학교 날 번호 (EPOCH 부터 센 월~금 날 수). 연속된 학교 날은 번호가 1 차이 납니다."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    days = np.busday_offset(days, 0, roll="forward", weekmask=WEEKMASK)
+    return np.busday_count(EPOCH, days, weekmask=WEEKMASK)
+
+
+def school_day(day):
+    return int(school_days([day])[0])
+
+
+def week_start(day):
+    """그 주 월요일."""
+    return day - timedelta(days=day.weekday())
+
+
+def school_week(day):
+    """기록이 들어가는 주의 월요일. 주말 기록은 연속 달성처럼 다음 주로 셉니다."""
+    return week_start(day + timedelta(days=2) if day.weekday() >= 5 else day)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+class ChildStats:
+    """친구 한 명의 통계. days 는 완료한 학교 날 번호, dates 는 완료한 달력 날짜 집합입니다."""
+
+    __slots__ = ("total", "days", "dates", "last_day", "current", "longest", "weeks")
+
+    def __init__(self):
+        self.total = 0          # 완료 기록 수
+        self.days = set()
+        self.dates = set()      # 하루 한 번 확인용 (달력 날짜)
+        self.last_day = None    # 가장 최근 완료한 학교 날 번호
+        self.current = 0        # last_day 에서 끝나는 연속 일수
+        self.longest = 0
+        self.weeks = defaultdict(int)  # 주 월요일 → 완료 수
+
+    def add_day(self, day):
+        """학교 날 하나를 추가하고 연속 일수를 고칩니다. 이미 있던 날이면 False."""
+        if day in self.days:
+            return False
+        self.days.add(day)
+        if self.last_day is None or day > self.last_day:
+            self.current = self.current + 1 if self.last_day == day - 1 else 1
+            self.last_day = day
+            self.longest = max(self.longest, self.current)
+        else:
+            # 지난 날짜의 기록이 나중에 들어온 경우(드묾): 이 친구만 처음부터 다시 셉니다.
+            self._recount()
+        return True
+
+    def _recount(self):
+        days = np.sort(np.fromiter(self.days, dtype=np.int64))
+        runs = np.split(days, np.flatnonzero(np.diff(days) != 1) + 1)
+        self.current = len(runs[-1])
+        self.longest = max(len(run) for run in runs)
+        self.last_day = int(days[-1])
+
+
+class CompletionStats:
+    """모든 친구의 통계와 날짜별 완료자 목록."""
+
+    def __init__(self):
+        self.children = {}
+        self.by_date = defaultdict(list)  # 날짜 → 그날 완료한 이름 (기록 순서)
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    @classmethod
+    def from_records(cls, records):
+        """[{"name", "timestamp"}, ...] 전체로 통계를 한 번에 계산합니다. (시트를 다시 읽었을 때)"""
+        stats = cls()
+        if not records:
+            return stats
+        frame = pd.DataFrame(records, columns=["name", "timestamp"])
+        frame["date"] = pd.to_datetime(frame["timestamp"]).dt.normalize()
+        frame["day"] = school_days(frame["date"].to_numpy())
+        # 주말 기록은 다음 주로 (school_week 와 같음)
+        rolled = frame["date"] + pd.to_timedelta((frame["date"].dt.weekday >= 5) * 2, unit="D")
+        frame["week"] = rolled - pd.to_timedelta(rolled.dt.weekday, unit="D")
+
+        stats.total = len(frame)
+        for day, names in frame.groupby(frame["date"].dt.date, sort=False)["name"]:
+            stats.by_date[day] = names.tolist()
+
+        # 친구별 학교 날을 정렬해 1 씩 이어지는 구간(run)으로 나눕니다.
+        days = frame[["name", "day"]].drop_duplicates().sort_values(["name", "day"])
+        new_run = (days["day"].diff() != 1) | (days["name"] != days["name"].shift())
+        runs = days.assign(run=new_run.cumsum()).groupby(["name", "run"], sort=False).size()
+        run_lengths = runs.groupby(level="name")
+        longest = run_lengths.max()
+        current = run_lengths.last()
+        last_day = days.groupby("name")["day"].last()
+        day_sets = days.groupby("name")["day"].agg(set)
+        date_sets = frame.groupby("name")["date"].agg(lambda dates: set(dates.dt.date))
+        totals = frame.groupby("name").size()
+        weeks = frame.groupby(["name", frame["week"].dt.date]).size()
+
+        for name in totals.index:
+            child = stats.children[name] = ChildStats()
+            child.total = int(totals[name])
+            child.days = {int(day) for day in day_sets[name]}
+            child.dates = date_sets[name]
+            child.last_day = int(last_day[name])
+            child.current = int(current[name])
+            child.longest = int(longest[name])
+            child.weeks.update({week: int(count) for week, count in weeks[name].items()})
+        return stats
+
+    def record(self, name, timestamp):
+        """완료 기록 하나를 반영합니다. (그 친구의 통계만 고침)"""
+        day = _as_date(timestamp)
+        child = self.children.get(name)
+        if child is None:
+            child = self.children[name] = ChildStats()
+        child.total += 1
+        child.weeks[school_week(day)] += 1
+        child.dates.add(day)
+        child.add_day(school_day(day))
+        self.by_date[day].append(name)
+        self.total += 1
+
+    def names_on(self, day):
+        """그날 완료한 친구 이름 (기록 순서)."""
+        return self.by_date.get(_as_date(day), [])
+
+    def completed_on(self, name, day):
+        """name 이 그 날짜(달력 날짜)에 이미 완료했는지."""
+        child = self.children.get(name)
+        return child is not None and _as_date(day) in child.dates
+
+    def current_streak(self, name, today=None):
+        """오늘 기준 연속 달성 일수. 어제(지난 학교 날)까지 이어지지 않았으면 0."""
+        child = self.children.get(name)
+        if child is None:
+            return 0
+        today = school_day(_as_date(today or datetime.now()))
+        return child.current if child.last_day >= today - 1 else 0
+
+    def leaderboard(self, today=None):
+        """친구별 (연속, 최장 연속, 이번 주, 총 완료) 순위표. 연속 → 이번 주 → 총 완료 순."""
+        today = _as_date(today or datetime.now())
+        this_week = school_week(today)
+        board = pd.DataFrame(
+            [
+                (name, self.current_streak(name, today), child.longest, child.weeks.get(this_week, 0), child.total)
+                for name, child in self.children.items()
+            ],
+            columns=["이름", "연속", "최장 연속", "이번 주", "총 완료"],
+        )
+        board = board.sort_values(["연속", "이번 주", "총 완료", "이름"], ascending=[False, False, False, True])
+        board.insert(0, "순위", range(1, len(board) + 1))
+        return board.reset_index(drop=True)
+
+    def weekly_counts(self, weeks=8, today=None):
+        """최근 weeks 주의 친구별 주간 완료 수 표 (행: 이름, 열: 주 월요일)."""
+        last = school_week(_as_date(today or datetime.now()))
+        columns = [last - timedelta(weeks=i) for i in range(weeks - 1, -1, -1)]
+        return pd.DataFrame(
+            [[child.weeks.get(week, 0) for week in columns] for child in self.children.values()],
+            index=pd.Index(list(self.children), name="이름"),
+            columns=[week.strftime("%m/%d") for week in columns],
+        )
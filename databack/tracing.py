@@ -0,0 +1,122 @@
+"""가벼운 구간(span) 타이머.
+
+각 페이지의 데이터 로딩, 그룹 연산, 차트 생성 구간을 감싸서 걸린 시간을 기록합니다.
+기록은 프로세스 안의 크기 제한 링 버퍼(deque)에 쌓이므로 메모리가 늘지 않고,
+관리자 페이지(pages/99_성능_모니터.py)에서 구간별 p50/p95 를 볼 수 있습니다.
+
+    from databack import tracing
+
+    tracing.page("도서대출현황")          # 페이지 맨 위에서 한 번 (rerun 마다 새 실행 ID)
+
+    @tracing.traced("load_data")
+    def load_data(): ...
+
+    with tracing.span("fig:top_books"):
+        fig = px.bar(...)
+"""
+import functools
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_RECORDS = 5000
+
+_records = deque(maxlen=MAX_RECORDS)
+_lock = threading.Lock()
+_run_ids = itertools.count(1)
+# Streamlit 은 스크립트 실행마다 별도 스레드를 쓰므로, 현재 실행 정보는 스레드별로 둡니다.
+_local = threading.local()
+
+
+def page(name):
+    """페이지 스크립트 시작 시 호출합니다. 이후 구간 기록에 페이지 이름과 실행 ID 가 붙습니다."""
+    _local.page = name
+    _local.run_id = next(_run_ids)
+
+
+def record(stage, seconds, **attrs):
+    """구간 하나의 소요 시간을 링 버퍼에 기록합니다."""
+    entry = {
+        "time": time.time(),
+        "page": getattr(_local, "page", None),
+        "run_id": getattr(_local, "run_id", None),
+        "stage": stage,
+        "ms": seconds * 1000,
+    }
+    entry.update(attrs)
+    with _lock:
+        _records.append(entry)
+
+
+@contextmanager
+def span(stage, **attrs):
+    """with 블록이 실행되는 데 걸린 시간을 기록합니다.
+
+    블록 안에서 값을 추가로 남기려면 yield 된 dict 에 넣으면 됩니다. (예: info["cache"] = "hit")
+    """
+    info = dict(attrs)
+    started = time.perf_counter()
+    try:
+        yield info
+    finally:
+        record(stage, time.perf_counter() - started, **info)
+
+
+def traced(stage=None):
+    """함수 실행 시간을 기록하는 데코레이터. stage 를 생략하면 함수 이름을 씁니다."""
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def records():
+    """지금까지 기록된 구간 목록(오래된 순)의 복사본."""
+    with _lock:
+        return list(_records)
+
+
+def clear():
+    with _lock:
+        _records.clear()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summary():
+    """(페이지, 구간)별 횟수, p50/p95/최대 시간(ms), 캐시 적중률과 적중했을 때의 p50 시간(ms)."""
+    groups = {}
+    for entry in records():
+        groups.setdefault((entry["page"], entry["stage"]), []).append(entry)
+
+    rows = []
+    for (page_name, stage), entries in groups.items():
+        values = sorted(e["ms"] for e in entries)
+        cached = [e["cache"] for e in entries if "cache" in e]
+        hits = sorted(e["ms"] for e in entries if e.get("cache") == "hit")
+        rows.append({
+            "page": page_name,
+            "stage": stage,
+            "count": len(values),
+            "p50_ms": _percentile(values, 0.50),
+            "p95_ms": _percentile(values, 0.95),
+            "max_ms": values[-1],
+            "cache_hit_rate": cached.count("hit") / len(cached) if cached else None,
+            "hit_p50_ms": _percentile(hits, 0.50),
+        })
+    rows.sort(key=lambda row: (row["page"] or "", -row["p95_ms"]))
+    return rows
@@ -1,6 +1,42 @@
 import streamlit as st
-import folium
+import folium # st_folium 이 어차피 folium 을 import 하므로 여기서 미뤄도 이득이 없음
 from streamlit_folium import st_folium
+from databack import tracing
+from databack.bookmark_store import BookmarkStore
+from databack.bookmarks import BookmarkLayer, bounds_from_st_folium
+
+# geopy, 지명 사전 등 CSV 가져오기에만 필요한 모듈은 해당 기능을 쓸 때 import 합니다.
+
+# 북마크 저장소 / 지명 사전은 서버 전체에서 하나씩만 만들어 공유
+@st.cache_resource
+def get_store():
+    return BookmarkStore()
+
+@st.cache_resource
+def load_gazetteer():
+    from databack.gazetteer import Gazetteer
+    return Gazetteer.load()
+
+def geocode_names(names):
+    """이름 목록을 한 번에 지오코딩합니다. 로컬 사전에 없는 이름만 Nominatim 에 (중복 없이) 묻습니다."""
+    gazetteer = load_gazetteer()
+    found = {name: gazetteer.lookup(name) for name in set(names)}
+    remote = [name for name, coords in found.items() if coords is None]
+    if remote:
+        from geopy.extra.rate_limiter import RateLimiter
+        from geopy.geocoders import Nominatim
+
+        # Nominatim 이용 정책(초당 1회)에 맞춰 호출 간격을 둡니다.
+        geocode = RateLimiter(Nominatim(user_agent="my-map-app").geocode, min_delay_seconds=1, swallow_exceptions=True)
+        for name in remote:
+            location = geocode(name)
+            if location:
+                found[name] = (location.latitude, location.longitude)
+    return [found[name] for name in names]
+
+tracing.page("main")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
+store = get_store()
 
 st.title("🗺️ 나만의 위치 북마크 지도")
 
@@ -11,16 +47,63 @@ place = st.text_input("장소 이름", value="서울 시청")
 lat = st.number_input("위도 (Latitude)", value=37.5665, format="%.6f")
 lon = st.number_input("경도 (Longitude)", value=126.9780, format="%.6f")
 
-# 세션 상태 저장
-if "places" not in st.session_state:
-    st.session_state.places = []
-
 if st.button("지도에 추가하기"):
-    st.session_state.places.append((place, lat, lon))
+    store.add(place, lat, lon)
+
+# CSV 로 여러 장소를 한꺼번에 추가
+with st.expander("📂 CSV 파일로 한꺼번에 추가하기"):
+    st.caption("'장소'(또는 '이름'), '위도', '경도' 컬럼이 있는 CSV 파일. 위도/경도가 비어 있으면 장소 이름으로 좌표를 찾습니다.")
+    uploaded = st.file_uploader("CSV 파일 선택", type="csv")
+    encoding = st.selectbox("파일 인코딩", ["utf-8-sig", "cp949"])
+    if uploaded is not None and st.button("CSV 가져오기"):
+        with st.spinner("장소를 저장하는 중입니다..."):
+            try:
+                summary = store.import_csv(uploaded, geocode=geocode_names, encoding=encoding)
+                st.success(f"{summary['inserted']}개 저장 (좌표 검색 {summary['geocoded']}개), {summary['skipped']}개 건너뜀")
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"CSV 파일을 읽는 중 오류가 발생했습니다: {e}")
+
+# 세션 상태 저장 (저장소 내용이 바뀌었을 때만 다시 읽음)
+revision = store.revision()
+if st.session_state.get("places_revision") != revision:
+    with tracing.span("load_places"):
+        st.session_state.places = store.all()
+    st.session_state.places_revision = revision
 
 # 지도 그리기
-m = folium.Map(location=[37.5665, 126.9780], zoom_start=6)
-for name, lat, lon in st.session_state.places:
-    folium.Marker([lat, lon], tooltip=name).add_to(m)
+# 기본 지도는 세션당 한 번만 만들고, 북마크는 화면 안에 있는 것만 클러스터 레이어로 올립니다.
+if "base_map" not in st.session_state:
+    st.session_state.base_map = folium.Map(location=[37.5665, 126.9780], zoom_start=6)
+if "bookmark_layer" not in st.session_state:
+    st.session_state.bookmark_layer = BookmarkLayer()
+
+layer = st.session_state.bookmark_layer
+with tracing.span("bookmarks:index"):
+    layer.update(st.session_state.places)  # 장소 목록이 바뀌었을 때만 공간 색인을 다시 만듦
+
+# 직전 렌더링에서 받은 화면 범위 (첫 실행에서는 None -> 전체 표시)
+viewport = bounds_from_st_folium((st.session_state.get("bookmark_map") or {}).get("bounds"))
+
+with tracing.span("bookmarks:layer"):
+    markers = layer.feature_group(viewport)
+with tracing.span("render:map"):
+    st_folium(
+        st.session_state.base_map,
+        key="bookmark_map",
+        width=700,
+        height=500,
+        feature_group_to_add=markers,
+        returned_objects=["bounds"],
+    )
+
+st.caption(f"저장된 북마크: {len(st.session_state.places):,}개")
 
-st_folium(m, width=700, height=500)
+# 입력한 위도/경도에서 가까운 북마크
+if st.session_state.places:
+    st.subheader("📍 입력한 위치에서 가까운 북마크")
+    nearest = store.nearest(lat, lon, k=5)
+    st.dataframe(
+        [{"장소": name, "위도": p_lat, "경도": p_lon, "거리 (km)": round(dist, 2)}
+         for name, p_lat, p_lon, dist in nearest],
+        hide_index=True,
+    )
@@ -1,27 +1,20 @@
 import streamlit as st
-import yfinance as yf
 import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
+from databack import datasets, fx, ranking, tracing
+
+tracing.page("01_yahoostock")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
 
 def get_top_global_stocks():
     """
-    일반적으로 글로벌 시가총액 상위에 있는 기업들의 티커를 반환합니다.
-    (수동으로 선정되었으며, 실시간 시가총액 순위가 아님)
+    글로벌 시가총액 상위 기업들의 이름과 티커를 시가총액 순으로 반환합니다.
+    (후보 종목의 발행주식수 × 최근 종가로 계산한 순위, databack.ranking)
     """
-    return {
-        "Apple": "AAPL",
-        "Microsoft": "MSFT",
-        "NVIDIA": "NVDA",
-        "Amazon": "AMZN",
-        "Alphabet (Google) A": "GOOGL",
-        "Alphabet (Google) C": "GOOG",
-        "Meta Platforms": "META",
-        "Tesla": "TSLA",
-        "Berkshire Hathaway B": "BRK-B",
-        "Eli Lilly and Company": "LLY",
-    }
+    # 이 페이지는 Alphabet 의 A/C 주식을 따로 보여 주므로 회사별로 합치지 않습니다.
+    return ranking.top_companies(10, per_issuer=False)
 
+@tracing.traced()
 def fetch_stock_data(tickers, period="1y"):
     """
     야후 파이낸스에서 주식 데이터를 가져옵니다.
@@ -31,9 +24,9 @@ def fetch_stock_data(tickers, period="1y"):
 
     for company_name, ticker in tickers.items():
         try:
-            # 개별 티커 데이터 다운로드 시 auto_adjust=False 설정
+            # 개별 티커 데이터 다운로드 시 auto_adjust=False 설정 (공용 데이터 캐시, 1시간마다 갱신)
             # 이렇게 하면 'Adj Close' 컬럼이 명시적으로 존재합니다.
-            data = yf.download(ticker, period=period, progress=False, auto_adjust=False)
+            data = datasets.load("stock_download", ticker=ticker, period=period)
 
             if not data.empty and 'Adj Close' in data.columns:
                 adj_close_series = data['Adj Close'].rename(company_name)
@@ -55,14 +48,16 @@ def fetch_stock_data(tickers, period="1y"):
         except Exception as e:
             st.warning(f"'{company_name}' ({ticker}) 데이터를 불러오는 중 오류 발생: {e}")
 
-    return all_adj_close_data.sort_index()
+    all_adj_close_data = all_adj_close_data.sort_index()
+    # 통화가 다른 종목(예: 2222.SR 은 사우디 리얄)은 환율 행렬을 한 번 곱해 USD 로 맞춥니다. (databack.fx)
+    return fx.matrix_to_usd(all_adj_close_data, [tickers[company] for company in all_adj_close_data.columns], period)
 
 st.set_page_config(layout="wide")
 st.title("글로벌 시가총액 Top 기업 주식 변화 (지난 1년)")
 
 st.write(
     """
-    이 앱은 Streamlit, Yahoo Finance, Plotly를 사용하여 일반적으로 글로벌 시가총액 상위에 랭크되는 기업들의
+    이 앱은 Streamlit, Yahoo Finance, Plotly를 사용하여 글로벌 시가총액 상위 기업들의
     지난 1년간 주식 가격 변화를 시각화합니다.
     """
 )
@@ -78,20 +73,36 @@ with st.spinner('데이터를 불러오고 시각화하는 중입니다. 잠시
 
         if not stock_data.empty:
             # Plotly를 사용하여 라인 차트 생성
-            df_melted = stock_data.reset_index().melt(id_vars=['Date'], var_name='Company', value_name='Price')
-
-            fig = px.line(df_melted, x="Date", y="Price", color="Company",
-                          title="글로벌 시가총액 상위 기업 주식 변화 (지난 1년)",
-                          labels={"Price": "종가 (USD)"},
-                          hover_data={"Price": ":.2f"})
-
-            fig.update_layout(
-                hovermode="x unified",
-                xaxis_title="날짜",
-                yaxis_title="주가 (USD)",
-                legend_title="기업"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with tracing.span("fig:price_line"):
+                df_melted = stock_data.reset_index().melt(id_vars=['Date'], var_name='Company', value_name='Price')
+
+                fig = px.line(df_melted, x="Date", y="Price", color="Company",
+                              title="글로벌 시가총액 상위 기업 주식 변화 (지난 1년)",
+                              labels={"Price": "종가 (USD)"},
+                              hover_data={"Price": ":.2f"})
+
+                fig.update_layout(
+                    hovermode="x unified",
+                    xaxis_title="날짜",
+                    yaxis_title="주가 (USD)",
+                    legend_title="기업"
+                )
+            with tracing.span("render:price_line"):
+                st.plotly_chart(fig, use_container_width=True)
+            with st.expander("시가총액 순위 보기"):
+                st.dataframe(
+                    ranking.rank(10, per_issuer=False),
+                    hide_index=True,
+                    column_config={
+                        "name": "기업",
+                        "ticker": "티커",
+                        "market": "시장",
+                        "currency": "통화",
+                        "price": st.column_config.NumberColumn("종가", format="%.2f"),
+                        "market_cap_usd": st.column_config.NumberColumn("시가총액 (USD)", format="%.3e"),
+                        "price_source": "가격 기준 (latest=최근 종가, ref=기준가)",
+                    },
+                )
             st.subheader("원시 데이터")
             st.dataframe(stock_data)
 
@@ -106,7 +117,8 @@ st.markdown(
     """
     ---
     **참고:**
-    * 이 시가총액 Top 기업 리스트는 고정되어 있으며, 실시간 시가총액 순위를 반영하지 않습니다.
+    * 시가총액 Top 기업 리스트는 후보 종목의 발행주식수 × 최근 종가로 계산합니다 (1시간마다 갱신).
+      종가를 받지 못한 종목은 저장해 둔 기준가로 계산합니다.
     * 데이터는 야후 파이낸스에서 제공됩니다.
     """
 )
@@ -1,9 +1,9 @@
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime, timedelta
+from plotly.subplots import make_subplots
+from databack import analytics, datasets, figures, fx, intraday, jobs, ohlc, portfolio, ranking, risk, tracing
 
 # 페이지 설정
 st.set_page_config(
@@ -12,23 +12,14 @@ st.set_page_config(
     layout="wide"
 )
 
+tracing.page("02_퍼플렉시티로")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
 # 제목
 st.title("📈 글로벌 시가총액 Top 10 기업 주식 변화 (최근 1년)")
 st.markdown("---")
 
-# 글로벌 시가총액 Top 10 기업 (2025년 5월 기준)
-top_10_companies = {
-    'Microsoft': 'MSFT',
-    'Apple': 'AAPL', 
-    'NVIDIA': 'NVDA',
-    'Alphabet': 'GOOGL',
-    'Amazon': 'AMZN',
-    'Saudi Aramco': '2222.SR',
-    'Meta': 'META',
-    'Berkshire Hathaway': 'BRK-B',
-    'Broadcom': 'AVGO',
-    'TSMC': 'TSM'
-}
+# 글로벌 시가총액 Top 10 기업 (발행주식수 × 최근 종가로 계산, 1시간마다 갱신)
+top_10_companies = ranking.top_companies(10)
 
 # 사이드바 설정
 st.sidebar.header("📊 설정 옵션")
@@ -43,19 +34,400 @@ chart_type = st.sidebar.selectbox(
     ["라인 차트", "캔들스틱 차트"]
 )
 
-show_volume = st.sidebar.checkbox("거래량 표시", value=True)
-
-# 데이터 로딩 함수
-@st.cache_data
+# 데이터 로딩 함수 (공용 데이터 캐시, 1시간마다 갱신)
+@tracing.traced()
 def load_stock_data(ticker, period="1y"):
     """주식 데이터를 로드하는 함수"""
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period)
-        return data
+        return datasets.load("stock_history", ticker=ticker, period=period)
     except:
         return None
 
+# 차트 생성 함수 (databack.figures 가 입력 데이터별로 결과를 캐시)
+def build_line_chart(stock_data):
+    fig = go.Figure()
+    
+    for company, data in stock_data.items():
+        fig.add_trace(go.Scatter(
+            x=data.index,
+            y=data['Close'],
+            mode='lines',
+            name=company,
+            line=dict(width=2)
+        ))
+    
+    fig.update_layout(
+        title="주가 변화 (라인 차트)",
+        xaxis_title="날짜",
+        yaxis_title="주가 (USD)",
+        height=600,
+        hovermode='x unified'
+    )
+    return fig
+
+def build_candlestick_chart(company, data, resolution="일봉", currency="USD"):
+    fig = go.Figure(data=go.Candlestick(
+        x=data.index,
+        open=data['Open'],
+        high=data['High'],
+        low=data['Low'],
+        close=data['Close'],
+        name=company
+    ))
+    
+    fig.update_layout(
+        title=f"{company} 캔들스틱 차트 ({resolution})",
+        xaxis_title="날짜",
+        yaxis_title=f"주가 ({currency})",
+        height=600
+    )
+    return fig
+
+def build_volume_chart(stock_data):
+    fig_volume = go.Figure()
+    
+    for company, data in stock_data.items():
+        fig_volume.add_trace(go.Scatter(
+            x=data.index,
+            y=data['Volume'],
+            mode='lines',
+            name=f"{company} 거래량",
+            fill='tonexty' if company != list(stock_data.keys())[0] else 'tozeroy'
+        ))
+    
+    fig_volume.update_layout(
+        title="거래량 변화",
+        xaxis_title="날짜",
+        yaxis_title="거래량",
+        height=400
+    )
+    return fig_volume
+
+def build_corr_chart(correlation_matrix):
+    # 히트맵 생성
+    fig_corr = go.Figure(data=go.Heatmap(
+        z=correlation_matrix.values,
+        x=correlation_matrix.columns,
+        y=correlation_matrix.index,
+        colorscale='RdBu',
+        zmid=0,
+        text=correlation_matrix.round(3).values,
+        texttemplate="%{text}",
+        textfont={"size": 10}
+    ))
+    
+    fig_corr.update_layout(
+        title="주가 상관관계 매트릭스",
+        height=500
+    )
+    return fig_corr
+
+def build_detail_chart(company, data):
+    detail_data = data.copy() # 캐시된 원본에 이동평균 컬럼이 추가되지 않도록 복사
+    
+    # 이동평균선 추가
+    detail_data['MA20'] = detail_data['Close'].rolling(window=20).mean()
+    detail_data['MA50'] = detail_data['Close'].rolling(window=50).mean()
+    
+    fig_detail = go.Figure()
+    
+    fig_detail.add_trace(go.Scatter(
+        x=detail_data.index,
+        y=detail_data['Close'],
+        mode='lines',
+        name='종가',
+        line=dict(color='blue', width=2)
+    ))
+    
+    fig_detail.add_trace(go.Scatter(
+        x=detail_data.index,
+        y=detail_data['MA20'],
+        mode='lines',
+        name='20일 이동평균',
+        line=dict(color='orange', width=1)
+    ))
+    
+    fig_detail.add_trace(go.Scatter(
+        x=detail_data.index,
+        y=detail_data['MA50'],
+        mode='lines',
+        name='50일 이동평균',
+        line=dict(color='red', width=1)
+    ))
+    
+    fig_detail.update_layout(
+        title=f"{company} 상세 차트 (이동평균선 포함)",
+        xaxis_title="날짜",
+        yaxis_title="주가 (USD)",
+        height=500
+    )
+    return fig_detail
+
+def build_portfolio_chart(equity, drawdown, title):
+    fig_portfolio = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05)
+    fig_portfolio.add_trace(go.Scatter(x=equity.index, y=equity * 100, mode='lines', name='포트폴리오 가치'), row=1, col=1)
+    fig_portfolio.add_trace(go.Scatter(x=drawdown.index, y=drawdown * 100, mode='lines', name='낙폭', fill='tozeroy', line=dict(color='red')), row=2, col=1)
+    fig_portfolio.update_yaxes(title_text="가치 (시작 100)", row=1, col=1)
+    fig_portfolio.update_yaxes(title_text="낙폭 (%)", row=2, col=1)
+    fig_portfolio.update_layout(
+        title=title,
+        hovermode='x unified',
+        height=550,
+        showlegend=False
+    )
+    return fig_portfolio
+
+def build_sweep_chart(swept, companies):
+    fig_sweep = go.Figure(data=go.Scatter(
+        x=swept['volatility'] * 100,
+        y=swept['cagr'] * 100,
+        mode='markers',
+        marker=dict(color=swept['sharpe'], colorscale='Viridis', showscale=True, colorbar=dict(title="샤프 지수"), size=5),
+        text=[", ".join(f"{name} {weight:.0%}" for name, weight in zip(companies, row)) for row in swept[companies].to_numpy()],
+        hovertemplate="변동성 %{x:.1f}%<br>연 수익률 %{y:.1f}%<br>%{text}<extra></extra>"
+    ))
+    fig_sweep.update_layout(
+        title=f"무작위 비중 {len(swept)}개 조합의 위험 대비 수익",
+        xaxis_title="연 변동성 (%)",
+        yaxis_title="연 수익률 (%)",
+        height=500
+    )
+    return fig_sweep
+
+def build_risk_chart(edges, counts, var_table, horizon):
+    centers = (edges[:-1] + edges[1:]) / 2 * 100
+    fig_risk = go.Figure(data=go.Bar(x=centers, y=counts, name='경로 수', marker_color='steelblue'))
+    for _, row in var_table.iterrows():
+        fig_risk.add_vline(
+            x=-row['var'] * 100,
+            line_dash='dash',
+            line_color='red',
+            annotation_text=f"VaR {row['confidence']:.0%}"
+        )
+    fig_risk.update_layout(
+        title=f"{horizon}일 뒤 포트폴리오 수익률 분포 (시뮬레이션)",
+        xaxis_title="수익률 (%)",
+        yaxis_title="경로 수",
+        bargap=0,
+        height=400
+    )
+    return fig_risk
+
+# 화면 조각(fragment): 안의 위젯을 바꾸면 전체 페이지가 아니라 이 함수만 다시 실행됩니다.
+# 필요한 데이터는 모두 인자로 받습니다. (마지막 전체 실행 때 넘긴 값이 그대로 쓰임)
+@st.fragment
+def volume_section(stock_data):
+    tracing.page("02_퍼플렉시티로")  # 조각만 다시 실행될 때도 페이지 이름이 기록되도록
+    st.subheader("📊 거래량 변화")
+    
+    if st.checkbox("거래량 표시", value=True):
+        fig_volume = figures.cached("volume", build_volume_chart, stock_data)
+        with tracing.span("render:volume"):
+            st.plotly_chart(fig_volume, use_container_width=True)
+
+@st.fragment
+def detail_section(stock_data, companies):
+    tracing.page("02_퍼플렉시티로")
+    st.subheader("🏢 개별 기업 상세 분석")
+    
+    selected_detail = st.selectbox(
+        "상세 분석할 기업 선택:",
+        options=companies
+    )
+    
+    if selected_detail:
+        detail_data = stock_data[selected_detail]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "현재가",
+                f"${detail_data['Close'].iloc[-1]:.2f}",
+                f"{((detail_data['Close'].iloc[-1] - detail_data['Close'].iloc[-2]) / detail_data['Close'].iloc[-2] * 100):.2f}%"
+            )
+        
+        with col2:
+            st.metric(
+                "52주 최고가",
+                f"${detail_data['High'].max():.2f}"
+            )
+        
+        with col3:
+            st.metric(
+                "52주 최저가",
+                f"${detail_data['Low'].min():.2f}"
+            )
+        
+        with col4:
+            avg_volume = detail_data['Volume'].mean()
+            st.metric(
+                "평균 거래량",
+                f"{avg_volume:,.0f}"
+            )
+        
+        fig_detail = figures.cached("detail", build_detail_chart, selected_detail, detail_data)
+        
+        with tracing.span("render:detail"):
+            st.plotly_chart(fig_detail, use_container_width=True)
+
+# 캔들스틱 봉 간격 (화면 표시 이름 → databack.intraday 간격, None 은 일봉/주봉/월봉)
+CANDLE_INTERVALS = {"일봉": None, "15분봉": "15m", "5분봉": "5m", "1분봉": "1m"}
+
+def intraday_candles(company, ticker, interval, column):
+    """최근 며칠의 분봉 캔들스틱. 분봉은 종목·날짜별 파일로 저장해 두고 고른 날짜만 메모리 맵으로 읽습니다."""
+    label = intraday.LABELS[interval]
+    days = column.select_slider("최근 거래일 수:", options=[1, 2, 5, 10, 20], value=1)
+    try:
+        data = datasets.load("intraday_bars", ticker=ticker, interval=interval, days=days)
+    except Exception:
+        st.error(f"{company}의 {label} 데이터를 불러올 수 없습니다.")
+        return
+    if data.empty:
+        st.warning(f"{company}의 최근 {days}거래일 {label} 데이터가 없습니다.")
+        return
+
+    # 봉이 너무 많으면 더 긴 간격(5분 → 15분 → 30분 → 60분)으로 묶음
+    resolution, bars = intraday.fit_bars(data, interval, ohlc.MAX_BARS)
+    currency = fx.currencies_for([ticker])[0]
+    fig = figures.cached("price_candle", build_candlestick_chart, company, bars, intraday.LABELS[resolution], currency)
+    with tracing.span("render:candle"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{intraday.LABELS[resolution]} {len(bars)}개 표시 (거래소 현지 시각, 원본 {label} {len(data):,}개)")
+
+@st.fragment
+def candlestick_section(tickers):
+    tracing.page("02_퍼플렉시티로")
+    col1, col2, col3 = st.columns(3)
+    company = col1.selectbox("캔들스틱 차트 기업:", options=list(tickers))
+    interval = CANDLE_INTERVALS[col2.selectbox("봉 간격:", list(CANDLE_INTERVALS))]
+    if interval is not None:
+        intraday_candles(company, tickers[company], interval, col3)
+        return
+    period = col3.selectbox("기간:", ["1y", "5y", "10y", "max"])
+    
+    # 일봉/주봉/월봉은 종목·기간마다 한 번만 만들어 공용 캐시에 둠
+    try:
+        pyramid = datasets.load("ohlc_pyramid", ticker=tickers[company], period=period)
+    except Exception:
+        st.error(f"{company}의 {period} 데이터를 불러올 수 없습니다.")
+        return
+    if len(pyramid) == 0:
+        st.warning(f"{company}의 {period} 데이터가 없습니다.")
+        return
+    
+    # 구간을 좁히면 더 촘촘한 봉(월봉 → 주봉 → 일봉)으로 바뀜
+    start, end = st.slider(
+        "표시 구간:",
+        min_value=pyramid.start.date(),
+        max_value=pyramid.end.date(),
+        value=(pyramid.start.date(), pyramid.end.date()),
+        format="YYYY-MM-DD",
+        key=f"candle_range_{company}_{period}",
+    )
+    resolution, bars = pyramid.bars(start, end)
+    
+    # 캔들스틱은 한 종목만 그리므로 현지 통화 그대로
+    currency = fx.currencies_for([tickers[company]])[0]
+    fig = figures.cached("price_candle", build_candlestick_chart, company, bars, resolution, currency)
+    with tracing.span("render:candle"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{resolution} {len(bars)}개 표시 (구간이 길면 봉 {ohlc.MAX_BARS}개 이하가 되도록 주봉/월봉으로 묶음)")
+
+REBALANCE_OPTIONS = {"매월": "M", "매 분기": "Q", "매년": "Y", "매주": "W", "매일": "D", "리밸런싱 안 함": None}
+
+@st.fragment
+def portfolio_section(all_stock_data):
+    tracing.page("02_퍼플렉시티로")
+    st.subheader("💼 포트폴리오 백테스트")
+
+    # 모든 기업의 종가가 있는 날짜만 맞춰서 일간 수익률 행렬로 변환
+    # (거래소 시간대가 달라도 같은 현지 날짜끼리 맞춤. 시각으로 맞추면 뉴욕과 리야드 종가가 한 줄에 모이지 않음)
+    prices = fx.price_matrix(all_stock_data)
+    returns = portfolio.returns_matrix(prices)
+    if len(returns) < 2:
+        st.info("백테스트를 하려면 선택된 기업들의 데이터가 모두 있는 날짜가 2일 이상 필요합니다.")
+        return
+
+    col1, col2 = st.columns([2, 1])
+    companies = list(returns.columns)
+    weights_table = col1.data_editor(
+        pd.DataFrame({"기업": companies, "비중 (%)": [round(100 / len(companies), 1)] * len(companies)}),
+        hide_index=True,
+        disabled=["기업"],
+        key=f"portfolio_weights_{'|'.join(companies)}",
+    )
+    rebalance = REBALANCE_OPTIONS[col2.selectbox("리밸런싱 주기:", list(REBALANCE_OPTIONS))]
+
+    weights = weights_table["비중 (%)"].fillna(0).to_numpy(dtype=float)
+    if (weights < 0).any() or weights.sum() <= 0:
+        st.warning("비중은 0 이상이어야 하고, 합계가 0보다 커야 합니다.")
+        return
+    col2.caption(f"비중 합계 {weights.sum():.1f}% (합계가 100%가 되도록 비율을 맞춰 계산합니다)")
+
+    result = portfolio.backtest(returns, weights, rebalance=rebalance)
+    stats = result["stats"].iloc[0]
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("누적 수익률", f"{stats['total_return']:.2%}")
+    col2.metric("연 수익률", f"{stats['cagr']:.2%}")
+    col3.metric("샤프 지수", f"{stats['sharpe']:.2f}")
+    col4.metric("최대 낙폭", f"{stats['max_drawdown']:.2%}")
+    col5.metric("연 회전율", f"{stats['turnover']:.2f}")
+
+    fig_portfolio = figures.cached(
+        "portfolio", build_portfolio_chart, result["equity"][0], result["drawdown"][0], "포트폴리오 가치와 낙폭"
+    )
+    with tracing.span("render:portfolio"):
+        st.plotly_chart(fig_portfolio, use_container_width=True)
+
+    # 몬테카를로 위험 분석: 위 비중으로 horizon 일 동안 들고 있을 때의 손실 분포 (작업 큐에서 실행)
+    if st.checkbox("몬테카를로 위험 분석 (VaR / CVaR)"):
+        col1, col2, col3 = st.columns(3)
+        horizon = col1.selectbox("보유 기간 (거래일):", [1, 5, 10, 20], index=2)
+        n_paths = col2.select_slider("경로 수:", options=[10_000, 50_000, 100_000, 200_000], value=50_000)
+        method = col3.radio("경로 생성 방법:", ["bootstrap", "normal"], format_func={"bootstrap": "과거 수익률 재표본", "normal": "다변량 정규분포"}.get)
+
+        # seed 를 고정해서 같은 조건이면 항상 같은 결과 (다른 세션과 결과 공유)
+        job = jobs.submit(risk.risk_report, returns, weights / weights.sum(), horizon, n_paths, method, 0)
+        report = jobs.wait(job, f"경로 {n_paths:,}개를 시뮬레이션하는 중입니다...")
+        if report is not None:
+            var_table, (edges, counts) = report
+            columns = st.columns(len(var_table) * 2)
+            for i, row in var_table.iterrows():
+                columns[i * 2].metric(f"VaR {row['confidence']:.0%}", f"{row['var']:.2%}")
+                columns[i * 2 + 1].metric(f"CVaR {row['confidence']:.0%}", f"{row['cvar']:.2%}")
+            st.caption(
+                f"VaR: {horizon}거래일 동안 이 비율보다 크게 잃을 확률이 (1 - 신뢰수준)입니다. "
+                "CVaR: 그보다 크게 잃는 경우들의 평균 손실입니다."
+            )
+            fig_risk = figures.cached("portfolio_risk", build_risk_chart, edges, counts, var_table, horizon)
+            with tracing.span("render:portfolio_risk"):
+                st.plotly_chart(fig_risk, use_container_width=True)
+
+    # 무작위 비중 조합 여러 개를 행렬 연산 한 번으로 백테스트 (작업 큐에서 실행, 같은 조건이면 결과 공유)
+    if st.checkbox("무작위 비중 조합 탐색"):
+        n_portfolios = st.select_slider("조합 수:", options=[100, 500, 1000, 2000, 5000], value=1000)
+        job = jobs.submit(portfolio.sweep, returns, n_portfolios, rebalance)
+        swept = jobs.wait(job, f"비중 조합 {n_portfolios}개를 계산하는 중입니다...")
+        if swept is not None:
+            fig_sweep = figures.cached("portfolio_sweep", build_sweep_chart, swept, companies)
+            with tracing.span("render:portfolio_sweep"):
+                st.plotly_chart(fig_sweep, use_container_width=True)
+            st.markdown("**샤프 지수 상위 5개 조합**")
+            st.dataframe(
+                swept.nlargest(5, "sharpe"),
+                hide_index=True,
+                column_config={
+                    **{company: st.column_config.NumberColumn(company, format="percent") for company in companies},
+                    "total_return": st.column_config.NumberColumn("누적 수익률", format="percent"),
+                    "cagr": st.column_config.NumberColumn("연 수익률", format="percent"),
+                    "volatility": st.column_config.NumberColumn("연 변동성", format="percent"),
+                    "sharpe": st.column_config.NumberColumn("샤프 지수", format="%.2f"),
+                    "max_drawdown": st.column_config.NumberColumn("최대 낙폭", format="percent"),
+                    "turnover": st.column_config.NumberColumn("연 회전율", format="%.2f"),
+                },
+            )
+
 # 메인 대시보드
 if selected_companies:
     # 데이터 로딩
@@ -66,6 +438,11 @@ if selected_companies:
         if data is not None and not data.empty:
             stock_data[company] = data
 
+    # 통화가 다른 종목(예: 2222.SR 은 사우디 리얄)은 환율로 USD 로 바꿔 같은 축에서 비교 (databack.fx)
+    stock_data, unconverted = fx.frames_to_usd(stock_data, [top_10_companies[company] for company in stock_data])
+    if unconverted:
+        st.warning(f"환율을 받지 못해 {', '.join(unconverted)} 은(는) 현지 통화 가격으로 표시합니다.")
+
     if stock_data:
         # 성과 요약 테이블
         st.subheader("📊 성과 요약 (최근 1년)")
@@ -93,181 +470,38 @@ if selected_companies:
         st.subheader("📈 주가 변화 차트")
         
         if chart_type == "라인 차트":
-            # 라인 차트 생성
-            fig = go.Figure()
-            
-            for company, data in stock_data.items():
-                fig.add_trace(go.Scatter(
-                    x=data.index,
-                    y=data['Close'],
-                    mode='lines',
-                    name=company,
-                    line=dict(width=2)
-                ))
-            
-            fig.update_layout(
-                title="주가 변화 (라인 차트)",
-                xaxis_title="날짜",
-                yaxis_title="주가 (USD)",
-                height=600,
-                hovermode='x unified'
-            )
-            
+            # 라인 차트 생성 (입력 데이터가 같으면 전에 만든 차트를 다시 씀)
+            fig = figures.cached("price_line", build_line_chart, stock_data)
+            with tracing.span("render:price"):
+                st.plotly_chart(fig, use_container_width=True)
         else:
-            # 캔들스틱 차트 (첫 번째 선택된 기업만)
-            if selected_companies:
-                company = selected_companies[0]
-                data = stock_data[company]
-                
-                fig = go.Figure(data=go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name=company
-                ))
-                
-                fig.update_layout(
-                    title=f"{company} 캔들스틱 차트",
-                    xaxis_title="날짜",
-                    yaxis_title="주가 (USD)",
-                    height=600
-                )
-        
-        st.plotly_chart(fig, use_container_width=True)
+            # 캔들스틱 차트 (기업·기간·구간을 골라서 봄)
+            candlestick_section({company: top_10_companies[company] for company in stock_data})
         
-        # 거래량 차트
-        if show_volume and chart_type == "라인 차트":
-            st.subheader("📊 거래량 변화")
-            
-            fig_volume = go.Figure()
-            
-            for company, data in stock_data.items():
-                fig_volume.add_trace(go.Scatter(
-                    x=data.index,
-                    y=data['Volume'],
-                    mode='lines',
-                    name=f"{company} 거래량",
-                    fill='tonexty' if company != list(stock_data.keys())[0] else 'tozeroy'
-                ))
-            
-            fig_volume.update_layout(
-                title="거래량 변화",
-                xaxis_title="날짜",
-                yaxis_title="거래량",
-                height=400
-            )
-            
-            st.plotly_chart(fig_volume, use_container_width=True)
+        # 거래량 차트 (라인 차트일 때만)
+        if chart_type == "라인 차트":
+            volume_section(stock_data)
         
         # 상관관계 분석
         if len(selected_companies) > 1:
             st.subheader("🔗 주가 상관관계 분석")
             
-            # 상관관계 매트릭스 생성
-            price_data = pd.DataFrame()
-            for company, data in stock_data.items():
-                price_data[company] = data['Close']
+            # 상관관계 매트릭스 생성 (작업 큐에서 계산, 같은 데이터면 다른 세션과 결과 공유)
+            # 거래소 시간대가 달라도 같은 날짜끼리 맞춘 USD 종가 행렬
+            price_data = fx.price_matrix(stock_data)
             
-            correlation_matrix = price_data.corr()
-            
-            # 히트맵 생성
-            fig_corr = go.Figure(data=go.Heatmap(
-                z=correlation_matrix.values,
-                x=correlation_matrix.columns,
-                y=correlation_matrix.index,
-                colorscale='RdBu',
-                zmid=0,
-                text=correlation_matrix.round(3).values,
-                texttemplate="%{text}",
-                textfont={"size": 10}
-            ))
-            
-            fig_corr.update_layout(
-                title="주가 상관관계 매트릭스",
-                height=500
-            )
-            
-            st.plotly_chart(fig_corr, use_container_width=True)
+            job = jobs.submit(analytics.correlation_matrix, price_data)
+            correlation_matrix = jobs.wait(job, "상관관계를 계산하는 중입니다...")
+            if correlation_matrix is not None:
+                fig_corr = figures.cached("corr", build_corr_chart, correlation_matrix)
+                with tracing.span("render:corr"):
+                    st.plotly_chart(fig_corr, use_container_width=True)
         
         # 개별 기업 상세 정보
-        st.subheader("🏢 개별 기업 상세 분석")
-        
-        selected_detail = st.selectbox(
-            "상세 분석할 기업 선택:",
-            options=selected_companies
-        )
-        
-        if selected_detail:
-            detail_data = stock_data[selected_detail]
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "현재가",
-                    f"${detail_data['Close'].iloc[-1]:.2f}",
-                    f"{((detail_data['Close'].iloc[-1] - detail_data['Close'].iloc[-2]) / detail_data['Close'].iloc[-2] * 100):.2f}%"
-                )
-            
-            with col2:
-                st.metric(
-                    "52주 최고가",
-                    f"${detail_data['High'].max():.2f}"
-                )
-            
-            with col3:
-                st.metric(
-                    "52주 최저가",
-                    f"${detail_data['Low'].min():.2f}"
-                )
-            
-            with col4:
-                avg_volume = detail_data['Volume'].mean()
-                st.metric(
-                    "평균 거래량",
-                    f"{avg_volume:,.0f}"
-                )
-            
-            # 이동평균선 추가
-            detail_data['MA20'] = detail_data['Close'].rolling(window=20).mean()
-            detail_data['MA50'] = detail_data['Close'].rolling(window=50).mean()
-            
-            fig_detail = go.Figure()
-            
-            fig_detail.add_trace(go.Scatter(
-                x=detail_data.index,
-                y=detail_data['Close'],
-                mode='lines',
-                name='종가',
-                line=dict(color='blue', width=2)
-            ))
-            
-            fig_detail.add_trace(go.Scatter(
-                x=detail_data.index,
-                y=detail_data['MA20'],
-                mode='lines',
-                name='20일 이동평균',
-                line=dict(color='orange', width=1)
-            ))
-            
-            fig_detail.add_trace(go.Scatter(
-                x=detail_data.index,
-                y=detail_data['MA50'],
-                mode='lines',
-                name='50일 이동평균',
-                line=dict(color='red', width=1)
-            ))
-            
-            fig_detail.update_layout(
-                title=f"{selected_detail} 상세 차트 (이동평균선 포함)",
-                xaxis_title="날짜",
-                yaxis_title="주가 (USD)",
-                height=500
-            )
-            
-            st.plotly_chart(fig_detail, use_container_width=True)
+        detail_section(stock_data, list(stock_data.keys()))
+
+        # 포트폴리오 백테스트 (비중, 리밸런싱 주기, 몬테카를로 위험 분석)
+        portfolio_section(stock_data)
     
     else:
         st.error("선택된 기업들의 데이터를 불러올 수 없습니다.")
@@ -281,6 +515,6 @@ st.markdown(
     """
     **데이터 출처:** Yahoo Finance  
     **업데이트:** 실시간  
-    **기준:** 2025년 5월 글로벌 시가총액 Top 10 기업
+    **기준:** 발행주식수 × 최근 종가로 계산한 글로벌 시가총액 Top 10 기업
     """
 )
@@ -1,9 +1,9 @@
 import streamlit as st
-import yfinance as yf
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots # 캔들스틱 + 거래량 통합 차트를 위해 필요할 수 있지만, 여기서는 분리하여 사용
 import pandas as pd
 from datetime import datetime, timedelta
+from plotly.subplots import make_subplots
+from databack import analytics, datasets, figures, fx, intraday, jobs, ohlc, portfolio, ranking, risk, tracing
 
 # --- 1. 페이지 설정 ---
 st.set_page_config(
@@ -12,24 +12,14 @@ st.set_page_config(
     layout="wide"
 )
 
+tracing.page("03_제미나이수정")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
 st.title("📈 글로벌 시가총액 Top 기업 주식 변화 (최근 1년)")
 st.markdown("---")
 
-# --- 2. 글로벌 시가총액 Top 기업 리스트 (예시) ---
-# 실제 시가총액 Top 10은 변동이 심하므로, 일반적으로 상위에 랭크되는 기업들로 구성
-# 2025년 5월 기준은 예시이며, 필요에 따라 이 리스트를 수정할 수 있습니다.
-top_global_companies = {
-    'Microsoft': 'MSFT',
-    'Apple': 'AAPL',
-    'NVIDIA': 'NVDA',
-    'Alphabet (Google)': 'GOOGL',
-    'Amazon': 'AMZN',
-    'Meta Platforms': 'META',
-    'Saudi Aramco': '2222.SR', # 사우디 아람코는 야후 파이낸스에서 심볼이 다를 수 있음
-    'Berkshire Hathaway': 'BRK-B',
-    'Broadcom': 'AVGO',
-    'TSMC': 'TSM' # 대만 기업 추가
-}
+# --- 2. 글로벌 시가총액 Top 기업 리스트 ---
+# 후보 종목의 발행주식수 × 최근 종가로 시가총액을 계산해 상위 10개를 고릅니다 (databack.ranking, 1시간마다 갱신)
+top_global_companies = ranking.top_companies(10)
 
 # --- 3. 사이드바 설정 ---
 st.sidebar.header("📊 대시보드 설정")
@@ -44,19 +34,16 @@ chart_type = st.sidebar.selectbox(
     ["라인 차트", "캔들스틱 차트"]
 )
 
-show_volume = st.sidebar.checkbox("거래량 차트 표시", value=True)
-
-# --- 4. 데이터 로딩 함수 (캐싱 적용) ---
-@st.cache_data(ttl=3600) # 1시간마다 캐시 갱신
+# --- 4. 데이터 로딩 함수 (공용 데이터 캐시, 1시간마다 갱신) ---
+@tracing.traced()
 def load_stock_data(ticker: str, period: str = "1y") -> pd.DataFrame | None:
     """
     Yahoo Finance에서 특정 티커의 주식 데이터를 로드합니다.
     """
     try:
         # yf.Ticker().history()는 yf.download()보다 더 안정적이고 조정된 데이터를 반환합니다.
-        stock = yf.Ticker(ticker)
         # period='1y'는 지난 1년간의 데이터를 의미합니다.
-        data = stock.history(period=period)
+        data = datasets.load("stock_history", ticker=ticker, period=period)
         if not data.empty:
             return data
         else:
@@ -66,6 +53,360 @@ def load_stock_data(ticker: str, period: str = "1y") -> pd.DataFrame | None:
         st.error(f"'{ticker}' 데이터를 불러오는 중 오류 발생: {e}")
         return None
 
+# --- 4.1. 차트 생성 함수 ---
+# 차트에 쓰는 값은 모두 인자로 받습니다. databack.figures 가 입력 데이터가 같으면 전에 만든 차트를 다시 씁니다.
+def build_price_chart(all_stock_data):
+    fig_price = go.Figure()
+    for company, data in all_stock_data.items():
+        fig_price.add_trace(go.Scatter(x=data.index, y=data['Close'], mode='lines', name=company))
+    
+    fig_price.update_layout(
+        title="주가 변화 (라인 차트)",
+        xaxis_title="날짜",
+        yaxis_title="주가 (USD)",
+        hovermode='x unified',
+        height=500
+    )
+    return fig_price
+
+def build_candlestick_chart(company, data, resolution="일봉", currency="USD"):
+    fig_candle = go.Figure(data=[go.Candlestick(
+        x=data.index,
+        open=data['Open'],
+        high=data['High'],
+        low=data['Low'],
+        close=data['Close'],
+        name=company
+    )])
+    fig_candle.update_layout(
+        title=f"{company} 캔들스틱 차트 ({resolution})",
+        xaxis_title="날짜",
+        yaxis_title=f"주가 ({currency})",
+        height=500
+    )
+    return fig_candle
+
+def build_volume_chart(all_stock_data):
+    fig_volume = go.Figure()
+    for company, data in all_stock_data.items():
+        fig_volume.add_trace(go.Scatter(x=data.index, y=data['Volume'], mode='lines', name=f"{company} 거래량", fill='tozeroy'))
+    
+    fig_volume.update_layout(
+        title="거래량 변화",
+        xaxis_title="날짜",
+        yaxis_title="거래량",
+        hovermode='x unified',
+        height=300
+    )
+    return fig_volume
+
+def build_corr_chart(correlation_matrix):
+    fig_corr = go.Figure(data=go.Heatmap(
+        z=correlation_matrix.values,
+        x=correlation_matrix.columns,
+        y=correlation_matrix.index,
+        colorscale='RdBu',
+        zmid=0, # 0을 중심으로 색상 스케일 설정
+        text=correlation_matrix.round(2).values, # 텍스트로 값 표시
+        texttemplate="%{text}",
+        textfont={"size": 10}
+    ))
+    fig_corr.update_layout(
+        title="주가 상관관계 매트릭스",
+        xaxis_title="기업",
+        yaxis_title="기업",
+        height=500,
+        xaxis=dict(side="top") # x축 라벨을 위로 이동
+    )
+    return fig_corr
+
+def build_detail_chart(company, data):
+    detail_data = data.copy() # 원본 데이터 보존을 위해 copy() 사용
+
+    # 이동평균선 계산
+    detail_data['MA20'] = detail_data['Close'].rolling(window=20).mean()
+    detail_data['MA50'] = detail_data['Close'].rolling(window=50).mean()
+    
+    fig_detail = go.Figure()
+    fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['Close'], mode='lines', name='종가', line=dict(color='blue', width=2)))
+    fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['MA20'], mode='lines', name='20일 이동평균', line=dict(color='orange', width=1, dash='dot')))
+    fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['MA50'], mode='lines', name='50일 이동평균', line=dict(color='red', width=1, dash='dash')))
+    
+    fig_detail.update_layout(
+        title=f"{company} 상세 차트 (이동평균선 포함)",
+        xaxis_title="날짜",
+        yaxis_title="주가 (USD)",
+        hovermode='x unified',
+        height=500
+    )
+    return fig_detail
+
+def build_portfolio_chart(equity, drawdown, title):
+    fig_portfolio = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05)
+    fig_portfolio.add_trace(go.Scatter(x=equity.index, y=equity * 100, mode='lines', name='포트폴리오 가치'), row=1, col=1)
+    fig_portfolio.add_trace(go.Scatter(x=drawdown.index, y=drawdown * 100, mode='lines', name='낙폭', fill='tozeroy', line=dict(color='red')), row=2, col=1)
+    fig_portfolio.update_yaxes(title_text="가치 (시작 100)", row=1, col=1)
+    fig_portfolio.update_yaxes(title_text="낙폭 (%)", row=2, col=1)
+    fig_portfolio.update_layout(
+        title=title,
+        hovermode='x unified',
+        height=550,
+        showlegend=False
+    )
+    return fig_portfolio
+
+def build_sweep_chart(swept, companies):
+    fig_sweep = go.Figure(data=go.Scatter(
+        x=swept['volatility'] * 100,
+        y=swept['cagr'] * 100,
+        mode='markers',
+        marker=dict(color=swept['sharpe'], colorscale='Viridis', showscale=True, colorbar=dict(title="샤프 지수"), size=5),
+        text=[", ".join(f"{name} {weight:.0%}" for name, weight in zip(companies, row)) for row in swept[companies].to_numpy()],
+        hovertemplate="변동성 %{x:.1f}%<br>연 수익률 %{y:.1f}%<br>%{text}<extra></extra>"
+    ))
+    fig_sweep.update_layout(
+        title=f"무작위 비중 {len(swept)}개 조합의 위험 대비 수익",
+        xaxis_title="연 변동성 (%)",
+        yaxis_title="연 수익률 (%)",
+        height=500
+    )
+    return fig_sweep
+
+def build_risk_chart(edges, counts, var_table, horizon):
+    centers = (edges[:-1] + edges[1:]) / 2 * 100
+    fig_risk = go.Figure(data=go.Bar(x=centers, y=counts, name='경로 수', marker_color='steelblue'))
+    for _, row in var_table.iterrows():
+        fig_risk.add_vline(
+            x=-row['var'] * 100,
+            line_dash='dash',
+            line_color='red',
+            annotation_text=f"VaR {row['confidence']:.0%}"
+        )
+    fig_risk.update_layout(
+        title=f"{horizon}일 뒤 포트폴리오 수익률 분포 (시뮬레이션)",
+        xaxis_title="수익률 (%)",
+        yaxis_title="경로 수",
+        bargap=0,
+        height=400
+    )
+    return fig_risk
+
+# --- 4.2. 화면 조각(fragment) ---
+# 조각 안의 위젯(체크박스, 선택 상자)을 바꾸면 페이지 전체가 아니라 그 조각만 다시 실행됩니다.
+# 조각에 필요한 데이터는 모두 인자로 받습니다. (마지막 전체 실행 때 넘긴 값이 그대로 쓰임)
+@st.fragment
+def volume_section(all_stock_data):
+    tracing.page("03_제미나이수정")  # 조각만 다시 실행될 때도 페이지 이름이 기록되도록
+    if st.checkbox("거래량 차트 표시", value=True):
+        st.subheader("📊 거래량 변화")
+        fig_volume = figures.cached("volume", build_volume_chart, all_stock_data)
+        with tracing.span("render:volume"):
+            st.plotly_chart(fig_volume, use_container_width=True)
+
+@st.fragment
+def detail_section(all_stock_data):
+    tracing.page("03_제미나이수정")
+    st.subheader("🏢 개별 기업 상세 분석")
+    
+    selected_detail_company = st.selectbox(
+        "상세 분석할 기업을 선택하세요:",
+        options=list(all_stock_data.keys())
+    )
+    
+    if selected_detail_company:
+        detail_data = all_stock_data[selected_detail_company]
+        
+        # 현재가, 변화율, 52주 최고/최저가, 평균 거래량 메트릭스
+        col1, col2, col3, col4 = st.columns(4)
+        if len(detail_data) > 1:
+            with col1:
+                st.metric(
+                    "현재 종가",
+                    f"${detail_data['Close'].iloc[-1]:.2f}",
+                    f"{((detail_data['Close'].iloc[-1] - detail_data['Close'].iloc[-2]) / detail_data['Close'].iloc[-2] * 100):.2f}%"
+                )
+            with col2:
+                st.metric(
+                    "52주 최고가",
+                    f"${detail_data['High'].max():.2f}"
+                )
+            with col3:
+                st.metric(
+                    "52주 최저가",
+                    f"${detail_data['Low'].min():.2f}"
+                )
+            with col4:
+                avg_volume = detail_data['Volume'].mean()
+                st.metric(
+                    "평균 거래량",
+                    f"{avg_volume:,.0f}"
+                )
+        else:
+            st.info("선택된 기업의 상세 지표를 표시할 데이터가 부족합니다.")
+
+        # 상세 차트 (종가 및 이동평균선)
+        fig_detail = figures.cached("detail", build_detail_chart, selected_detail_company, detail_data)
+        with tracing.span("render:detail"):
+            st.plotly_chart(fig_detail, use_container_width=True)
+
+# 캔들스틱 봉 간격 (화면 표시 이름 → databack.intraday 간격, None 은 일봉/주봉/월봉)
+CANDLE_INTERVALS = {"일봉": None, "15분봉": "15m", "5분봉": "5m", "1분봉": "1m"}
+
+def intraday_candles(company, ticker, interval, column):
+    """최근 며칠의 분봉 캔들스틱. 분봉은 종목·날짜별 파일로 저장해 두고 고른 날짜만 메모리 맵으로 읽습니다."""
+    label = intraday.LABELS[interval]
+    days = column.select_slider("최근 거래일 수:", options=[1, 2, 5, 10, 20], value=1)
+    try:
+        data = datasets.load("intraday_bars", ticker=ticker, interval=interval, days=days)
+    except Exception as e:
+        st.error(f"'{ticker}' {label} 데이터를 불러오는 중 오류 발생: {e}")
+        return
+    if data.empty:
+        st.warning(f"'{ticker}'의 최근 {days}거래일 {label} 데이터를 찾을 수 없거나 비어있습니다.")
+        return
+
+    # 봉이 너무 많으면 더 긴 간격(5분 → 15분 → 30분 → 60분)으로 묶음
+    resolution, bars = intraday.fit_bars(data, interval, ohlc.MAX_BARS)
+    currency = fx.currencies_for([ticker])[0]
+    fig = figures.cached("price_candle", build_candlestick_chart, company, bars, intraday.LABELS[resolution], currency)
+    with tracing.span("render:candle"):
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{intraday.LABELS[resolution]} {len(bars)}개 표시 (거래소 현지 시각, 원본 {label} {len(data):,}개)")
+
+@st.fragment
+def candlestick_section(tickers):
+    tracing.page("03_제미나이수정")
+    col1, col2, col3 = st.columns(3)
+    company = col1.selectbox("캔들스틱 차트 기업:", options=list(tickers))
+    interval = CANDLE_INTERVALS[col2.selectbox("봉 간격:", list(CANDLE_INTERVALS))]
+    if interval is not None:
+        intraday_candles(company, tickers[company], interval, col3)
+        return
+    period = col3.selectbox("기간:", ["1y", "5y", "10y", "max"], help="긴 기간은 주봉/월봉으로 묶어서 표시합니다.")
+
+    # 일봉/주봉/월봉은 종목·기간마다 한 번만 만들어 공용 캐시에 보관
+    try:
+        pyramid = datasets.load("ohlc_pyramid", ticker=tickers[company], period=period)
+    except Exception as e:
+        st.error(f"'{tickers[company]}' 데이터를 불러오는 중 오류 발생: {e}")
+        return
+    if len(pyramid) == 0:
+        st.warning(f"'{tickers[company]}'에 대한 데이터를 찾을 수 없거나 비어있습니다.")
+        return
+
+    # 구간을 좁히면(확대) 더 촘촘한 봉으로 바뀌어, 어떤 구간이든 봉 수가 일정 개수 이하로 유지됨
+    start, end = st.slider(
+        "표시 구간:",
+        min_value=pyramid.start.date(),
+        max_value=pyramid.end.date(),
+        value=(pyramid.start.date(), pyramid.end.date()),
+        format="YYYY-MM-DD",
+        key=f"candle_range_{company}_{period}",
+    )
+    resolution, bars = pyramid.bars(start, end)
+
+    # 캔들스틱은 한 종목만 그리므로 현지 통화 그대로
+    currency = fx.currencies_for([tickers[company]])[0]
+    fig_candle = figures.cached("price_candle", build_candlestick_chart, company, bars, resolution, currency)
+    with tracing.span("render:candle"):
+        st.plotly_chart(fig_candle, use_container_width=True)
+    st.caption(f"{resolution} {len(bars)}개 표시 (최대 {ohlc.MAX_BARS}개)")
+
+# 리밸런싱 주기 (화면 표시 이름 → databack.portfolio 의 주기)
+REBALANCE_OPTIONS = {"매월": "M", "매 분기": "Q", "매년": "Y", "매주": "W", "매일": "D", "리밸런싱 안 함": None}
+
+@st.fragment
+def portfolio_section(all_stock_data):
+    tracing.page("03_제미나이수정")
+    st.subheader("💼 포트폴리오 백테스트")
+
+    # 모든 기업의 종가가 있는 날짜만 맞춰서 일간 수익률 행렬로 변환
+    # (거래소 시간대가 달라도 같은 현지 날짜끼리 맞춤. 시각으로 맞추면 뉴욕과 리야드 종가가 한 줄에 모이지 않음)
+    prices = fx.price_matrix(all_stock_data)
+    returns = portfolio.returns_matrix(prices)
+    if len(returns) < 2:
+        st.info("백테스트를 하려면 선택된 기업들의 데이터가 모두 있는 날짜가 2일 이상 필요합니다.")
+        return
+
+    col1, col2 = st.columns([2, 1])
+    companies = list(returns.columns)
+    weights_table = col1.data_editor(
+        pd.DataFrame({"기업": companies, "비중 (%)": [round(100 / len(companies), 1)] * len(companies)}),
+        hide_index=True,
+        disabled=["기업"],
+        key=f"portfolio_weights_{'|'.join(companies)}",
+    )
+    rebalance = REBALANCE_OPTIONS[col2.selectbox("리밸런싱 주기:", list(REBALANCE_OPTIONS))]
+
+    weights = weights_table["비중 (%)"].fillna(0).to_numpy(dtype=float)
+    if (weights < 0).any() or weights.sum() <= 0:
+        st.warning("비중은 0 이상이어야 하고, 합계가 0보다 커야 합니다.")
+        return
+    col2.caption(f"비중 합계 {weights.sum():.1f}% (합계가 100%가 되도록 비율을 맞춰 계산합니다)")
+
+    result = portfolio.backtest(returns, weights, rebalance=rebalance)
+    stats = result["stats"].iloc[0]
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("누적 수익률", f"{stats['total_return']:.2%}")
+    col2.metric("연 수익률", f"{stats['cagr']:.2%}")
+    col3.metric("샤프 지수", f"{stats['sharpe']:.2f}")
+    col4.metric("최대 낙폭", f"{stats['max_drawdown']:.2%}")
+    col5.metric("연 회전율", f"{stats['turnover']:.2f}")
+
+    fig_portfolio = figures.cached(
+        "portfolio", build_portfolio_chart, result["equity"][0], result["drawdown"][0], "포트폴리오 가치와 낙폭"
+    )
+    with tracing.span("render:portfolio"):
+        st.plotly_chart(fig_portfolio, use_container_width=True)
+
+    # 몬테카를로 위험 분석: 위 비중으로 horizon 일 동안 들고 있을 때의 손실 분포 (작업 큐에서 실행)
+    if st.checkbox("몬테카를로 위험 분석 (VaR / CVaR)"):
+        col1, col2, col3 = st.columns(3)
+        horizon = col1.selectbox("보유 기간 (거래일):", [1, 5, 10, 20], index=2)
+        n_paths = col2.select_slider("경로 수:", options=[10_000, 50_000, 100_000, 200_000], value=50_000)
+        method = col3.radio("경로 생성 방법:", ["bootstrap", "normal"], format_func={"bootstrap": "과거 수익률 재표본", "normal": "다변량 정규분포"}.get)
+
+        # seed 를 고정해서 같은 조건이면 항상 같은 결과 (다른 세션과 결과 공유)
+        job = jobs.submit(risk.risk_report, returns, weights / weights.sum(), horizon, n_paths, method, 0)
+        report = jobs.wait(job, f"경로 {n_paths:,}개를 시뮬레이션하는 중입니다...")
+        if report is not None:
+            var_table, (edges, counts) = report
+            columns = st.columns(len(var_table) * 2)
+            for i, row in var_table.iterrows():
+                columns[i * 2].metric(f"VaR {row['confidence']:.0%}", f"{row['var']:.2%}")
+                columns[i * 2 + 1].metric(f"CVaR {row['confidence']:.0%}", f"{row['cvar']:.2%}")
+            st.caption(
+                f"VaR: {horizon}거래일 동안 이 비율보다 크게 잃을 확률이 (1 - 신뢰수준)입니다. "
+                "CVaR: 그보다 크게 잃는 경우들의 평균 손실입니다."
+            )
+            fig_risk = figures.cached("portfolio_risk", build_risk_chart, edges, counts, var_table, horizon)
+            with tracing.span("render:portfolio_risk"):
+                st.plotly_chart(fig_risk, use_container_width=True)
+
+    # 무작위 비중 조합 여러 개를 행렬 연산 한 번으로 백테스트 (작업 큐에서 실행, 같은 조건이면 결과 공유)
+    if st.checkbox("무작위 비중 조합 탐색"):
+        n_portfolios = st.select_slider("조합 수:", options=[100, 500, 1000, 2000, 5000], value=1000)
+        job = jobs.submit(portfolio.sweep, returns, n_portfolios, rebalance)
+        swept = jobs.wait(job, f"비중 조합 {n_portfolios}개를 계산하는 중입니다...")
+        if swept is not None:
+            fig_sweep = figures.cached("portfolio_sweep", build_sweep_chart, swept, companies)
+            with tracing.span("render:portfolio_sweep"):
+                st.plotly_chart(fig_sweep, use_container_width=True)
+            st.markdown("**샤프 지수 상위 5개 조합**")
+            st.dataframe(
+                swept.nlargest(5, "sharpe"),
+                hide_index=True,
+                column_config={
+                    **{company: st.column_config.NumberColumn(company, format="percent") for company in companies},
+                    "total_return": st.column_config.NumberColumn("누적 수익률", format="percent"),
+                    "cagr": st.column_config.NumberColumn("연 수익률", format="percent"),
+                    "volatility": st.column_config.NumberColumn("연 변동성", format="percent"),
+                    "sharpe": st.column_config.NumberColumn("샤프 지수", format="%.2f"),
+                    "max_drawdown": st.column_config.NumberColumn("최대 낙폭", format="percent"),
+                    "turnover": st.column_config.NumberColumn("연 회전율", format="%.2f"),
+                },
+            )
+
 # --- 5. 메인 대시보드 로직 ---
 if not selected_companies_names:
     st.warning("분석할 기업을 하나 이상 선택해주세요.")
@@ -81,6 +422,11 @@ else:
             if data is not None:
                 all_stock_data[company_name] = data
 
+    # 통화가 다른 종목(예: 2222.SR 은 사우디 리얄)은 환율로 USD 로 바꿔 같은 축에서 비교 (databack.fx)
+    all_stock_data, unconverted = fx.frames_to_usd(all_stock_data, [selected_tickers[name] for name in all_stock_data])
+    if unconverted:
+        st.warning(f"환율을 받지 못해 {', '.join(unconverted)} 은(는) 현지 통화 가격으로 표시합니다.")
+
     if not all_stock_data:
         st.error("선택된 기업들 중 유효한 데이터를 불러올 수 있는 기업이 없습니다. 티커를 확인하거나 잠시 후 다시 시도해 주세요.")
     else:
@@ -111,150 +457,45 @@ else:
         st.subheader("📈 주가 변화 차트")
         
         if chart_type == "라인 차트":
-            fig_price = go.Figure()
-            for company, data in all_stock_data.items():
-                fig_price.add_trace(go.Scatter(x=data.index, y=data['Close'], mode='lines', name=company))
-            
-            fig_price.update_layout(
-                title="주가 변화 (라인 차트)",
-                xaxis_title="날짜",
-                yaxis_title="주가 (USD)",
-                hovermode='x unified',
-                height=500
-            )
-            st.plotly_chart(fig_price, use_container_width=True)
+            fig_price = figures.cached("price_line", build_price_chart, all_stock_data)
+            with tracing.span("render:price"):
+                st.plotly_chart(fig_price, use_container_width=True)
 
         elif chart_type == "캔들스틱 차트":
-            # 캔들스틱은 보통 개별 종목에 적합하므로, 첫 번째 선택된 기업만 표시
-            if all_stock_data and selected_companies_names:
-                selected_company_for_candlestick = selected_companies_names[0]
-                data = all_stock_data[selected_company_for_candlestick]
-
-                fig_candle = go.Figure(data=[go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name=selected_company_for_candlestick
-                )])
-                fig_candle.update_layout(
-                    title=f"{selected_company_for_candlestick} 캔들스틱 차트",
-                    xaxis_title="날짜",
-                    yaxis_title="주가 (USD)",
-                    height=500
-                )
-                st.plotly_chart(fig_candle, use_container_width=True)
+            # 캔들스틱은 보통 개별 종목에 적합하므로, 기업 하나를 골라서 표시
+            if all_stock_data:
+                candlestick_section({name: selected_tickers[name] for name in all_stock_data})
             else:
                 st.info("캔들스틱 차트를 표시할 기업을 선택해주세요.")
 
         # --- 5.3. 거래량 차트 ---
-        if show_volume:
-            st.subheader("📊 거래량 변화")
-            fig_volume = go.Figure()
-            for company, data in all_stock_data.items():
-                fig_volume.add_trace(go.Scatter(x=data.index, y=data['Volume'], mode='lines', name=f"{company} 거래량", fill='tozeroy'))
-            
-            fig_volume.update_layout(
-                title="거래량 변화",
-                xaxis_title="날짜",
-                yaxis_title="거래량",
-                hovermode='x unified',
-                height=300
-            )
-            st.plotly_chart(fig_volume, use_container_width=True)
+        volume_section(all_stock_data)
 
         # --- 5.4. 주가 상관관계 분석 ---
         if len(selected_companies_names) > 1:
             st.subheader("🔗 주가 상관관계 분석")
-            price_data_for_corr = pd.DataFrame()
-            for company, data in all_stock_data.items():
-                # 상관관계 분석을 위해 'Close' 가격만 사용
-                price_data_for_corr[company] = data['Close']
+            # 상관관계 분석을 위해 'Close' 가격만 사용 (거래소 시간대가 달라도 같은 날짜끼리 맞춘 USD 종가 행렬)
+            price_data_for_corr = fx.price_matrix(all_stock_data)
             
             # 결측값이 있는 행 제거 (상관관계 계산에 중요)
             price_data_for_corr = price_data_for_corr.dropna()
 
             if not price_data_for_corr.empty:
-                correlation_matrix = price_data_for_corr.corr()
-                fig_corr = go.Figure(data=go.Heatmap(
-                    z=correlation_matrix.values,
-                    x=correlation_matrix.columns,
-                    y=correlation_matrix.index,
-                    colorscale='RdBu',
-                    zmid=0, # 0을 중심으로 색상 스케일 설정
-                    text=correlation_matrix.round(2).values, # 텍스트로 값 표시
-                    texttemplate="%{text}",
-                    textfont={"size": 10}
-                ))
-                fig_corr.update_layout(
-                    title="주가 상관관계 매트릭스",
-                    xaxis_title="기업",
-                    yaxis_title="기업",
-                    height=500,
-                    xaxis=dict(side="top") # x축 라벨을 위로 이동
-                )
-                st.plotly_chart(fig_corr, use_container_width=True)
+                # 상관관계 계산은 작업 큐(별도 프로세스)에서, 같은 데이터면 다른 세션과 결과 공유
+                job = jobs.submit(analytics.correlation_matrix, price_data_for_corr)
+                correlation_matrix = jobs.wait(job, "상관관계를 계산하는 중입니다...")
+                if correlation_matrix is not None:
+                    fig_corr = figures.cached("corr", build_corr_chart, correlation_matrix)
+                    with tracing.span("render:corr"):
+                        st.plotly_chart(fig_corr, use_container_width=True)
             else:
                 st.info("상관관계 분석을 위한 데이터가 충분하지 않습니다. 선택된 기업들의 데이터가 모두 존재해야 합니다.")
         
         # --- 5.5. 개별 기업 상세 분석 ---
-        st.subheader("🏢 개별 기업 상세 분석")
-        
-        selected_detail_company = st.selectbox(
-            "상세 분석할 기업을 선택하세요:",
-            options=list(all_stock_data.keys())
-        )
-        
-        if selected_detail_company:
-            detail_data = all_stock_data[selected_detail_company].copy() # 원본 데이터 보존을 위해 copy() 사용
-            
-            # 현재가, 변화율, 52주 최고/최저가, 평균 거래량 메트릭스
-            col1, col2, col3, col4 = st.columns(4)
-            if len(detail_data) > 1:
-                with col1:
-                    st.metric(
-                        "현재 종가",
-                        f"${detail_data['Close'].iloc[-1]:.2f}",
-                        f"{((detail_data['Close'].iloc[-1] - detail_data['Close'].iloc[-2]) / detail_data['Close'].iloc[-2] * 100):.2f}%"
-                    )
-                with col2:
-                    st.metric(
-                        "52주 최고가",
-                        f"${detail_data['High'].max():.2f}"
-                    )
-                with col3:
-                    st.metric(
-                        "52주 최저가",
-                        f"${detail_data['Low'].min():.2f}"
-                    )
-                with col4:
-                    avg_volume = detail_data['Volume'].mean()
-                    st.metric(
-                        "평균 거래량",
-                        f"{avg_volume:,.0f}"
-                    )
-            else:
-                st.info("선택된 기업의 상세 지표를 표시할 데이터가 부족합니다.")
+        detail_section(all_stock_data)
 
-            # 이동평균선 계산
-            detail_data['MA20'] = detail_data['Close'].rolling(window=20).mean()
-            detail_data['MA50'] = detail_data['Close'].rolling(window=50).mean()
-            
-            # 상세 차트 (종가 및 이동평균선)
-            fig_detail = go.Figure()
-            fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['Close'], mode='lines', name='종가', line=dict(color='blue', width=2)))
-            fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['MA20'], mode='lines', name='20일 이동평균', line=dict(color='orange', width=1, dash='dot')))
-            fig_detail.add_trace(go.Scatter(x=detail_data.index, y=detail_data['MA50'], mode='lines', name='50일 이동평균', line=dict(color='red', width=1, dash='dash')))
-            
-            fig_detail.update_layout(
-                title=f"{selected_detail_company} 상세 차트 (이동평균선 포함)",
-                xaxis_title="날짜",
-                yaxis_title="주가 (USD)",
-                hovermode='x unified',
-                height=500
-            )
-            st.plotly_chart(fig_detail, use_container_width=True)
+        # --- 5.6. 포트폴리오 백테스트 ---
+        portfolio_section(all_stock_data)
 
 # --- 6. 푸터 ---
 st.markdown("---")
@@ -262,6 +503,6 @@ st.markdown(
     """
     **데이터 출처:** Yahoo Finance  
     **업데이트 주기:** 매 시간  
-    **기준:** 일반적으로 알려진 글로벌 시가총액 상위 기업들 (실시간 시가총액 순위와 다를 수 있음)
+    **기준:** 발행주식수 × 최근 종가로 계산한 글로벌 시가총액 상위 기업들 (종가를 받지 못한 종목은 기준가 사용)
     """
 )
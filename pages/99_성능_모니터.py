@@ -0,0 +1,104 @@
+import os
+
+import streamlit as st
+from databack import datasets, figures, jobs, ranking, tracing
+
+# 관리자용 성능 모니터 페이지
+# 각 페이지에서 tracing.span 으로 잰 구간별 시간(p50/p95)과 데이터 캐시 적중률을 보여줍니다.
+# 주소 뒤에 ?admin=<토큰> 을 붙여야 열립니다. (토큰: secrets 의 admin_token 또는 환경변수 DATABACK_ADMIN_TOKEN)
+
+st.set_page_config(page_title="성능 모니터", page_icon="⏱️", layout="wide")
+
+
+def admin_token():
+    try:
+        token = st.secrets.get("admin_token")
+    except Exception:  # secrets.toml 이 없는 경우
+        token = None
+    return token or os.environ.get("DATABACK_ADMIN_TOKEN")
+
+
+token = admin_token()
+if not token or st.query_params.get("admin") != token:
+    st.info("관리자 전용 페이지입니다.")
+    st.stop()
+
+st.title("⏱️ 성능 모니터")
+st.caption(f"최근 {tracing.MAX_RECORDS}개 구간 기록 기준 (서버 프로세스가 다시 시작되면 초기화됩니다)")
+
+if st.button("기록 지우기"):
+    tracing.clear()
+
+rows = tracing.summary()
+if not rows:
+    st.info("아직 기록된 구간이 없습니다. 다른 페이지를 몇 번 열어 본 뒤 새로고침하세요.")
+    st.stop()
+
+pages = sorted({row["page"] or "-" for row in rows})
+selected = st.multiselect("페이지", pages, default=pages)
+
+st.subheader("구간별 실행 시간")
+st.dataframe(
+    [row for row in rows if (row["page"] or "-") in selected],
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "page": "페이지",
+        "stage": "구간",
+        "count": "횟수",
+        "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+        "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+        "max_ms": st.column_config.NumberColumn("최대 (ms)", format="%.1f"),
+        "cache_hit_rate": st.column_config.ProgressColumn("캐시 적중률", min_value=0, max_value=1, format="%.2f"),
+        "hit_p50_ms": st.column_config.NumberColumn("적중 p50 (ms)", format="%.1f"),
+    },
+)
+
+
+def show_cache_stats(title, stats, label):
+    st.subheader(title)
+    col1, col2 = st.columns(2)
+    col1.metric("캐시 항목 수", stats["entries"])
+    col2.metric("사용 메모리", f"{stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    st.dataframe(
+        [{label: name, **group} for name, group in stats["groups"].items()],
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+show_cache_stats("데이터 캐시", datasets.cache_stats(), "dataset")
+st.subheader("데이터 형식 줄이기 (캐시에 있는 데이터셋)")
+st.caption("로드할 때 스키마대로 float32 / uint32 / int32 / category 로 바꾼 전후의 메모리입니다. (DATABACK_COMPACT_DTYPES=0 이면 꺼짐)")
+st.dataframe(
+    datasets.memory_report(),
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "dataset": "데이터셋",
+        "params": "파라미터",
+        "before_mb": st.column_config.NumberColumn("줄이기 전 (MB)", format="%.2f"),
+        "after_mb": st.column_config.NumberColumn("줄인 후 (MB)", format="%.2f"),
+        "ratio": st.column_config.NumberColumn("비율", format="percent"),
+    },
+)
+
+show_cache_stats("차트 캐시", figures.cache_stats(), "figure")
+
+job_stats = jobs.stats()
+show_cache_stats(f"작업 큐 결과 (실행 중 {job_stats['running']}개 / 프로세스 {job_stats['max_workers']}개)", job_stats, "job")
+
+st.subheader("시가총액 순위 유니버스")
+st.caption(f"후보 종목 {len(datasets.load('market_universe'))}개 · 저장 위치: {datasets.UNIVERSE_PARQUET}")
+if st.button("발행주식수 새로고침 (yfinance)"):
+    with st.spinner("종목별 발행주식수와 종가를 받는 중입니다..."):
+        refreshed = ranking.refresh_universe()
+    st.success(f"{len(refreshed)}개 종목을 저장했습니다.")
+
+st.subheader("최근 기록")
+recent = tracing.records()[-200:][::-1]
+st.dataframe(
+    [row for row in recent if (row["page"] or "-") in selected],
+    use_container_width=True,
+    hide_index=True,
+)
@@ -1,11 +1,27 @@
 import streamlit as st
-import folium
-from geopy.geocoders import Nominatim
-from streamlit_folium import folium_static # Streamlit에 Folium 지도를 띄우기 위함
+from databack import tracing
+from databack.gazetteer import Gazetteer
+# folium / geopy 는 무거운 모듈이라 실제로 필요한 시점(지도 그리기, 원격 지오코딩)에 import 합니다.
+
+tracing.page("map_app")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
+# 0. 오프라인 지명 사전 로드 (서버 시작 후 한 번만 읽어서 모든 세션이 공유)
+@st.cache_resource
+def load_gazetteer():
+    return Gazetteer.load()
+
+gazetteer = load_gazetteer()
 
 # 1. 지명으로부터 위도, 경도를 얻는 함수 정의
+@tracing.traced() # 캐시 적중 여부와 상관없이 호출 시간을 기록
 @st.cache_data # Streamlit 캐싱을 사용하여 API 호출을 줄이고 성능 향상
 def get_coordinates(place_name):
+    # 자주 쓰는 지명은 로컬 사전에서 바로 찾고, 없을 때만 원격 지오코더를 호출합니다.
+    coords = gazetteer.lookup(place_name)
+    if coords is not None:
+        return coords
+
+    from geopy.geocoders import Nominatim
     geolocator = Nominatim(user_agent="my-map-app") # user_agent는 고유하게 설정하는 것이 좋습니다.
     try:
         location = geolocator.geocode(place_name)
@@ -27,6 +43,9 @@ st.markdown("원하는 지명을 입력하고 **엔터를 치거나 '지도에 
 # 세션 상태에 'current_place_input' 키가 없으면 초기값 설정
 if 'current_place_input' not in st.session_state:
     st.session_state.current_place_input = "서울역" # 초기 지명
+# 입력창의 값도 세션 상태로 관리합니다. (자동완성 후보를 고르면 입력창도 그 이름으로 바뀜)
+if 'text_input_widget' not in st.session_state:
+    st.session_state.text_input_widget = st.session_state.current_place_input
 
 # 4. 입력창 값 변경 시 호출될 콜백 함수
 # 이 함수는 텍스트 입력창에 엔터를 쳤을 때 실행됩니다.
@@ -37,11 +56,29 @@ def update_place_from_input():
 # 5. 사용자로부터 지명 입력받기 (엔터 입력 시 콜백 함수 호출)
 place_input_widget = st.text_input(
     "지명을 입력하세요 (예: 서울역, N서울타워, 에펠탑)",
-    value=st.session_state.current_place_input, # 세션 상태의 값을 초기값으로 사용
     key="text_input_widget", # 콜백 함수에서 참조할 위젯 키
     on_change=update_place_from_input # 엔터 입력 시 호출될 콜백 함수
 )
 
+# 5-1. 자동완성 후보 (로컬 지명 사전 기준)
+# 입력값이 사전에 정확히 없으면 비슷한 이름을 제안하고, 고르면 바로 지도에 표시합니다.
+def select_suggestion():
+    if st.session_state.suggestion_pills:
+        st.session_state.current_place_input = st.session_state.suggestion_pills
+        # 입력창도 고른 이름으로 바꾸고 선택을 지워서, 다음 실행 때 같은 후보가 다시 적용되지 않게 합니다.
+        st.session_state.text_input_widget = st.session_state.suggestion_pills
+        st.session_state.suggestion_pills = None
+
+if place_input_widget and gazetteer.lookup(place_input_widget) is None:
+    suggestions = gazetteer.suggest(place_input_widget)
+    if suggestions:
+        st.pills(
+            "혹시 이 장소를 찾으시나요?",
+            suggestions,
+            key="suggestion_pills",
+            on_change=select_suggestion
+        )
+
 # 6. '지도에 표시' 버튼
 # 버튼 클릭 시에도 동일한 로직이 실행되도록 합니다.
 if st.button("지도에 표시"):
@@ -62,18 +99,28 @@ if display_place:
         st.success(f"'{display_place}'의 위도: {latitude}, 경도: {longitude}")
 
         # 8. Folium 지도 생성 (초기 중심은 입력받은 지명)
-        m = folium.Map(location=[latitude, longitude], zoom_start=15)
+        # 같은 장소를 다시 그릴 때는 세션에 저장해 둔 지도를 재사용합니다.
+        map_key = (display_place, latitude, longitude)
+        if st.session_state.get("place_map_key") != map_key:
+            import folium
+            with tracing.span("map:build"):
+                m = folium.Map(location=[latitude, longitude], zoom_start=15)
+
+                # 9. 마커 추가
+                folium.Marker(
+                    [latitude, longitude],
+                    tooltip=display_place, # 마커 위에 마우스를 올렸을 때 나타나는 텍스트
+                    popup=f"<b>{display_place}</b><br>위도: {latitude}<br>경도: {longitude}", # 마커 클릭 시 나타나는 팝업
+                    icon=folium.Icon(color="red", icon="info-sign") # 마커 아이콘 설정
+                ).add_to(m)
 
-        # 9. 마커 추가
-        folium.Marker(
-            [latitude, longitude],
-            tooltip=display_place, # 마커 위에 마우스를 올렸을 때 나타나는 텍스트
-            popup=f"<b>{display_place}</b><br>위도: {latitude}<br>경도: {longitude}", # 마커 클릭 시 나타나는 팝업
-            icon=folium.Icon(color="red", icon="info-sign") # 마커 아이콘 설정
-        ).add_to(m)
+            st.session_state.place_map = m
+            st.session_state.place_map_key = map_key
 
         # 10. Streamlit에 Folium 지도 표시
-        folium_static(m)
+        from streamlit_folium import folium_static # Streamlit에 Folium 지도를 띄우기 위함
+        with tracing.span("render:map"):
+            folium_static(st.session_state.place_map)
     else:
         st.warning("입력하신 지명의 위치를 찾을 수 없습니다. 다시 시도해 주세요.")
 else:
@@ -1,29 +1,72 @@
 import streamlit as st
-import pandas as pd
+from databack import datasets, roster, tracing
 
-# 엑셀 파일 불러오기
-@st.cache_data
+tracing.page("내정보는")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
+# 엑셀 파일 불러오기 (공용 데이터 캐시 사용)
+# 이름/번호 키를 미리 정리해 둔 조인 표라서 번호를 "3", "03", 3 어느 쪽으로 넣어도 찾습니다.
+@tracing.traced()
 def load_data():
-    df = pd.read_excel("정보.xlsx")
-    return df
+    return datasets.load("student_id_index")
 
-df = load_data()
+index = load_data()
 
 # 사용자 입력
 st.title("아이디 찾기 페이지")
 
-name = st.text_input("이름을 입력하세요:")
-number = st.text_input("번호를 입력하세요:")
-
-if st.button("아이디 찾기"):
-    if not name or not number:
-        st.warning("이름과 번호를 모두 입력해주세요.")
-    else:
-        # 이름과 번호로 필터링
-        result = df[(df["이름"] == name) & (df["번호"].astype(str) == number)]
-        
-        if not result.empty:
-            user_id = result.iloc[0]["ID"]
-            st.success(f"아이디는: **{user_id}** 입니다.")
+tab_one, tab_bulk = st.tabs(["한 명 찾기", "명단으로 한꺼번에 찾기"])
+
+with tab_one:
+    name = st.text_input("이름을 입력하세요:")
+    number = st.text_input("번호를 입력하세요:")
+
+    if st.button("아이디 찾기"):
+        if not name or not number:
+            st.warning("이름과 번호를 모두 입력해주세요.")
+        else:
+            # 이름과 번호로 찾기 (명단으로 찾기와 같은 방법)
+            user_id, status = roster.lookup(index, name, number)
+
+            if status == roster.FOUND:
+                st.success(f"아이디는: **{user_id}** 입니다.")
+            elif status == roster.AMBIGUOUS:
+                st.warning("정보 파일에 같은 이름과 번호가 여러 번 있어 아이디를 정할 수 없습니다. 선생님께 확인해 주세요.")
+            elif status == roster.INVALID:
+                st.warning("번호는 숫자로 입력해주세요.")
+            else:
+                st.error("일치하는 정보를 찾을 수 없습니다.")
+
+with tab_bulk:
+    st.write("반 명단 파일(CSV 또는 엑셀)을 올리면 모든 학생의 아이디를 한 번에 찾아 파일로 내려받을 수 있습니다.")
+    st.caption(f"명단에는 이름 컬럼({', '.join(roster.NAME_COLUMNS)} 중 하나)과 번호 컬럼({', '.join(roster.NUMBER_COLUMNS)} 중 하나)이 있어야 합니다.")
+    uploaded = st.file_uploader("명단 파일", type=["csv", "xlsx", "xls"])
+
+    if uploaded is not None:
+        try:
+            with tracing.span("bulk:read"):
+                class_list = roster.read_roster(uploaded)
+        except ValueError as e:
+            st.error(str(e))
+        except Exception as e:
+            st.error(f"명단 파일을 읽는 중 오류가 발생했습니다: {e}")
         else:
-            st.error("일치하는 정보를 찾을 수 없습니다.")
+            # 명단 전체를 아이디 표와 한 번에 잇습니다. (줄마다 표를 다시 훑지 않음)
+            with tracing.span("bulk:join"):
+                result = roster.resolve(class_list, index)
+
+            counts = result["결과"].value_counts()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("명단", f"{len(result):,}명")
+            col2.metric("찾음", f"{counts.get(roster.FOUND, 0):,}명")
+            col3.metric("못 찾음", f"{len(result) - counts.get(roster.FOUND, 0):,}명")
+            if counts.get(roster.AMBIGUOUS, 0):
+                st.warning(f"정보 파일에 같은 이름과 번호가 여러 번 있어 아이디를 정할 수 없는 학생이 {counts[roster.AMBIGUOUS]:,}명 있습니다.")
+
+            st.dataframe(result, hide_index=True, use_container_width=True)
+
+            stem = uploaded.name.rsplit(".", 1)[0]
+            col_csv, col_xlsx = st.columns(2)
+            col_csv.download_button("📥 CSV 로 내려받기", roster.to_csv_bytes(result),
+                                    file_name=f"{stem}_아이디.csv", mime="text/csv")
+            col_xlsx.download_button("📥 엑셀로 내려받기", roster.to_excel_bytes(result), file_name=f"{stem}_아이디.xlsx",
+                                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import random
-from streamlit_gsheets import GSheetsConnection # streamlit-gsheets
+from databack import datasets, tracing
+from databack.streaks import CompletionStats
 
 # --- 페이지 기본 설정 ---
 st.set_page_config(
@@ -11,6 +12,8 @@ st.set_page_config(
     layout="centered"
 )
 
+tracing.page("다했어요")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
 # --- CSS 스타일링 (기존 스타일 유지) ---
 st.markdown("""
 <style>
@@ -116,21 +119,25 @@ st.markdown("""
 def init_connection():
     """구글 시트 연결 객체를 초기화하고 반환합니다."""
     try:
+        # streamlit-gsheets 는 import 비용이 커서 연결을 처음 만들 때 불러옵니다.
+        from streamlit_gsheets import GSheetsConnection
         return st.connection("gsheets", type=GSheetsConnection)
     except Exception as e:
         st.error(f"구글 시트 연결 설정에 실패했습니다: {e}")
         st.error("'.streamlit/secrets.toml' 파일에 올바른 'gsheets' 연결 정보가 있는지 확인해주세요.")
         return None
 
-def load_data_from_sheets():
+@tracing.traced()
+def load_data_from_sheets(refresh=False):
     """구글 시트에서 데이터를 불러오는 함수"""
     try:
         conn = init_connection()
         if conn is None:
             return [] # 연결 실패 시 빈 리스트 반환
         
-        # ttl=0으로 설정하여 캐시를 사용하지 않고 항상 최신 데이터를 읽어옴
-        df = conn.read(worksheet="시트1", ttl=0) 
+        # 공용 데이터 캐시를 통해 읽음: 여러 친구가 동시에 페이지를 열어도 시트는 30초에 한 번만 읽고,
+        # refresh=True(새로고침 버튼)일 때는 캐시를 건너뛰고 항상 최신 데이터를 읽어옴
+        df = datasets.load("task_sheet", refresh=refresh, worksheet="시트1")
 
         if df.empty:
             return []
@@ -165,6 +172,7 @@ def load_data_from_sheets():
         st.error(f"구글 시트에서 데이터를 불러오는 중 예외가 발생했습니다: {e}")
         return []
 
+@tracing.traced()
 def save_to_sheets(name, timestamp):
     """새로운 완료 기록을 구글 시트에 저장하는 함수"""
     try:
@@ -198,15 +206,27 @@ def save_to_sheets(name, timestamp):
         
         # 구글 시트 업데이트 (conn.update는 시트 전체를 덮어씀)
         conn.update(worksheet="시트1", data=updated_data)
+        datasets.invalidate("task_sheet") # 시트가 바뀌었으므로 캐시 비우기
         return True
         
     except Exception as e:
         st.error(f"구글 시트에 저장 중 오류가 발생했습니다: {e}")
         return False
 
+def reload_tasks(refresh=False):
+    """시트에서 기록을 다시 읽고 친구별 통계를 한 번에 다시 계산합니다."""
+    st.session_state.completed_tasks = load_data_from_sheets(refresh=refresh)
+    with tracing.span("stats:rebuild"):
+        st.session_state.task_stats = CompletionStats.from_records(st.session_state.completed_tasks)
+
 # --- 세션 상태 초기화 ---
 if 'completed_tasks' not in st.session_state:
-    st.session_state.completed_tasks = load_data_from_sheets()
+    reload_tasks()
+
+# 통계(연속 달성, 순위)는 기록이 추가될 때마다 그 친구 것만 고칩니다. (databack.streaks)
+if 'task_stats' not in st.session_state:
+    st.session_state.task_stats = CompletionStats.from_records(st.session_state.completed_tasks)
+stats = st.session_state.task_stats
 
 if 'show_name_input' not in st.session_state:
     st.session_state.show_name_input = False
@@ -261,9 +281,9 @@ with col2:
         )
         if name:
             clean_name = name.strip()
-            # 중복 이름 체크 (세션 상태 기준)
-            if clean_name not in [item['name'] for item in st.session_state.completed_tasks]:
-                current_time = datetime.now()
+            current_time = datetime.now()
+            # 중복 이름 체크: 하루에 한 번만 (연속 달성을 세기 위해 날마다 새로 완료할 수 있음)
+            if not stats.completed_on(clean_name, current_time):
                 
                 # 구글 시트에 저장
                 if save_to_sheets(clean_name, current_time):
@@ -272,23 +292,27 @@ with col2:
                         "name": clean_name,
                         "timestamp": current_time
                     })
+                    stats.record(clean_name, current_time)
                     st.session_state.last_sync = current_time
                     
                     st.success(f"🎉 **{clean_name}** 친구, 정말 대단해요! 할일을 완료했어요! 구글 시트에도 저장되었어요! 🎉")
+                    streak = stats.current_streak(clean_name, current_time)
+                    if streak > 1:
+                        st.info(f"🔥 {streak}일 연속으로 해냈어요!")
                     st.balloons()
                     st.session_state.show_name_input = False # 성공 후 입력창 숨김
                     # st.experimental_rerun() # 필요시 사용 (입력창을 확실히 닫기 위해)
                 else:
                     st.error("저장에 실패했습니다. 네트워크 연결을 확인하거나 잠시 후 다시 시도해주세요.")
             else:
-                st.warning(f"앗, **{clean_name}** 친구는 이미 완료했다고 표시했어요! 😊")
+                st.warning(f"앗, **{clean_name}** 친구는 오늘 이미 완료했다고 표시했어요! 😊")
                 st.session_state.show_name_input = False # 중복 시 입력창 숨김
 
 # 새로고침 버튼 추가
 col_refresh1, col_refresh2, col_refresh3 = st.columns([1, 1, 1]) # 중앙 정렬을 위해 3개 컬럼 사용
 with col_refresh2: # 가운데 컬럼에 버튼 배치
     if st.button("🔄 데이터 새로고침"):
-        st.session_state.completed_tasks = load_data_from_sheets()
+        reload_tasks(refresh=True)
         st.session_state.last_sync = datetime.now()
         st.success("데이터를 새로고침했습니다!")
         st.rerun()
@@ -323,12 +347,9 @@ if st.session_state.completed_tasks:
     )
     st.markdown("</div>", unsafe_allow_html=True)
 
-    total_completed = len(st.session_state.completed_tasks)
-    today_completed_tasks = [
-        task for task in st.session_state.completed_tasks 
-        if task['timestamp'].date() == datetime.now().date()
-    ]
-    today_completed = len(today_completed_tasks)
+    total_completed = stats.total
+    today_completed_names = stats.names_on(datetime.now())
+    today_completed = len(today_completed_names)
     
     col_stat1, col_stat2 = st.columns(2)
     with col_stat1:
@@ -337,15 +358,30 @@ if st.session_state.completed_tasks:
         st.metric("🗓️ 오늘 완료 수", today_completed)
 
     emojis = ["😊", "🥳", "🤩", "👍", "💯", "💖", "🌟", "🎈", "🚀", "🏆", "👏", "✨", "🌈"]
-    if today_completed_tasks:
+    if today_completed_names:
         emoji_message_parts = []
         # 최근 5명의 오늘 완료자 또는 전체 오늘 완료자 중 적은 쪽
-        for item in today_completed_tasks[:5]: 
-            emoji_message_parts.append(f"{item['name']} {random.choice(emojis)}")
+        for item_name in today_completed_names[:5]:
+            emoji_message_parts.append(f"{item_name} {random.choice(emojis)}")
         st.markdown(f"<p class='emoji-message'>오늘도 멋진 하루! {' '.join(emoji_message_parts)}</p>", unsafe_allow_html=True)
     elif total_completed > 0:
          st.markdown(f"<p class='emoji-message'>모두 잘하고 있어요! {random.choice(emojis)}</p>", unsafe_allow_html=True)
 
+    # --- 연속 달성 순위표 ---
+    st.markdown("<h2 class='sub-header'>🏆 연속 달성 순위 🏆</h2>", unsafe_allow_html=True)
+    with tracing.span("stats:leaderboard"):
+        leaderboard = stats.leaderboard()
+    st.dataframe(
+        leaderboard,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "연속": st.column_config.NumberColumn("🔥 연속 (일)", help="학교 가는 날(월~금) 기준으로 이어서 완료한 날 수"),
+            "최장 연속": st.column_config.NumberColumn("⭐ 최장 연속 (일)"),
+        },
+    )
+    with st.expander("📅 주간 완료 수 (최근 8주)"):
+        st.dataframe(stats.weekly_counts(weeks=8), use_container_width=True)
 
 else:
     st.info("아직 할일을 완료한 친구가 없어요. 첫 번째 친구가 되어보세요! 🚀")
@@ -389,12 +425,14 @@ with st.expander("🔧 관리자 도구"):
                              data_to_keep_df = pd.DataFrame(columns=['이름', '완료시간', '등록일'])
 
                         conn.update(worksheet="시트1", data=data_to_keep_df)
+                        datasets.invalidate("task_sheet") # 시트가 바뀌었으므로 캐시 비우기
                         
-                        # 3. 세션 상태도 업데이트
+                        # 3. 세션 상태도 업데이트 (기록이 지워졌으므로 통계는 다시 계산)
                         st.session_state.completed_tasks = [
                             task for task in st.session_state.completed_tasks 
                             if task['timestamp'].date() != today_date_obj
                         ]
+                        st.session_state.task_stats = CompletionStats.from_records(st.session_state.completed_tasks)
                         st.session_state.last_sync = datetime.now()
                         st.success("오늘 데이터가 구글 시트와 앱에서 초기화되었습니다.")
                     else:
@@ -411,7 +449,7 @@ with st.expander("🔧 관리자 도구"):
     
     with col_admin2:
         if st.button("🔄 전체 데이터 다시 로드 (시트 기준)"):
-            st.session_state.completed_tasks = load_data_from_sheets() # 시트에서 다시 로드
+            reload_tasks(refresh=True) # 시트에서 다시 로드
             st.session_state.last_sync = datetime.now()
             st.success("구글 시트에서 전체 데이터를 다시 로드했습니다!")
             st.rerun()
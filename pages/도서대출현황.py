@@ -1,12 +1,13 @@
 # app.py
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from databack import charts, datasets, figures, tracing
 
-# 데이터 불러오기
-@st.cache_data
+tracing.page("도서대출현황")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
+# 데이터 불러오기 (공용 데이터 캐시 사용)
+@tracing.traced()
 def load_data():
-    return pd.read_csv("BestLoanList_20250527071549.csv", encoding="cp949")
+    return datasets.load("book_loans")
 
 df = load_data()
 
@@ -20,11 +21,35 @@ st.header("🔍 도서명으로 대출 순위 확인")
 book_name = st.text_input("도서명을 입력하세요 (예: 흔한남매)").strip()
 
 if book_name:
-    matched_books = df[df["서명"].str.contains(book_name, case=False, na=False)]
+    with tracing.span("search"):
+        matched_books = df[df["서명"].str.contains(book_name, case=False, na=False)]
 
     if not matched_books.empty:
         st.success(f"🔎 총 {len(matched_books)}권이 검색되었습니다.")
         st.dataframe(matched_books[["순위", "서명", "저자", "출판사", "출판년도", "대출건수"]].sort_values(by="순위"))
+
+        # 비슷한 책: 데이터를 읽을 때 미리 계산해 둔 이웃 표에서 한 줄만 읽습니다. (databack.similar)
+        picked = st.selectbox(
+            "📖 비슷한 책을 찾을 도서",
+            matched_books.sort_values(by="순위").index,
+            format_func=lambda i: f"{df.at[i, '서명']} ({df.at[i, '저자']})",
+        )
+        with tracing.span("similar"):
+            from databack.similar import shared_features
+
+            row = df.index.get_loc(picked)
+            rows, scores = datasets.load("book_neighbors").lookup(row)
+            similar_books = df.iloc[rows][["서명", "저자", "출판사", "KDC", "대출건수"]].assign(
+                유사도=scores, 공통점=shared_features(df, row, rows),
+            )
+        if similar_books.empty:
+            st.info("저자, 출판사, 분류, 제목 단어가 겹치는 다른 책이 없습니다.")
+        else:
+            st.dataframe(
+                similar_books,
+                hide_index=True,
+                column_config={"유사도": st.column_config.ProgressColumn("유사도", min_value=0.0, max_value=1.0, format="%.2f")},
+            )
     else:
         st.warning("❗ 해당 도서를 찾을 수 없습니다. 정확한 도서명을 확인해 주세요.")
 
@@ -34,56 +59,76 @@ if book_name:
 st.header("📈 상위 대출 도서")
 
 top_n = st.slider("상위 몇 권의 도서를 볼까요?", 5, 50, 20)
-top_books = df.sort_values(by="대출건수", ascending=False).head(top_n)
+with tracing.span("groupby:top_books"):
+    top_books = charts.top_books(df, top_n)
 
-fig1 = px.bar(top_books, x="서명", y="대출건수",
-              hover_data=["저자", "출판사", "출판년도"],
-              title=f"Top {top_n} 대출 도서",
-              labels={"서명": "책 제목", "대출건수": "대출 건수"})
-fig1.update_layout(xaxis_tickangle=-45)
-st.plotly_chart(fig1, use_container_width=True)
+# 차트는 입력 데이터가 같으면 전에 만든 것을 다시 씀 (databack.figures)
+# 집계와 차트 모양은 파일 내보내기(python -m databack.export)와 함께 쓰는 databack.charts 에 있습니다.
+fig1 = figures.cached("top_books", charts.top_books_chart, top_books, top_n)
+with tracing.span("render:top_books"):
+    st.plotly_chart(fig1, use_container_width=True)
 
 # ─────────────────────────────────────
 # 2. 출판년도별 대출 건수
 # ─────────────────────────────────────
 st.header("📅 출판년도별 대출 건수")
-yearly = df.groupby("출판년도")["대출건수"].sum().reset_index().sort_values("출판년도")
+with tracing.span("groupby:yearly"):
+    yearly = charts.yearly_loans(df)
 
-fig2 = px.line(yearly, x="출판년도", y="대출건수",
-               title="출판년도별 총 대출 건수 추이")
-st.plotly_chart(fig2, use_container_width=True)
+fig2 = figures.cached("yearly", charts.yearly_chart, yearly)
+with tracing.span("render:yearly"):
+    st.plotly_chart(fig2, use_container_width=True)
 
 # ─────────────────────────────────────
 # 3. 출판사별 대출 현황
 # ─────────────────────────────────────
 st.header("🏢 출판사별 대출 건수 (상위 10개)")
-publisher = df.groupby("출판사")["대출건수"].sum().reset_index()
-top_publishers = publisher.sort_values(by="대출건수", ascending=False).head(10)
+with tracing.span("groupby:publisher"):
+    top_publishers = charts.top_loans_by(df, "출판사")
 
-fig3 = px.bar(top_publishers, x="출판사", y="대출건수",
-              title="대출 건수 상위 출판사", text="대출건수")
-st.plotly_chart(fig3, use_container_width=True)
+fig3 = figures.cached("publisher", charts.publisher_chart, top_publishers)
+with tracing.span("render:publisher"):
+    st.plotly_chart(fig3, use_container_width=True)
 
 # ─────────────────────────────────────
 # 4. 저자별 대출 건수 (상위 10명)
 # ─────────────────────────────────────
 st.header("✍️ 저자별 대출 건수 (상위 10명)")
-author = df.groupby("저자")["대출건수"].sum().reset_index()
-top_authors = author.sort_values(by="대출건수", ascending=False).head(10)
+with tracing.span("groupby:author"):
+    top_authors = charts.top_loans_by(df, "저자")
 
-fig4 = px.bar(top_authors, x="저자", y="대출건수",
-              title="대출 건수 상위 저자", text="대출건수")
-st.plotly_chart(fig4, use_container_width=True)
+fig4 = figures.cached("author", charts.author_chart, top_authors)
+with tracing.span("render:author"):
+    st.plotly_chart(fig4, use_container_width=True)
 
 # ─────────────────────────────────────
 # 5. KDC 분류별 대출 건수
 # ─────────────────────────────────────
 st.header("📚 KDC 분류별 대출 건수")
-df["KDC"] = df["KDC"].astype(str).str[:1]  # 대분류만 사용 (0~9)
-kdc = df.groupby("KDC")["대출건수"].sum().reset_index()
-
-fig5 = px.pie(kdc, names="KDC", values="대출건수", title="KDC 대분류별 대출 비율")
-st.plotly_chart(fig5, use_container_width=True)
+# 대분류 → 강목 → 요목 합계를 파일을 읽을 때 한 번만 계산해 둔 트리(databack.kdc)를 씁니다.
+# 차트의 칸을 누르면 브라우저에서 바로 아래 단계로 들어가고, 시작 분류를 고르면 트리에서 그 부분만 잘라 그립니다.
+kdc_tree = datasets.load("kdc_tree")
+
+col1, col2 = st.columns([1, 2])
+kdc_kind = col1.radio("차트 종류", ["treemap", "sunburst"], format_func={"treemap": "트리맵", "sunburst": "선버스트"}.get,
+                      horizontal=True)
+kdc_root = col2.selectbox("시작 분류", [None] + kdc_tree.options(),
+                          format_func=lambda node: "전체" if node is None else kdc_tree.label(node))
+
+with tracing.span("kdc:subtree"):
+    kdc_view = kdc_tree.subtree(kdc_root)
+    kdc_children = kdc_tree.children(kdc_root)
+
+fig5 = figures.cached("kdc", charts.kdc_tree_chart, *charts.kdc_tree_arrays(kdc_view), kind=kdc_kind)
+with tracing.span("render:kdc"):
+    st.plotly_chart(fig5, use_container_width=True)
+
+st.dataframe(
+    kdc_children,
+    hide_index=True,
+    use_container_width=True,
+    column_config={"비율": st.column_config.NumberColumn("비율 (%)", format="%.1f")},
+)
 
 # ─────────────────────────────────────
 # 6. 원본 데이터 확인
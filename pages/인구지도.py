@@ -0,0 +1,83 @@
+import json
+
+import folium # st_folium 이 어차피 folium 을 import 하므로 여기서 미뤄도 이득이 없음
+import streamlit as st
+from streamlit_folium import st_folium
+from databack import datasets, geo, tracing
+
+tracing.page("인구지도")  # 구간별 실행 시간 기록 (관리자 성능 모니터에서 확인)
+
+st.set_page_config(page_title="인구 지표 지도", page_icon="🗺️", layout="wide")
+st.title("🗺️ 시도·시군구별 인구 지표 지도")
+
+INDICATORS = ["중위연령", "고령인구비율", "총부양비", "유소년부양비", "노년부양비", "고령화지수", "총인구"]
+
+col1, col2, col3 = st.columns([1, 2, 2])
+level = col1.radio("행정구역", list(geo.LEVELS), format_func=geo.LEVEL_NAMES.get)
+indicator = col2.selectbox("색으로 나타낼 지표", INDICATORS)
+# 상세도가 높을수록 경계가 정확하지만 브라우저로 보내는 데이터가 커집니다.
+detail = col3.select_slider("경계 상세도", options=list(geo.ZOOM_LEVELS), value="전국")
+
+source = datasets.boundary_file(level)
+if not source.exists():
+    st.info(
+        f"행정구역 경계 파일이 없습니다: `{source}`\n\n"
+        f"행정기관코드({geo.LEVEL_NAMES[level]} {geo.LEVELS[level]}자리) 속성이 있는 경위도(WGS84) GeoJSON 을 "
+        f"이 경로에 두세요. (예: 국가공간정보포털 시도 경계(CTPRVN_CD), 시군구 경계(SIG_CD)) "
+        "다른 폴더를 쓰려면 환경 변수 DATABACK_BOUNDARY_DIR 을 지정합니다.\n\n"
+        f"`python -m databack.geo {level}` 로 상세도별 지도 데이터를 미리 만들어 둘 수 있습니다."
+    )
+    st.stop()
+
+# 경계는 상세도마다 한 번만 단순화해 TopoJSON 으로 저장하고(databack.geo), 지표는 공용 캐시의 표를 씁니다.
+try:
+    with tracing.span("load_data"):
+        indicators = datasets.load("region_indicators", level=level)
+        topojson = datasets.load("boundary_topojson", level=level, zoom=geo.ZOOM_LEVELS[detail])
+except Exception as e:
+    st.error(f"지도 데이터를 준비하는 중 오류가 발생했습니다: {e}")
+    st.stop()
+
+# 행정기관코드로 경계와 지표를 잇고, 말풍선에 보일 값을 경계 속성에 넣습니다.
+# (folium 이 경계에 색 정보를 써 넣으므로 캐시된 글자에서 매번 새 dict 를 만듭니다.)
+with tracing.span("join"):
+    data = json.loads(topojson)
+    values = dict(zip(indicators["code"], indicators[indicator]))
+    matched = 0
+    for geometry in data["objects"]["regions"]["geometries"]:
+        value = values.get(geometry["properties"]["code"])
+        if value is not None:
+            matched += 1
+        geometry["properties"]["value"] = "-" if value is None else f"{value:,.1f}"
+
+with tracing.span("render:map"):
+    m = folium.Map(location=[36.3, 127.8], zoom_start=7)
+    choropleth = folium.Choropleth(
+        geo_data=data,
+        topojson="objects.regions",
+        data=indicators,
+        columns=["code", indicator],
+        key_on="feature.properties.code",
+        fill_color="YlOrRd",
+        nan_fill_color="lightgray",
+        line_weight=0.5,
+        legend_name=f"{indicator} ({geo.LEVEL_NAMES[level]})",
+    ).add_to(m)
+    choropleth.geojson.add_child(folium.GeoJsonTooltip(fields=["name", "value"], aliases=["행정구역", indicator]))
+    st_folium(m, key="population_map", height=650, use_container_width=True, returned_objects=[])
+
+st.caption(
+    f"경계 {len(data['objects']['regions']['geometries']):,}곳 중 {matched:,}곳에 지표가 있습니다. "
+    f"지도 데이터 {len(topojson.encode('utf-8')) / 1024:,.0f} KB (상세도: {detail})"
+)
+
+with st.expander(f"{geo.LEVEL_NAMES[level]}별 지표 표 ({len(indicators):,}곳)"):
+    st.dataframe(
+        indicators.sort_values(indicator, ascending=False),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            column: st.column_config.NumberColumn(column, format="%.1f")
+            for column in ["중위연령", "고령인구비율", "총부양비", "유소년부양비", "노년부양비", "고령화지수"]
+        },
+    )